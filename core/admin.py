@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Job, Candidate, CandidateJob, Profile
+from .models import Job, Candidate, CandidateJob, ImportRun, JobSuggestion, Profile
 
 
 @admin.register(Profile)
@@ -75,3 +75,18 @@ class CandidateJobAdmin(admin.ModelAdmin):
     )
     list_filter = ('pipeline_status', 'ready_at', 'job')
     search_fields = ('candidate__name', 'candidate__linkedin_url', 'job__title')
+
+
+@admin.register(ImportRun)
+class ImportRunAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'kind', 'job', 'status', 'processed', 'total', 'errors', 'node', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status', 'node')
+    search_fields = ('user__username', 'job__title', 'message')
+    date_hierarchy = 'created_at'
+
+
+@admin.register(JobSuggestion)
+class JobSuggestionAdmin(admin.ModelAdmin):
+    list_display = ('job', 'candidate', 'score', 'updated_at')
+    search_fields = ('job__title', 'candidate__name')
+    raw_id_fields = ('job', 'candidate')
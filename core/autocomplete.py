@@ -0,0 +1,159 @@
+"""
+Autocomplete de tecnologias, skills, empresas e locais dos filtros do banco de talentos.
+
+As sugestões vêm de um dicionário pré-computado (PoolTerm) por banco (user_{id} e shared,
+como em core.pool_cache) com a frequência de cada termo. Ele é mantido de forma incremental
+pelos signals de Candidate: só a diferença entre os termos antes e depois de cada escrita é
+aplicada, num único INSERT ... ON CONFLICT. A consulta é um LIKE 'prefixo%' sobre a chave
+normalizada com índice btree varchar_pattern_ops, então não depende do tamanho do banco.
+
+A chave é sempre calculada no banco (TERM_KEY_SQL), na reconstrução, nas atualizações
+incrementais e no prefixo digitado: uma normalização só, sem divergir do unaccent do
+PostgreSQL em letras como "ø" e "ß". O banco compartilhado não conta as duplicatas entre
+usuários (duplicate_of), como CandidateQuerySet.pool.
+"""
+from collections import Counter
+
+from django.db import connection
+from django.db.models import CharField
+from django.db.models.expressions import RawSQL
+
+from .models import PoolTerm
+from .pool_cache import SHARED_SCOPE
+
+SUGGESTIONS_LIMIT = 10
+MAX_KEY_LENGTH = 255
+
+# Campo do autocomplete -> (coluna de Candidate, é array de tags canônicas)
+TERM_SOURCES = {
+    PoolTerm.Field.TECHNOLOGIES: ("technology_tags", True),
+    PoolTerm.Field.SKILLS: ("skill_tags", True),
+    PoolTerm.Field.COMPANY: ("current_company", False),
+    PoolTerm.Field.LOCATION: ("location", False),
+}
+SOURCE_COLUMNS = tuple(column for column, _ in TERM_SOURCES.values())
+# Colunas que decidem em quais bancos e com quais termos o candidato entra
+STATE_COLUMNS = ("user_id", "duplicate_of_id", *SOURCE_COLUMNS)
+
+TERM_KEY_SQL = f"left(lower(immutable_unaccent(btrim({{}}))), {MAX_KEY_LENGTH})"
+TERM_SQL = f"left(btrim({{}}), {MAX_KEY_LENGTH})"
+
+_ON_CONFLICT_SQL = """
+ON CONFLICT (scope, field, key) DO UPDATE
+SET count = core_poolterm.count + EXCLUDED.count,
+    term = CASE WHEN EXCLUDED.count > 0 THEN EXCLUDED.term ELSE core_poolterm.term END
+"""
+_UPSERT_SQL = f"""
+INSERT INTO core_poolterm (scope, field, key, term, count)
+SELECT scope, field, key, term, count FROM (
+    SELECT %s AS scope, %s AS field, {TERM_KEY_SQL.format("%s")} AS key, {TERM_SQL.format("%s")} AS term, %s AS count
+) change WHERE key <> ''
+{_ON_CONFLICT_SQL}
+"""
+
+# Termos de cada candidato, uma linha por termo; {where} restringe os candidatos
+_TERM_ROWS_SQL = f"""
+    SELECT * FROM (
+        SELECT c.user_id, c.duplicate_of_id, t.field, {TERM_KEY_SQL.format("t.term")} AS key, {TERM_SQL.format("t.term")} AS term
+        FROM core_candidate c CROSS JOIN LATERAL (
+            SELECT 'technologies' AS field, tag AS term FROM unnest(c.technology_tags) AS tag
+            UNION ALL SELECT 'skills', tag FROM unnest(c.skill_tags) AS tag
+            UNION ALL SELECT 'company', c.current_company
+            UNION ALL SELECT 'location', c.location
+        ) t
+        {{where}}
+    ) terms WHERE key <> ''
+"""
+
+# Reconstrução completa a partir dos candidatos (comando rebuild_pool_terms)
+REBUILD_SQL = f"""
+DELETE FROM core_poolterm;
+INSERT INTO core_poolterm (scope, field, key, term, count)
+SELECT 'user_' || user_id, field, key, max(term), count(*) FROM ({_TERM_ROWS_SQL.format(where="")}) terms
+GROUP BY user_id, field, key;
+INSERT INTO core_poolterm (scope, field, key, term, count)
+SELECT '{SHARED_SCOPE}', field, key, max(term), count(*) FROM ({_TERM_ROWS_SQL.format(where="")}) terms
+WHERE duplicate_of_id IS NULL GROUP BY field, key;
+"""
+
+# Candidatos que entram (%s = 1) ou saem (%s = -1) do banco compartilhado
+_SHARED_DELTA_SQL = f"""
+INSERT INTO core_poolterm (scope, field, key, term, count)
+SELECT '{SHARED_SCOPE}', field, key, max(term), %s * count(*)
+FROM ({_TERM_ROWS_SQL.format(where="WHERE c.id = ANY(%s)")}) terms GROUP BY field, key
+{_ON_CONFLICT_SQL}
+"""
+_CLEANUP_SQL = "DELETE FROM core_poolterm WHERE count <= 0 AND scope = ANY(%s)"
+
+
+def candidate_terms(values: dict) -> Counter:
+    """Termos de um candidato ({(campo, valor original): quantidade}) a partir das colunas de origem."""
+    terms = Counter()
+    for field, (column, is_tags) in TERM_SOURCES.items():
+        raw = values.get(column)
+        for item in (raw or []) if is_tags else [raw]:
+            if item:
+                terms[(str(field), item)] += 1
+    return terms
+
+
+def _scoped_terms(state: dict) -> Counter:
+    if not state:
+        return Counter()
+    scopes = [f"user_{state['user_id']}"]
+    if state.get("duplicate_of_id") is None:
+        scopes.append(SHARED_SCOPE)
+    return Counter({
+        (scope, field, term): count
+        for scope in scopes
+        for (field, term), count in candidate_terms(state).items()
+    })
+
+
+def record_term_changes(before: dict, after: dict) -> None:
+    """
+    Aplica no dicionário só a diferença entre dois estados de um candidato (valores de
+    STATE_COLUMNS; {} para "não existe"), no banco do usuário e no compartilhado.
+    """
+    delta = _scoped_terms(after)
+    delta.subtract(_scoped_terms(before))
+    rows = [(scope, field, term, term, count) for (scope, field, term), count in delta.items() if count]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(_UPSERT_SQL, rows)
+        removed_scopes = sorted({row[0] for row in rows if row[4] < 0})
+        if removed_scopes:
+            cursor.execute(_CLEANUP_SQL, [removed_scopes])
+
+
+def record_shared_pool_changes(joined_ids, left_ids) -> None:
+    """Candidatos que passaram a ser (ou deixaram de ser) duplicatas de outro usuário via update()."""
+    with connection.cursor() as cursor:
+        for sign, ids in ((1, list(joined_ids)), (-1, list(left_ids))):
+            if ids:
+                cursor.execute(_SHARED_DELTA_SQL, [sign, ids])
+        if left_ids:
+            cursor.execute(_CLEANUP_SQL, [[SHARED_SCOPE]])
+
+
+def rebuild_pool_terms() -> int:
+    """Reconstrói o dicionário inteiro. Retorna o número de termos."""
+    with connection.cursor() as cursor:
+        cursor.execute(REBUILD_SQL)
+    return PoolTerm.objects.count()
+
+
+def suggest_terms(scope: str, field: str, prefix: str, limit: int = SUGGESTIONS_LIMIT) -> list[dict]:
+    """Termos mais frequentes do banco que começam com o prefixo (sem acento, sem diferenciar maiúsculas)."""
+    prefix = (prefix or "").strip()
+    if not prefix or field not in TERM_SOURCES:
+        return []
+    # Constante para o planner: o LIKE 'chave%' continua usando o índice
+    key = RawSQL(TERM_KEY_SQL.format("%s"), [prefix], output_field=CharField())
+    rows = (
+        PoolTerm.objects.filter(scope=scope, field=field, key__startswith=key)
+        .order_by("-count", "key")
+        .values_list("term", "count")[:limit]
+    )
+    return [{"term": term, "count": count} for term, count in rows]
@@ -0,0 +1,173 @@
+"""
+Execução local da busca booleana da vaga (Job.boolean_search) no banco de talentos.
+
+A string no formato do LinkedIn gerada por _build_boolean_search ("termo", grupos com OR,
+AND, NOT e parênteses; termos lado a lado equivalem a AND) é convertida numa AST e depois
+num Q do Django. Cada termo vira uma busca de frase no documento full-text do candidato
+(search_document, GIN) ou uma tag exata de skills/tecnologias (arrays com GIN), então a
+consulta inteira é servida por índices.
+"""
+import re
+from dataclasses import dataclass
+
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import Q
+
+from .search import SEARCH_CONFIG_EN, SEARCH_CONFIG_PT
+from .tags import canonical_tags
+
+MAX_TERMS = 200
+
+_TOKEN_RE = re.compile(r'\s*(?:"([^"]*)"|(\()|(\))|([^\s()"]+))')
+
+
+class BooleanSearchError(ValueError):
+    """Expressão booleana inválida (parênteses desbalanceados, operador sem termo...)."""
+
+
+@dataclass(frozen=True)
+class Term:
+    text: str
+
+
+@dataclass(frozen=True)
+class And:
+    children: tuple
+
+
+@dataclass(frozen=True)
+class Or:
+    children: tuple
+
+
+@dataclass(frozen=True)
+class Not:
+    child: object
+
+
+def _tokenize(expression: str) -> list[tuple[str, str]]:
+    tokens = []
+    pos = 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match or match.end() == pos:
+            raise BooleanSearchError("Aspas não fechadas na busca booleana.")
+        quoted, lparen, rparen, word = match.groups()
+        if quoted is not None:
+            if quoted.strip():
+                tokens.append(("TERM", quoted.strip()))
+        elif lparen:
+            tokens.append(("(", lparen))
+        elif rparen:
+            tokens.append((")", rparen))
+        elif word in ("AND", "OR", "NOT"):
+            tokens.append((word, word))
+        elif word:
+            tokens.append(("TERM", word))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """or := and (OR and)* ; and := not ((AND)? not)* ; not := NOT not | '(' or ')' | TERM"""
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.pos = 0
+        self.terms = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self) -> tuple[str, str]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise BooleanSearchError("Busca booleana vazia.")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise BooleanSearchError("Parêntese fechado sem abertura na busca booleana.")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek() in ("AND", "NOT", "(", "TERM"):
+            if self.peek() == "AND":
+                self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_not(self):
+        kind = self.peek()
+        if kind == "NOT":
+            self.take()
+            return Not(self.parse_not())
+        if kind == "(":
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise BooleanSearchError("Parêntese aberto sem fechamento na busca booleana.")
+            self.take()
+            return node
+        if kind == "TERM":
+            self.terms += 1
+            if self.terms > MAX_TERMS:
+                raise BooleanSearchError(f"A busca booleana tem mais de {MAX_TERMS} termos.")
+            return Term(self.take()[1])
+        raise BooleanSearchError("Operador sem termo na busca booleana.")
+
+
+def parse_boolean_search(expression: str):
+    """Converte a string booleana numa AST (Term/And/Or/Not). Levanta BooleanSearchError."""
+    return _Parser(_tokenize(expression or "")).parse()
+
+
+def _term_q(text: str, prefix: str) -> Q:
+    condition = Q()
+    tags = canonical_tags(text, "technologies")
+    if len(tags) == 1:
+        condition |= Q(**{f"{prefix}technology_tags__contains": tags})
+        condition |= Q(**{f"{prefix}skill_tags__contains": tags})
+        if "+" in tags[0] or "#" in tags[0]:
+            # "C++"/"C#" viram só "c" no tsvector: para esses termos vale apenas a tag exata
+            return condition
+    query = (
+        SearchQuery(text, search_type="phrase", config=SEARCH_CONFIG_PT)
+        | SearchQuery(text, search_type="phrase", config=SEARCH_CONFIG_EN)
+    )
+    condition |= Q(**{f"{prefix}search_document": query})
+    return condition
+
+
+def compile_boolean_search(node, prefix: str = "") -> Q:
+    """Compila a AST num Q sobre Candidate (prefix permite partir de outro model)."""
+    if isinstance(node, Term):
+        return _term_q(node.text, prefix)
+    if isinstance(node, Not):
+        return ~compile_boolean_search(node.child, prefix)
+    combined = None
+    for child in node.children:
+        condition = compile_boolean_search(child, prefix)
+        if combined is None:
+            combined = condition
+        elif isinstance(node, And):
+            combined &= condition
+        else:
+            combined |= condition
+    return combined
+
+
+def apply_boolean_search(qs, expression: str, prefix: str = ""):
+    """Filtra o queryset pela busca booleana. Levanta BooleanSearchError se a expressão for inválida."""
+    return qs.filter(compile_boolean_search(parse_boolean_search(expression), prefix))
@@ -0,0 +1,293 @@
+"""
+Detecção e fusão de candidatos duplicados.
+
+Duplicatas chegam de dois jeitos: reexportações do mesmo perfil com URL do LinkedIn escrita de
+outro jeito (barra final, subdomínio de idioma, sufixo /pt, query string) e a mesma pessoa
+importada por usuários diferentes. Candidate.save() guarda três chaves:
+
+- linkedin_key: URL canônica (canonical_linkedin_url), igual para todas as variações;
+- name_key: nome normalizado (sem acento, minúsculo, palavras ordenadas);
+- simhash: SimHash de 64 bits do nome, cargo, empresa, local, skills, tecnologias e resumo.
+
+São duplicatas certas dois candidatos com a mesma linkedin_key ou o mesmo PDF
+(resume_sha256); só essas são fundidas automaticamente depois de uma importação. Mesmo
+name_key com SimHash a no máximo SIMHASH_MAX_DISTANCE bits de distância é só provável
+(homônimos com perfis parecidos existem): esses grupos só entram com fuzzy=True, pelo comando
+merge_duplicate_candidates --fuzzy, depois de revisados com --dry-run.
+
+merge_duplicates() funde as duplicatas de um mesmo usuário num único candidato (vínculos com
+vagas incluídos) e, entre usuários, marca duplicate_of no candidato mais recente: o banco
+compartilhado (Candidate.objects.pool) mostra uma linha por pessoa sem apagar o que é de cada
+usuário.
+"""
+import hashlib
+import re
+from urllib.parse import unquote, urlsplit
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .search import normalize_term, text_tokens
+
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 6
+
+# Campo de Candidate -> peso no SimHash
+SIMHASH_FIELDS = {
+    "name": 3,
+    "current_title": 2,
+    "current_company": 2,
+    "location": 1,
+    "skills": 1,
+    "technologies": 1,
+    "summary": 1,
+}
+DEDUP_SOURCE_FIELDS = ("linkedin_url", *SIMHASH_FIELDS)
+
+# Campos copiados do duplicado quando o candidato que fica não os tem
+_FILL_FIELDS = (
+    "current_title", "current_company", "location", "summary", "skills", "technologies",
+    "languages", "certifications", "seniority", "experience_time", "average_tenure",
+)
+_LOCALE_RE = re.compile(r"^[a-z]{2}([-_][a-z]{2})?$")
+_PROFILE_PATH_RE = re.compile(r"^/(in|pub)/([^/]+)")
+
+
+def canonical_linkedin_url(url: str) -> str:
+    """
+    Forma canônica da URL de perfil do LinkedIn: "linkedin.com/in/<slug>" (minúsculo, sem
+    esquema, www ou subdomínio de idioma, query, fragmento, sufixo de idioma ou barra final).
+    URLs que não são de perfil voltam só sem esquema, query e barra final.
+    """
+    value = (url or "").strip().lower()
+    if not value:
+        return ""
+    if "://" not in value:
+        value = f"https://{value.lstrip('/')}"
+    parts = urlsplit(value)
+    host = parts.hostname or ""
+    path = unquote(parts.path)
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        match = _PROFILE_PATH_RE.match(path)
+        if match:
+            return f"linkedin.com/{match.group(1)}/{match.group(2)}"
+        host = "linkedin.com"
+    segments = [segment for segment in path.split("/") if segment]
+    if segments and _LOCALE_RE.match(segments[-1]) and len(segments) > 2:
+        segments = segments[:-1]
+    return "/".join([host, *segments])
+
+
+def name_key(name: str) -> str:
+    return " ".join(sorted(normalize_term(name or "").split()))[:160]
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+def simhash(values: dict) -> int | None:
+    """SimHash (inteiro de 64 bits com sinal, para BigIntegerField) das palavras e bigramas dos campos."""
+    weights = [0] * SIMHASH_BITS
+    found = False
+    for field, weight in SIMHASH_FIELDS.items():
+        tokens = text_tokens(values.get(field) or "")
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            found = True
+            value = _feature_hash(f"{field}:{feature}")
+            for bit in range(SIMHASH_BITS):
+                weights[bit] += weight if value >> bit & 1 else -weight
+    if not found:
+        return None
+    fingerprint = sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return ((a ^ b) & ((1 << SIMHASH_BITS) - 1)).bit_count()
+
+
+def dedup_keys(values: dict) -> tuple[str, str, int | None]:
+    """(linkedin_key, name_key, simhash) de um candidato a partir dos seus campos."""
+    return canonical_linkedin_url(values.get("linkedin_url")), name_key(values.get("name")), simhash(values)
+
+
+def duplicate_groups(candidates: list, fuzzy: bool = False) -> list[list]:
+    """
+    Grupos (com 2 ou mais) de candidatos que são a mesma pessoa: mesma linkedin_key ou mesmo
+    resume_sha256 e, com fuzzy, mesmo name_key com SimHash próximo. Union-find sobre os pares;
+    cada grupo em ordem de id.
+    """
+    parent = {candidate.id: candidate.id for candidate in candidates}
+
+    def find(candidate_id):
+        while parent[candidate_id] != candidate_id:
+            parent[candidate_id] = parent[parent[candidate_id]]
+            candidate_id = parent[candidate_id]
+        return candidate_id
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    exact, by_name = {}, {}
+    for candidate in candidates:
+        if candidate.linkedin_key:
+            exact.setdefault(("url", candidate.linkedin_key), []).append(candidate)
+        if candidate.resume_sha256:
+            exact.setdefault(("resume", candidate.resume_sha256), []).append(candidate)
+        if fuzzy and candidate.name_key and candidate.simhash is not None:
+            by_name.setdefault(candidate.name_key, []).append(candidate)
+    for members in exact.values():
+        for other in members[1:]:
+            union(members[0].id, other.id)
+    for members in by_name.values():
+        for index, candidate in enumerate(members):
+            for other in members[index + 1:]:
+                if hamming_distance(candidate.simhash, other.simhash) <= SIMHASH_MAX_DISTANCE:
+                    union(candidate.id, other.id)
+
+    groups = {}
+    for candidate in sorted(candidates, key=lambda c: c.id):
+        groups.setdefault(find(candidate.id), []).append(candidate)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def _survivor(candidates: list):
+    """Candidato que fica na fusão: o de extração mais recente (dados mais atuais)."""
+    return max(candidates, key=lambda c: (c.extracted_at is not None, c.extracted_at or c.updated_at, c.updated_at))
+
+
+@transaction.atomic
+def _merge_into(survivor, duplicates: list) -> None:
+    """Funde os duplicados (do mesmo usuário) no survivor e apaga os duplicados."""
+    from .models import Candidate, CandidateExperience, CandidateJob, CandidateRoleYears, JobSuggestion
+
+    duplicate_ids = [candidate.id for candidate in duplicates]
+    for field in _FILL_FIELDS:
+        if getattr(survivor, field) in ("", None):
+            for candidate in duplicates:
+                if getattr(candidate, field) not in ("", None):
+                    setattr(survivor, field, getattr(candidate, field))
+                    break
+    ready_dates = [c.ready_at for c in (survivor, *duplicates) if c.ready_at]
+    survivor.ready_at = max(ready_dates) if ready_dates else None
+    if not survivor.resume_pdf:
+        donor = next((c for c in duplicates if c.resume_pdf), None)
+        if donor:
+            survivor.resume_pdf, survivor.resume_sha256 = donor.resume_pdf.name, donor.resume_sha256
+
+    # Vínculos com vagas: passam para o survivor; se ele já está na vaga, ficam a etapa mais
+    # avançada e a maior aderência
+    stages = list(CandidateJob.PipelineStatus.values)
+    survivor_links = {link.job_id: link for link in CandidateJob.objects.filter(candidate=survivor)}
+    for link in CandidateJob.objects.filter(candidate_id__in=duplicate_ids).order_by("-updated_at"):
+        current = survivor_links.get(link.job_id)
+        if current is None:
+            link.candidate = survivor
+            link.save(update_fields=["candidate", "updated_at"])
+            survivor_links[link.job_id] = link
+            continue
+        if link.pipeline_status and (
+            not current.pipeline_status or stages.index(link.pipeline_status) > stages.index(current.pipeline_status)
+        ):
+            current.pipeline_status, current.ready_at = link.pipeline_status, link.ready_at
+        if link.adherence_score is not None and (
+            current.adherence_score is None or link.adherence_score > current.adherence_score
+        ):
+            current.adherence_score = link.adherence_score
+            current.technical_justification = link.technical_justification
+            current.adherence_key = link.adherence_key
+        current.save()
+    # Linha do tempo de experiências: a do survivor, ou a do primeiro duplicado que tiver uma
+    if not CandidateExperience.objects.filter(candidate=survivor).exists():
+        donor = CandidateExperience.objects.filter(candidate_id__in=duplicate_ids).order_by("candidate_id").first()
+        if donor:
+            CandidateExperience.objects.filter(candidate_id=donor.candidate_id).update(candidate=survivor)
+            CandidateRoleYears.objects.filter(candidate=survivor).delete()
+            CandidateRoleYears.objects.filter(candidate_id=donor.candidate_id).update(candidate=survivor)
+    # Sugestões são recalculadas para o survivor por quem chama
+    JobSuggestion.objects.filter(candidate_id__in=duplicate_ids).delete()
+    Candidate.objects.filter(duplicate_of_id__in=duplicate_ids).update(duplicate_of=survivor)
+    Candidate.objects.filter(id__in=duplicate_ids).delete()
+    survivor.save()
+
+
+def _candidates_sharing_keys(user_id: int | None, candidate_ids, fuzzy: bool = False):
+    """
+    Candidatos que dividem linkedin_key ou resume_sha256 (e name_key, com fuzzy) com os
+    candidatos de referência: os do usuário e/ou os de candidate_ids (um lote de importação)
+    ou, sem filtro, as chaves repetidas do banco.
+    """
+    from .models import Candidate
+
+    keys = ["linkedin_key", "resume_sha256"] + (["name_key"] if fuzzy else [])
+    if user_id is None and candidate_ids is None:
+        values = {
+            key: Candidate.objects.values(key).annotate(total=Count("id")).filter(total__gt=1).exclude(**{key: ""}).values(key)
+            for key in keys
+        }
+    else:
+        seeds = Candidate.objects.all()
+        if user_id is not None:
+            seeds = seeds.filter(user_id=user_id)
+        if candidate_ids is not None:
+            seeds = seeds.filter(id__in=candidate_ids)
+        values = {key: seeds.exclude(**{key: ""}).values(key) for key in keys}
+    condition = Q()
+    for key, subquery in values.items():
+        condition |= Q(**{f"{key}__in": subquery})
+    fields = (
+        "id", "user_id", "linkedin_key", "resume_sha256", "name_key", "simhash", "duplicate_of_id",
+        "extracted_at", "updated_at",
+    )
+    return Candidate.objects.filter(condition).only(*fields)
+
+
+def find_duplicates(user_id: int | None = None, candidate_ids=None, fuzzy: bool = False) -> list[list]:
+    """Grupos de duplicatas, sem alterar nada (revisão antes de merge_duplicates com fuzzy)."""
+    return duplicate_groups(list(_candidates_sharing_keys(user_id, candidate_ids, fuzzy)), fuzzy)
+
+
+def merge_duplicates(user_id: int | None = None, candidate_ids=None, fuzzy: bool = False) -> dict:
+    """
+    Funde duplicatas do mesmo usuário e marca duplicate_of entre usuários. Com user_id e/ou
+    candidate_ids, só os grupos que envolvem esses candidatos (o que uma importação pode ter
+    criado); sem eles, o banco inteiro. Sem fuzzy (importações), só chaves exatas. Retorna {"merged": apagados, "linked": marcados, "survivors": ids,
+    "relinked": ids que entraram ou saíram do banco compartilhado}.
+    """
+    from .autocomplete import record_shared_pool_changes
+    from .models import Candidate
+
+    merged = linked = 0
+    survivors, joined, left = [], [], []
+    for group in find_duplicates(user_id, candidate_ids, fuzzy):
+        by_user = {}
+        for candidate in group:
+            by_user.setdefault(candidate.user_id, []).append(candidate)
+        kept = []
+        for members in by_user.values():
+            survivor = _survivor(members)
+            duplicates = [candidate for candidate in members if candidate.id != survivor.id]
+            if duplicates:
+                # A busca de grupos só carrega as chaves; a fusão precisa dos candidatos inteiros
+                full = Candidate.objects.in_bulk([candidate.id for candidate in members])
+                survivor = full[survivor.id]
+                _merge_into(survivor, [full[candidate.id] for candidate in duplicates])
+                merged += len(duplicates)
+                survivors.append(survivor.id)
+            kept.append(survivor)
+        # Entre usuários: o candidato mais antigo representa a pessoa no banco compartilhado
+        canonical = min(kept, key=lambda c: c.id)
+        for candidate in kept:
+            target = None if candidate.id == canonical.id else canonical.id
+            if candidate.duplicate_of_id != target:
+                Candidate.objects.filter(id=candidate.id).update(duplicate_of_id=target)
+                linked += target is not None
+                # update() não passa pelos signals: o autocomplete do banco compartilhado é ajustado aqui
+                if target is None:
+                    joined.append(candidate.id)
+                elif candidate.duplicate_of_id is None:
+                    left.append(candidate.id)
+    record_shared_pool_changes(joined, left)
+    return {"merged": merged, "linked": linked, "survivors": survivors, "relinked": joined + left}
@@ -0,0 +1,154 @@
+"""
+Linha do tempo de experiências dos candidatos (CandidateExperience).
+
+Os blocos da seção "Experiência" do PDF (empresa, cargo, local, meses) são lidos localmente
+na pré-leitura da importação e gravados um por linha, do mais recente ao mais antigo. Cargo e
+empresa também ficam normalizados (title_key, company_key: sem acento, minúsculos, sem
+stopwords) com índices trigram, então "≥ 3 anos como Engenheiro de Dados" ou "já trabalhou na
+Acme" são filtros indexados no banco, sem chamar o LLM por candidato. Junto com as
+experiências são recalculados os meses por família de cargo (core.role_families,
+CandidateRoleYears), usados no filtro de cargo e no rankeamento. Os totais que a extração
+grava no candidato (experience_time, average_tenure) têm filtros de faixa (mín./máx. em anos)
+sobre índices (usuário, campo), que reduzem o conjunto antes do rankeamento por IA.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Sum
+
+from .models import CandidateExperience, CandidateRoleYears
+from .role_families import role_families, role_family_months
+from .search import text_tokens
+
+# Filtros do banco de talentos e da busca na vaga
+EXPERIENCE_FILTERS = ("role", "role_min_years", "worked_at")
+# Filtro -> (campo de Candidate, lookup), em anos
+EXPERIENCE_RANGE_FILTERS = {
+    "experience_min": ("experience_time", "gte"),
+    "experience_max": ("experience_time", "lte"),
+    "tenure_min": ("average_tenure", "gte"),
+    "tenure_max": ("average_tenure", "lte"),
+}
+MAX_KEY_LENGTH = 160
+
+
+def experience_key(value: str) -> str:
+    return " ".join(text_tokens(value))[:MAX_KEY_LENGTH]
+
+
+def experience_rows(candidate_id: int, blocks: list[dict]) -> list[CandidateExperience]:
+    """Linhas de CandidateExperience dos blocos de core.pdf_extractor._extract_experience_blocks."""
+    rows = []
+    for position, block in enumerate(blocks):
+        company = (block.get("company") or "")[:MAX_KEY_LENGTH]
+        title = (block.get("title") or "")[:MAX_KEY_LENGTH]
+        rows.append(CandidateExperience(
+            candidate_id=candidate_id,
+            position=position,
+            company=company,
+            title=title,
+            location=(block.get("location") or "")[:MAX_KEY_LENGTH],
+            months=max(int(block.get("months") or 0), 0),
+            company_key=experience_key(company),
+            title_key=experience_key(title),
+        ))
+    return rows
+
+
+@transaction.atomic
+def replace_experiences(candidate_id: int, blocks: list[dict]) -> None:
+    """Substitui as experiências (e os meses por família de cargo) pelas do currículo reimportado."""
+    rows = experience_rows(candidate_id, blocks)
+    CandidateExperience.objects.filter(candidate_id=candidate_id).delete()
+    CandidateExperience.objects.bulk_create(rows)
+    CandidateRoleYears.objects.filter(candidate_id=candidate_id).delete()
+    CandidateRoleYears.objects.bulk_create([
+        CandidateRoleYears(candidate_id=candidate_id, family=family, months=months)
+        for family, months in role_family_months((row.title_key, row.months) for row in rows).items()
+    ])
+
+
+def role_years_for(candidate_ids: list[int], role_titles: list[str]) -> dict[int, Decimal]:
+    """
+    Anos de cada candidato nos cargos da vaga, sem reler currículos. Um título vale o menor
+    tempo entre as suas famílias (todas precisam bater) e a vaga, o maior entre os títulos
+    (variações PT/EN). Candidatos sem tempo nesses cargos ficam de fora.
+    """
+    title_families = [families for families in map(role_families, role_titles) if families]
+    if not title_families or not candidate_ids:
+        return {}
+    months: dict[int, dict[str, int]] = {}
+    for candidate_id, family, family_months in CandidateRoleYears.objects.filter(
+        candidate_id__in=candidate_ids, family__in={family for families in title_families for family in families}
+    ).values_list("candidate_id", "family", "months"):
+        months.setdefault(candidate_id, {})[family] = family_months
+    years = {}
+    for candidate_id, by_family in months.items():
+        total = max(min(by_family.get(family, 0) for family in families) for families in title_families)
+        if total > 0:
+            years[candidate_id] = Decimal(str(round(total / 12, 1)))
+    return years
+
+
+def experience_filters_from(data) -> dict:
+    """Filtros de experiência presentes em request.GET/POST (ou num dict de filtros salvo)."""
+    filters = {}
+    for key in EXPERIENCE_FILTERS:
+        value = str(data.get(key) or "").strip()
+        if value:
+            filters[key] = value
+    for key in EXPERIENCE_RANGE_FILTERS:
+        years = _years(data.get(key))
+        if years is not None:
+            filters[key] = str(years)
+    return filters
+
+
+def _years(value) -> Decimal | None:
+    """Anos digitados ("2,5", "3"); None se vazio, inválido ou negativo."""
+    try:
+        years = Decimal(str(value or "").strip().replace(",", "."))
+    except (InvalidOperation, ValueError):
+        return None
+    return years if years.is_finite() and years >= 0 else None
+
+
+def _min_months(value) -> int | None:
+    years = _years(value)
+    return int(years * 12) if years else None
+
+
+def apply_experience_filters(qs, filters: dict):
+    """
+    role: já teve um cargo com esse texto; com role_min_years, a soma dos meses nesses cargos
+    (ou em todos, sem role) precisa chegar a esse número de anos. Um role que é uma família
+    conhecida ("Engenheiro de Dados") usa os meses já somados por família (CandidateRoleYears),
+    em todas as famílias do texto. worked_at: já trabalhou numa empresa com esse nome. Cada
+    filtro é um EXISTS. experience_min/max e tenure_min/max comparam experience_time e
+    average_tenure do candidato (sem o total lido, o candidato fica de fora).
+    """
+    role = experience_key(filters.get("role") or "")
+    min_months = _min_months(filters.get("role_min_years") or "")
+    families = role_families(role)
+    for family in families:
+        qs = qs.filter(Exists(CandidateRoleYears.objects.filter(
+            candidate_id=OuterRef("pk"), family=family, months__gte=min_months or 0
+        )))
+    if not families and (role or min_months):
+        experiences = CandidateExperience.objects.filter(candidate_id=OuterRef("pk"))
+        if role:
+            experiences = experiences.filter(title_key__contains=role)
+        if min_months:
+            experiences = (
+                experiences.order_by().values("candidate_id")
+                .annotate(total_months=Sum("months")).filter(total_months__gte=min_months)
+            )
+        qs = qs.filter(Exists(experiences))
+    company = experience_key(filters.get("worked_at") or "")
+    if company:
+        qs = qs.filter(Exists(CandidateExperience.objects.filter(candidate_id=OuterRef("pk"), company_key__contains=company)))
+    for key, (field, lookup) in EXPERIENCE_RANGE_FILTERS.items():
+        years = _years(filters.get(key))
+        if years is not None:
+            qs = qs.filter(**{f"{field}__{lookup}": years})
+    return qs
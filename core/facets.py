@@ -0,0 +1,70 @@
+"""
+Contagens por faceta (senioridade, local, tecnologias, skills, idiomas) do banco de talentos.
+
+Tudo sai de uma única consulta: o conjunto filtrado vira uma CTE e cada faceta é um GROUP BY
+sobre ela (as de tags desaninham os arrays canônicos de core.tags), unidos com UNION ALL e
+cortados no top N por faceta com row_number(). O resultado fica em cache pela versão do
+banco (core.pool_cache), então a tela pode pedir as contagens a cada mudança de filtro.
+"""
+from django.core.cache import cache
+from django.db import connection
+
+FACET_LIMIT = 10
+FACETS_CACHE_TIMEOUT = 60 * 10
+
+# faceta -> coluna de texto livre (agrupada pelo valor) ou array de tags (desaninhado)
+TEXT_FACETS = {"seniority": "seniority", "location": "location"}
+TAG_FACETS = {"technologies": "technology_tags", "skills": "skill_tags", "languages": "language_tags"}
+FACETS = (*TEXT_FACETS, *TAG_FACETS)
+
+_FACETS_SQL = """
+WITH filtered AS ({inner})
+SELECT facet, value, total FROM (
+    SELECT facet, value, total,
+           row_number() OVER (PARTITION BY facet ORDER BY total DESC, value) AS position
+    FROM (
+        SELECT 'total' AS facet, NULL AS value, count(*) AS total FROM filtered
+        {groups}
+    ) grouped
+) ranked
+WHERE facet = 'total' OR position <= %s
+"""
+_TEXT_GROUP = (
+    "UNION ALL SELECT '{facet}', btrim({column}), count(*) FROM filtered "
+    "WHERE btrim({column}) <> '' GROUP BY 2"
+)
+_TAG_GROUP = "UNION ALL SELECT '{facet}', tag, count(*) FROM filtered, unnest(filtered.{column}) AS tag GROUP BY 2"
+
+
+def _empty_facets() -> dict:
+    return {"total": 0, **{facet: [] for facet in FACETS}}
+
+
+def _query_facets(qs, limit: int) -> dict:
+    columns = [*TEXT_FACETS.values(), *TAG_FACETS.values()]
+    inner, params = qs.order_by().values(*columns).query.sql_with_params()
+    groups = [_TEXT_GROUP.format(facet=facet, column=column) for facet, column in TEXT_FACETS.items()]
+    groups += [_TAG_GROUP.format(facet=facet, column=column) for facet, column in TAG_FACETS.items()]
+    sql = _FACETS_SQL.format(inner=inner, groups="\n        ".join(groups))
+    result = _empty_facets()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (*params, limit))
+        rows = cursor.fetchall()
+    for facet, value, total in sorted(rows, key=lambda row: (-row[2], row[1] or "")):
+        if facet == "total":
+            result["total"] = total
+        else:
+            result[facet].append({"value": value, "count": total})
+    return result
+
+
+def candidate_facets(qs, cache_key: str = "", limit: int = FACET_LIMIT) -> dict:
+    """Contagens por faceta do queryset de candidatos já filtrado (em cache se cache_key vier)."""
+    if cache_key:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+    result = _query_facets(qs, limit)
+    if cache_key:
+        cache.set(cache_key, result, timeout=FACETS_CACHE_TIMEOUT)
+    return result
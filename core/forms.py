@@ -102,6 +102,7 @@ class JobForm(forms.ModelForm):
             'boolean_search',
             'notes',
             'status',
+            'shared_pool_suggestions',
         )
         labels = {
             'title': 'Título',
@@ -121,6 +122,7 @@ class JobForm(forms.ModelForm):
             'boolean_search': 'Busca booleana',
             'notes': 'Observações internas',
             'status': 'Status',
+            'shared_pool_suggestions': 'Sugerir candidatos do banco compartilhado',
         }
         widgets = {
             'summary': forms.Textarea(attrs={'rows': 4}),
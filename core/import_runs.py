@@ -0,0 +1,198 @@
+"""
+Registro de execuções em background (importações e buscas no banco de talentos).
+
+Cada execução é um ImportRun com id próprio, dono, tipo e estado, então vários usuários
+(e vários workers/nós) podem importar ao mesmo tempo sem sobrescrever o progresso uns dos
+outros. O progresso ao vivo fica no cache sob a chave da execução (import_run_{id}); o
+registro no banco recebe os contadores a cada RUN_PERSIST_INTERVAL, guarda o resultado
+final e serve de fallback quando o cache expira ou a execução rodou em outro nó. Enquanto a
+execução roda, run_heartbeat renova heartbeat_at a cada RUN_HEARTBEAT_INTERVAL, haja
+progresso ou não; execuções "running" sem heartbeat há RUN_STALE_AFTER (worker reiniciado no
+meio) são marcadas como erro por expire_stale_runs.
+"""
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .models import ImportRun
+from .progress import ProgressReporter, progress_reporter, read_progress
+
+NODE_NAME = socket.gethostname()
+RUNS_LIST_LIMIT = 50
+RUN_PERSIST_INTERVAL = 10
+RUN_HEARTBEAT_INTERVAL = 60
+RUN_STALE_AFTER = timedelta(minutes=15)
+RUN_EXPIRE_CHECK_INTERVAL = 60
+STALE_RUN_MESSAGE = "Execução interrompida: o processo que a executava parou de responder."
+
+
+def run_progress_key(run_id) -> str:
+    return f"import_run_{run_id}"
+
+
+def _initial_payload(run: ImportRun) -> dict:
+    return {"status": ImportRun.Status.RUNNING, "processed": 0, "total": 0, "run_id": str(run.id), "kind": run.kind}
+
+
+def start_run(user_id: int, kind: str, job_id: int | None = None) -> ImportRun:
+    """Cria o registro da execução e publica o estado inicial."""
+    run = ImportRun.objects.create(user_id=user_id, kind=kind, job_id=job_id, node=NODE_NAME, heartbeat_at=timezone.now())
+    run_reporter(run).replace(_initial_payload(run))
+    return run
+
+
+def _persist_counters(run_id):
+    """Grava contadores e heartbeat da execução no banco, no máximo a cada RUN_PERSIST_INTERVAL."""
+    last_write = time.monotonic()
+
+    def persist(state: dict) -> None:
+        nonlocal last_write
+        now = time.monotonic()
+        if now - last_write < RUN_PERSIST_INTERVAL:
+            return
+        last_write = now
+        ImportRun.objects.filter(id=run_id, status=ImportRun.Status.RUNNING).update(
+            total=state.get("total") or 0,
+            processed=state.get("processed") or 0,
+            errors=state.get("errors") or 0,
+            heartbeat_at=timezone.now(),
+        )
+
+    return persist
+
+
+def touch_heartbeat(run_id) -> None:
+    ImportRun.objects.filter(id=run_id, status=ImportRun.Status.RUNNING).update(heartbeat_at=timezone.now())
+
+
+@contextmanager
+def run_heartbeat(run: ImportRun):
+    """
+    Renova heartbeat_at a cada RUN_HEARTBEAT_INTERVAL enquanto o bloco roda, numa thread à parte:
+    fases sem callback de progresso (descompactar os uploads, pré-varredura dos PDFs, lotes
+    lentos do LLM) não podem fazer uma execução viva parecer interrompida.
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(RUN_HEARTBEAT_INTERVAL):
+                touch_heartbeat(run.id)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"run-heartbeat-{run.id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+
+
+def run_reporter(run: ImportRun, extra: dict | None = None) -> ProgressReporter:
+    """Callback de progresso da execução: o mesmo reporter de start/finish_run, com contadores no banco."""
+    return progress_reporter(
+        run_progress_key(run.id),
+        extra={"run_id": str(run.id), "kind": run.kind, **(extra or {})},
+        persist=_persist_counters(run.id),
+    )
+
+
+def finish_run(run: ImportRun, result: dict) -> None:
+    """Marca a execução como concluída: grava contadores e resultado e publica pelo reporter da execução."""
+    run.status = ImportRun.Status.COMPLETED
+    run.total = result.get("total") or 0
+    run.processed = run.total
+    run.errors = result.get("errors") or 0
+    run.result = result
+    run.finished_at = run.heartbeat_at = timezone.now()
+    run.save(update_fields=["status", "total", "processed", "errors", "result", "finished_at", "heartbeat_at"])
+    run_reporter(run).replace({"status": ImportRun.Status.COMPLETED, "result": result})
+
+
+def fail_run(run: ImportRun, message: str) -> None:
+    """Marca a execução como falha."""
+    run.status = ImportRun.Status.ERROR
+    run.message = message
+    run.finished_at = run.heartbeat_at = timezone.now()
+    run.save(update_fields=["status", "message", "finished_at", "heartbeat_at"])
+    run_reporter(run).replace({"status": ImportRun.Status.ERROR, "message": message})
+
+
+def expire_stale_runs() -> int:
+    """
+    Marca como erro as execuções "running" sem heartbeat há RUN_STALE_AFTER (o worker que as
+    executava reiniciou) e publica o erro no progresso, cujo último "running" no cache
+    esconderia o estado do banco.
+    """
+    now = timezone.now()
+    stale = list(ImportRun.objects.filter(status=ImportRun.Status.RUNNING, heartbeat_at__lt=now - RUN_STALE_AFTER))
+    if not stale:
+        return 0
+    expired = ImportRun.objects.filter(id__in=[run.id for run in stale], status=ImportRun.Status.RUNNING).update(
+        status=ImportRun.Status.ERROR, message=STALE_RUN_MESSAGE, finished_at=now,
+    )
+    for run in stale:
+        run_reporter(run).replace({"status": ImportRun.Status.ERROR, "message": STALE_RUN_MESSAGE})
+    return expired
+
+
+def check_stale_runs() -> None:
+    """expire_stale_runs no máximo uma vez por RUN_EXPIRE_CHECK_INTERVAL entre todos os workers."""
+    if cache.add("import_runs_expire_check", True, timeout=RUN_EXPIRE_CHECK_INTERVAL):
+        expire_stale_runs()
+
+
+def latest_run(user_id: int, kind: str, job_id: int | None = None) -> ImportRun | None:
+    """Execução mais recente do usuário para a tela (banco de talentos ou vaga)."""
+    check_stale_runs()
+    return ImportRun.objects.filter(user_id=user_id, kind=kind, job_id=job_id).order_by("-created_at").first()
+
+
+def run_fallback_payload(run: ImportRun) -> dict:
+    """Estado da execução a partir do registro no banco (quando o cache não tem a chave)."""
+    payload = {"status": run.status, "run_id": str(run.id), "kind": run.kind}
+    if run.status == ImportRun.Status.COMPLETED:
+        payload["result"] = run.result
+    elif run.status == ImportRun.Status.ERROR:
+        payload["message"] = run.message
+    else:
+        payload.update({"processed": run.processed, "total": run.total})
+    return payload
+
+
+def run_status(run: ImportRun | None) -> dict | None:
+    """Progresso atual da execução: cache (ao vivo) com fallback no registro."""
+    if run is None:
+        return None
+    return read_progress(run_progress_key(run.id)) or run_fallback_payload(run)
+
+
+def serialize_run(run: ImportRun) -> dict:
+    """Representação JSON de uma execução para o endpoint de listagem."""
+    live = read_progress(run_progress_key(run.id)) if run.status == ImportRun.Status.RUNNING else None
+    data = {
+        "id": str(run.id),
+        "kind": run.kind,
+        "job_id": run.job_id,
+        "status": run.status,
+        "total": run.total,
+        "processed": run.processed,
+        "errors": run.errors,
+        "node": run.node,
+        "created_at": run.created_at.isoformat(),
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+    }
+    if live:
+        for field in ("status", "total", "processed", "errors"):
+            if live.get(field) is not None:
+                data[field] = live[field]
+    if run.status == ImportRun.Status.ERROR:
+        data["message"] = run.message
+    return data
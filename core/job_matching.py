@@ -0,0 +1,198 @@
+"""
+Sugestões contínuas de candidatos para as vagas abertas.
+
+Cada vaga OPEN tem uma consulta permanente compilada uma vez (e recompilada só quando os campos
+da vaga mudam): a busca booleana da vaga ou, sem ela, "algum termo obrigatório", mais uma
+pontuação local pelos termos de must_have, stack e nice_to_have presentes no candidato. A cada
+lote importado, só os candidatos novos/alterados do lote são avaliados contra as vagas abertas
+(id IN lote), e o resultado fica em JobSuggestion. O banco nunca é varrido de novo.
+"""
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+from django.utils import timezone
+
+from .boolean_search import BooleanSearchError, Or, Term, compile_boolean_search, parse_boolean_search
+from .models import Candidate, CandidateJob, Job, JobSuggestion, Profile
+from .search import normalize_term
+from .tags import canonical_tags
+
+MIN_SUGGESTION_SCORE = 40
+MAX_MATCHED_TERMS = 20
+MAX_CACHED_MATCHERS = 512
+
+# Grupo de termos da vaga -> peso na pontuação local
+TERM_WEIGHTS = {"must_have": 3, "stack": 2, "nice_to_have": 1}
+
+_SPLIT_RE = re.compile(r"[,;\n/|]+")
+_CANDIDATE_FIELDS = (
+    "id", "user_id", "current_title", "skills", "technologies", "summary", "certifications",
+    "technology_tags", "skill_tags",
+)
+
+# job_id -> (assinatura dos campos da vaga, JobMatcher), LRU limitado a MAX_CACHED_MATCHERS:
+# vagas fechadas ou apagadas saem sozinhas em vez de ficar no processo para sempre
+_MATCHERS: "OrderedDict[int, tuple[tuple, JobMatcher | None]]" = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class MatchTerm:
+    label: str
+    pattern: re.Pattern
+    tags: tuple[str, ...]
+    weight: int
+
+
+@dataclass(frozen=True)
+class JobMatcher:
+    job_id: int
+    owner_id: int
+    shared_pool: bool
+    condition: Q
+    terms: tuple[MatchTerm, ...]
+
+    def score(self, candidate: Candidate) -> tuple[int, list[str]]:
+        """Pontuação 0-100 (peso dos termos encontrados / peso total) e os termos encontrados."""
+        text = normalize_term(" ".join(
+            getattr(candidate, field) or ""
+            for field in ("current_title", "skills", "technologies", "summary", "certifications")
+        ))
+        tags = set(candidate.technology_tags or []) | set(candidate.skill_tags or [])
+        total = sum(term.weight for term in self.terms)
+        matched = [
+            term for term in self.terms
+            if (term.tags and set(term.tags) <= tags) or term.pattern.search(text)
+        ]
+        if not total:
+            return 0, []
+        score = round(100 * sum(term.weight for term in matched) / total)
+        return score, [term.label for term in matched][:MAX_MATCHED_TERMS]
+
+
+def _split_terms(value: str) -> list[str]:
+    return [item.strip() for item in _SPLIT_RE.split(value or "") if item.strip()]
+
+
+def job_terms(job: Job) -> list[tuple[str, int]]:
+    """(termo, peso) de must_have, stack e nice_to_have, sem repetir termos entre os grupos."""
+    terms = []
+    seen = set()
+    for group, weight in TERM_WEIGHTS.items():
+        for label in _split_terms(getattr(job, group)):
+            key = normalize_term(label)
+            if key not in seen:
+                seen.add(key)
+                terms.append((label, weight))
+    return terms
+
+
+def _job_signature(job: Job, shared_pool: bool) -> tuple:
+    return (job.must_have, job.nice_to_have, job.stack, job.boolean_search, job.user_id, shared_pool)
+
+
+def _compile(job: Job, shared_pool: bool) -> JobMatcher | None:
+    terms = []
+    for label, weight in job_terms(job):
+        pattern = re.compile(rf"(?<!\w){re.escape(normalize_term(label))}(?!\w)")
+        terms.append(MatchTerm(label, pattern, tuple(canonical_tags(label, "technologies")), weight))
+    if not terms:
+        return None
+    condition = None
+    if job.boolean_search:
+        try:
+            condition = compile_boolean_search(parse_boolean_search(job.boolean_search))
+        except BooleanSearchError:
+            condition = None
+    if condition is None:
+        must_have = [term.label for term in terms if term.weight == TERM_WEIGHTS["must_have"]]
+        anchor = must_have or [term.label for term in terms]
+        condition = compile_boolean_search(Or(tuple(Term(label) for label in anchor)))
+    return JobMatcher(job.id, job.user_id, shared_pool, condition, tuple(terms))
+
+
+def job_matcher(job: Job, shared_pool: bool) -> JobMatcher | None:
+    """Consulta permanente da vaga, recompilada só quando os campos usados mudam."""
+    signature = _job_signature(job, shared_pool)
+    with _matchers_lock:
+        cached = _MATCHERS.get(job.id)
+        if cached and cached[0] == signature:
+            _MATCHERS.move_to_end(job.id)
+            return cached[1]
+    matcher = _compile(job, shared_pool)
+    with _matchers_lock:
+        _MATCHERS[job.id] = (signature, matcher)
+        _MATCHERS.move_to_end(job.id)
+        while len(_MATCHERS) > MAX_CACHED_MATCHERS:
+            _MATCHERS.popitem(last=False)
+    return matcher
+
+
+def _open_jobs_for(owner_ids: set[int]):
+    """
+    Vagas abertas que enxergam esses candidatos: as dos donos dos candidatos (quem importou) e
+    as vagas PREMIUM que optaram por sugestões do banco compartilhado (shared_pool_suggestions).
+    """
+    shared = Q(shared_pool_suggestions=True, user__profile__plan=Profile.Plan.PREMIUM)
+    return (
+        Job.objects.filter(status=Job.Status.OPEN)
+        .filter(Q(user_id__in=owner_ids) | shared)
+        .annotate(shared_pool=ExpressionWrapper(shared, output_field=BooleanField()))
+        .only("id", "user_id", "must_have", "nice_to_have", "stack", "boolean_search")
+    )
+
+
+def match_candidates(candidate_ids: list[int]) -> int:
+    """
+    Avalia só esses candidatos contra todas as vagas abertas e atualiza as sugestões.
+    Retorna quantas sugestões foram criadas/atualizadas.
+    """
+    candidate_ids = list(set(candidate_ids))
+    if not candidate_ids:
+        return 0
+    owner_ids = set(Candidate.objects.filter(id__in=candidate_ids).values_list("user_id", flat=True))
+    suggestions = []
+    for job in _open_jobs_for(owner_ids):
+        matcher = job_matcher(job, bool(job.shared_pool))
+        if matcher is None:
+            continue
+        linked = CandidateJob.objects.filter(job_id=job.id, candidate_id=OuterRef("pk"))
+        candidates = Candidate.objects.pool(job.user_id, matcher.shared_pool).filter(~Exists(linked), id__in=candidate_ids)
+        matched_ids = set()
+        for candidate in candidates.filter(matcher.condition).only(*_CANDIDATE_FIELDS):
+            score, matched_terms = matcher.score(candidate)
+            if score >= MIN_SUGGESTION_SCORE:
+                matched_ids.add(candidate.id)
+                suggestions.append(JobSuggestion(
+                    job_id=job.id,
+                    candidate_id=candidate.id,
+                    score=score,
+                    matched_terms=matched_terms,
+                    updated_at=timezone.now(),
+                ))
+        # Candidatos do lote que deixaram de atender a vaga saem das sugestões
+        JobSuggestion.objects.filter(job_id=job.id, candidate_id__in=candidate_ids).exclude(
+            candidate_id__in=matched_ids
+        ).delete()
+    if suggestions:
+        JobSuggestion.objects.bulk_create(
+            suggestions,
+            update_conflicts=True,
+            unique_fields=["job", "candidate"],
+            update_fields=["score", "matched_terms", "updated_at"],
+        )
+    return len(suggestions)
+
+
+def open_suggestions(job: Job, limit: int = 10):
+    """Sugestões atuais da vaga, sem os candidatos que já foram vinculados."""
+    linked = CandidateJob.objects.filter(job_id=job.id, candidate_id=OuterRef("candidate_id"))
+    return (
+        job.suggestions.filter(~Exists(linked))
+        .select_related("candidate")
+        .defer("candidate__search_document")
+        .order_by("-score", "-updated_at")[:limit]
+    )
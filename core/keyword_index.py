@@ -0,0 +1,230 @@
+"""
+Ranking BM25 dos candidatos do banco pelos termos da vaga (must_have, stack, nice_to_have).
+
+É um modo de ordenação com corte, separado dos filtros: entram só os KEYWORD_TOP_N
+candidatos com algum termo da vaga de maior relevância BM25 sobre current_title, skills,
+technologies (peso 2) e summary (peso 1), mais as tags canônicas de core.tags (então "k8s" no
+currículo conta para "Kubernetes" na vaga). Num banco grande, quem fica abaixo do corte não
+aparece no preview nem no rankeamento (a tela avisa o limite). Cada termo da vaga pesa como em core.job_matching.TERM_WEIGHTS, e o
+resultado traz a contribuição de cada termo: um ranking barato e explicável antes do LLM.
+
+O índice invertido de cada banco fica em memória como arrays NumPy (postings em CSR por
+termo) e é persistido em CACHE_DIR/keywords/{escopo}.npz (core.pool_index_store), então um
+worker novo só carrega o arquivo. A importação acrescenta os candidatos do lote num delta
+(postings em COO) e marca as versões antigas como removidas; quando o delta passa de
+MERGE_RATIO da base, os dois são fundidos numa nova base.
+"""
+import math
+from array import array
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from .models import Candidate
+from .pool_index_store import PoolIndexStore, save_arrays
+from .search import text_tokens
+from .tags import canonical_tags
+
+K1 = 1.2
+B = 0.75
+MERGE_RATIO = 0.2
+KEYWORD_TOP_N = 200
+
+# Campo de Candidate -> peso da frequência do termo
+SOURCE_FIELDS = {"current_title": 2, "technologies": 2, "skills": 2, "summary": 1}
+TAG_FIELDS = ("technology_tags", "skill_tags")
+TAG_PREFIX = "tag:"
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    candidate_id: int
+    score: float
+    # Termo da vaga -> contribuição no score
+    matched_terms: dict
+
+
+def candidate_terms(candidate: Candidate) -> dict[str, float]:
+    """Frequência ponderada de cada termo do candidato (palavras e tags canônicas)."""
+    counts: dict[str, float] = {}
+    for field, weight in SOURCE_FIELDS.items():
+        for token in text_tokens(getattr(candidate, field)):
+            counts[token] = counts.get(token, 0) + weight
+    for field in TAG_FIELDS:
+        for tag in getattr(candidate, field) or []:
+            counts[TAG_PREFIX + tag] = counts.get(TAG_PREFIX + tag, 0) + 1
+    return counts
+
+
+@dataclass(frozen=True)
+class KeywordIndex:
+    vocabulary: dict
+    ids: np.ndarray
+    lengths: np.ndarray
+    alive: np.ndarray
+    # Base: postings do termo t em rows/tfs[indptr[t]:indptr[t + 1]]
+    indptr: np.ndarray
+    rows: np.ndarray
+    tfs: np.ndarray
+    # Delta desde a última fusão: triplas (termo, linha, tf)
+    delta_terms: np.ndarray
+    delta_rows: np.ndarray
+    delta_tfs: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "KeywordIndex":
+        return cls(
+            {}, np.zeros(0, np.int64), np.zeros(0, np.float32), np.zeros(0, bool),
+            np.zeros(1, np.int64), np.zeros(0, np.int32), np.zeros(0, np.float32),
+            np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32),
+        )
+
+    @classmethod
+    def from_candidates(cls, candidates) -> "KeywordIndex":
+        return cls.empty().with_candidates(candidates.order_by("id").iterator(chunk_size=2000), merge=True)
+
+    def with_candidates(self, candidates, merge: bool = False) -> "KeywordIndex":
+        """Novo índice com esses candidatos acrescentados (versões anteriores marcadas como removidas)."""
+        vocabulary = dict(self.vocabulary)
+        ids, lengths = array("q"), array("f")
+        terms, rows, tfs = array("i"), array("i"), array("f")
+        row = len(self.ids)
+        for candidate in candidates:
+            counts = candidate_terms(candidate)
+            for term, tf in counts.items():
+                terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                rows.append(row)
+                tfs.append(tf)
+            ids.append(candidate.id)
+            lengths.append(sum(counts.values()))
+            row += 1
+        new_ids = np.frombuffer(ids, dtype=np.int64)
+        index = KeywordIndex(
+            vocabulary,
+            np.concatenate([self.ids, new_ids]),
+            np.concatenate([self.lengths, np.frombuffer(lengths, dtype=np.float32)]),
+            np.concatenate([self.alive & ~np.isin(self.ids, new_ids), np.ones(len(ids), bool)]),
+            self.indptr, self.rows, self.tfs,
+            np.concatenate([self.delta_terms, np.frombuffer(terms, dtype=np.int32)]),
+            np.concatenate([self.delta_rows, np.frombuffer(rows, dtype=np.int32)]),
+            np.concatenate([self.delta_tfs, np.frombuffer(tfs, dtype=np.float32)]),
+        )
+        if merge or len(index.delta_terms) > MERGE_RATIO * max(len(index.rows), 1):
+            return index.merged()
+        return index
+
+    def without_candidates(self, ids) -> "KeywordIndex":
+        """Novo índice com esses candidatos marcados como removidos (saem de vez na próxima fusão)."""
+        return replace(self, alive=self.alive & ~np.isin(self.ids, np.fromiter(ids, dtype=np.int64)))
+
+    def merged(self) -> "KeywordIndex":
+        """Funde base e delta numa nova base, sem as linhas removidas."""
+        base_terms = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int32), np.diff(self.indptr))
+        terms = np.concatenate([base_terms, self.delta_terms])
+        rows = np.concatenate([self.rows, self.delta_rows])
+        tfs = np.concatenate([self.tfs, self.delta_tfs])
+        keep = self.alive[rows]
+        new_row = np.cumsum(self.alive) - 1
+        terms, rows, tfs = terms[keep], new_row[rows[keep]].astype(np.int32), tfs[keep]
+        order = np.argsort(terms, kind="stable")
+        counts = np.bincount(terms, minlength=len(self.vocabulary))
+        return KeywordIndex(
+            self.vocabulary,
+            self.ids[self.alive], self.lengths[self.alive], np.ones(int(self.alive.sum()), bool),
+            np.concatenate([[0], np.cumsum(counts)]).astype(np.int64), rows[order], tfs[order],
+            np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32),
+        )
+
+    @property
+    def needs_rebuild(self) -> bool:
+        # Fusões incrementais já descartam as linhas removidas; não há modelo a reajustar
+        return False
+
+    def _postings(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            return np.zeros(0, np.int32), np.zeros(0, np.float32)
+        rows, tfs = np.zeros(0, np.int32), np.zeros(0, np.float32)
+        if term_id < len(self.indptr) - 1:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            rows, tfs = self.rows[start:end], self.tfs[start:end]
+        in_delta = self.delta_terms == term_id
+        if in_delta.any():
+            rows = np.concatenate([rows, self.delta_rows[in_delta]])
+            tfs = np.concatenate([tfs, self.delta_tfs[in_delta]])
+        live = self.alive[rows]
+        return rows[live], tfs[live]
+
+    def _term_scores(self, term: str, total: int, norms: np.ndarray) -> np.ndarray:
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        rows, tfs = self._postings(term)
+        if len(rows):
+            idf = math.log(1 + (total - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] = idf * tfs * (K1 + 1) / (tfs + norms[rows])
+        return scores
+
+    def search(self, query_terms: list[tuple[str, int]], top_n: int = KEYWORD_TOP_N) -> list[KeywordMatch]:
+        """
+        Candidatos com algum dos termos, do mais relevante ao menos. Cada termo da vaga vale
+        peso x max(BM25 da tag canônica, média do BM25 das suas palavras).
+        """
+        total = int(self.alive.sum())
+        if not total or not query_terms:
+            return []
+        norms = K1 * (1 - B + B * self.lengths / max(float(self.lengths[self.alive].mean()), 1.0))
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        contributions = []
+        for label, weight in query_terms:
+            label_scores = np.zeros(len(self.ids), dtype=np.float32)
+            for tag in canonical_tags(label, "technologies"):
+                label_scores = np.maximum(label_scores, self._term_scores(TAG_PREFIX + tag, total, norms))
+            tokens = text_tokens(label)
+            if tokens:
+                token_scores = sum(self._term_scores(token, total, norms) for token in tokens) / len(tokens)
+                label_scores = np.maximum(label_scores, token_scores)
+            label_scores *= weight
+            scores += label_scores
+            contributions.append((label, label_scores))
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return []
+        top = matched[np.argpartition(-scores[matched], min(top_n, len(matched)) - 1)[:top_n]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            KeywordMatch(
+                int(self.ids[row]),
+                round(float(scores[row]), 2),
+                {label: round(float(values[row]), 2) for label, values in contributions if values[row] > 0},
+            )
+            for row in top
+        ]
+
+    def save(self, path) -> None:
+        save_arrays(
+            path,
+            vocabulary=np.array(sorted(self.vocabulary, key=self.vocabulary.get), dtype=str),
+            ids=self.ids, lengths=self.lengths, alive=self.alive,
+            indptr=self.indptr, rows=self.rows, tfs=self.tfs,
+            delta_terms=self.delta_terms, delta_rows=self.delta_rows, delta_tfs=self.delta_tfs,
+        )
+
+    @classmethod
+    def load(cls, path) -> "KeywordIndex":
+        with np.load(path) as data:
+            return cls(
+                {term: index for index, term in enumerate(data["vocabulary"].tolist())},
+                data["ids"], data["lengths"], data["alive"],
+                data["indptr"], data["rows"], data["tfs"],
+                data["delta_terms"], data["delta_rows"], data["delta_tfs"],
+            )
+
+
+keyword_indexes = PoolIndexStore("keywords", KeywordIndex, (*SOURCE_FIELDS, *TAG_FIELDS))
+
+
+def keyword_ranking(scope: str, query_terms: list[tuple[str, int]], top_n: int = KEYWORD_TOP_N) -> list[KeywordMatch] | None:
+    """Ranking BM25 do banco; None se o índice ainda não existe (a construção começa em segundo plano)."""
+    index = keyword_indexes.get_or_build(scope)
+    if index is None:
+        return None
+    return index.search(query_terms, top_n)
@@ -451,6 +451,7 @@ def calculate_adherence_for_candidate(
         f"Certificações: {candidate_data.get('certifications', '')}\n"
         f"Senioridade: {candidate_data.get('seniority', '')}\n"
         f"Tempo de experiência: {candidate_data.get('experience_time', '')} anos\n"
+        f"Tempo nos cargos da vaga: {candidate_data.get('role_experience_time', '')} anos\n"
         f"Média de permanência: {candidate_data.get('average_tenure', '')} anos\n"
         f"Resumo: {candidate_data.get('summary', '')}\n"
     )
@@ -541,6 +542,7 @@ def calculate_adherence_batch_for_candidates(
             f"Certificações: {candidate_data.get('certifications', '')}\n"
             f"Senioridade: {candidate_data.get('seniority', '')}\n"
             f"Tempo de experiência: {candidate_data.get('experience_time', '')} anos\n"
+            f"Tempo nos cargos da vaga: {candidate_data.get('role_experience_time', '')} anos\n"
             f"Média de permanência: {candidate_data.get('average_tenure', '')} anos\n"
             f"Resumo: {candidate_data.get('summary', '')}\n"
         )
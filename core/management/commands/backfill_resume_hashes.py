@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.resume_storage import backfill_resume_hashes
+
+
+class Command(BaseCommand):
+    help = "Move para o armazenamento por hash (resumes/blobs) os currículos de candidatos ainda sem resume_sha256."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas conta os candidatos que seriam atualizados.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        result = backfill_resume_hashes(dry_run=dry_run)
+        action = "seriam atualizados" if dry_run else "atualizados"
+        self.stdout.write(
+            self.style.SUCCESS(f"{result['updated']} candidato(s) {action}, {result['missing']} sem PDF no storage.")
+        )
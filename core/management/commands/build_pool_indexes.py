@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.keyword_index import keyword_indexes
+from core.models import Candidate
+from core.pool_cache import SHARED_SCOPE
+from core.semantic_index import semantic_indexes
+
+STORES = {"semantic": semantic_indexes, "keywords": keyword_indexes}
+
+
+class Command(BaseCommand):
+    help = "Reconstrói os índices dos bancos de talentos (busca semântica e ranking BM25)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scope", help="Só este banco (ex.: shared, user_12).")
+        parser.add_argument("--only", choices=sorted(STORES), help="Só este índice.")
+
+    def handle(self, *args, **options):
+        scopes = [options["scope"]] if options["scope"] else [SHARED_SCOPE] + [
+            f"user_{user_id}" for user_id in Candidate.objects.values_list("user_id", flat=True).distinct().order_by()
+        ]
+        names = [options["only"]] if options["only"] else sorted(STORES)
+        for name in names:
+            for scope in scopes:
+                index = STORES[name].build(scope)
+                self.stdout.write(f"{name} {scope}: {len(index.ids)} candidato(s)")
+        self.stdout.write(self.style.SUCCESS(f"{len(names) * len(scopes)} índice(s) reconstruído(s)."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.resume_storage import collect_unreferenced_resumes
+
+
+class Command(BaseCommand):
+    help = "Remove currículos PDF (media/resumes) que não são referenciados por nenhum candidato."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas lista os arquivos que seriam removidos.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        result = collect_unreferenced_resumes(dry_run=dry_run)
+        for name in result["removed_names"]:
+            self.stdout.write(name)
+        action = "seriam removidos" if dry_run else "removidos"
+        self.stdout.write(
+            self.style.SUCCESS(f"{result['removed']} de {result['scanned']} arquivo(s) {action}.")
+        )
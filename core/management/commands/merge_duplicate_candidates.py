@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.dedup import find_duplicates, merge_duplicates
+from core.job_matching import match_candidates
+from core.keyword_index import keyword_indexes
+from core.semantic_index import semantic_indexes
+
+
+class Command(BaseCommand):
+    help = "Funde candidatos duplicados do mesmo usuário e marca as duplicatas entre usuários."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Só os candidatos deste usuário (id).")
+        parser.add_argument(
+            "--fuzzy", action="store_true",
+            help="Inclui mesmo nome com perfil quase igual (SimHash), além de URL do LinkedIn e PDF iguais.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Só lista os grupos, sem fundir nada.")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            groups = find_duplicates(user_id=options["user"], fuzzy=options["fuzzy"])
+            for group in groups:
+                self.stdout.write(", ".join(f"#{candidate.id} (usuário {candidate.user_id})" for candidate in group))
+            self.stdout.write(self.style.SUCCESS(f"{len(groups)} grupo(s) de duplicatas."))
+            return
+        result = merge_duplicates(user_id=options["user"], fuzzy=options["fuzzy"])
+        if result["survivors"]:
+            match_candidates(result["survivors"])
+        # Os apagados saem dos índices pelo signal; quem mudou de duplicate_of é reavaliado no banco compartilhado
+        changed = result["survivors"] + result["relinked"]
+        if changed:
+            for store in (semantic_indexes, keyword_indexes):
+                store.add_candidates(changed, flush=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['merged']} candidato(s) fundido(s), {result['linked']} marcado(s) como duplicata de outro usuário."
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.experience import replace_experiences
+from core.models import Candidate
+from core.pdf_extractor import stored_resume_experience
+
+
+class Command(BaseCommand):
+    help = "Preenche a linha do tempo de experiências (CandidateExperience) a partir dos currículos armazenados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--missing-only", action="store_true", help="Só candidatos ainda sem experiências.")
+
+    def handle(self, *args, **options):
+        candidates = Candidate.objects.exclude(resume_pdf="").exclude(resume_pdf__isnull=True)
+        if options["missing_only"]:
+            candidates = candidates.filter(experiences__isnull=True)
+        # Currículos idênticos compartilham o arquivo: cada PDF é lido uma vez
+        by_resume = {}
+        done = failed = 0
+        for candidate in candidates.only("id", "resume_pdf", "resume_sha256").iterator(chunk_size=500):
+            try:
+                resume_key = candidate.resume_sha256 or candidate.resume_pdf.name
+                if resume_key not in by_resume:
+                    by_resume[resume_key] = stored_resume_experience(candidate)
+                replace_experiences(candidate.id, by_resume[resume_key])
+                done += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Candidato {candidate.id}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"{done} candidato(s) atualizado(s), {failed} com erro."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.autocomplete import rebuild_pool_terms
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o dicionário de autocomplete (PoolTerm) a partir de todos os candidatos."
+
+    def handle(self, *args, **options):
+        total = rebuild_pool_terms()
+        self.stdout.write(self.style.SUCCESS(f"{total} termo(s) no dicionário de autocomplete."))
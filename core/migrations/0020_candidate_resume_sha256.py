@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_add_candidate_resume_pdf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='resume_sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 do PDF. Currículos idênticos compartilham o mesmo arquivo.', max_length=64, verbose_name='Hash do currículo'),
+        ),
+    ]
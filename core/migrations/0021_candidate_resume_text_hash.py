@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_candidate_resume_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='extracted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Extraído pela IA em'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='resume_text_sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 do texto extraído do PDF. Usado para pular a extração por IA de currículos sem alteração.', max_length=64, verbose_name='Hash do texto do currículo'),
+        ),
+    ]
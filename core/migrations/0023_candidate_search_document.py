@@ -0,0 +1,39 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_import_run'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Configurações de busca sem acento: português e inglês (unaccent antes do stemming)
+        migrations.RunSQL(
+            sql="""
+                CREATE TEXT SEARCH CONFIGURATION talent_pt (COPY = portuguese);
+                ALTER TEXT SEARCH CONFIGURATION talent_pt
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+                CREATE TEXT SEARCH CONFIGURATION talent_en (COPY = english);
+                ALTER TEXT SEARCH CONFIGURATION talent_en
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, english_stem;
+            """,
+            reverse_sql="""
+                DROP TEXT SEARCH CONFIGURATION IF EXISTS talent_en;
+                DROP TEXT SEARCH CONFIGURATION IF EXISTS talent_pt;
+            """,
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='search_document',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', 'current_title', config='talent_pt', weight='A'), '||', django.contrib.postgres.search.SearchVector('skills', 'technologies', config='talent_pt', weight='B'), django.contrib.postgres.search.SearchConfig('talent_pt')), '||', django.contrib.postgres.search.SearchVector('current_company', 'location', 'seniority', 'languages', 'certifications', config='talent_pt', weight='C'), django.contrib.postgres.search.SearchConfig('talent_pt')), '||', django.contrib.postgres.search.SearchVector('summary', config='talent_pt', weight='D'), django.contrib.postgres.search.SearchConfig('talent_pt')), '||', django.contrib.postgres.search.SearchVector('skills', 'technologies', config='talent_en', weight='B'), django.contrib.postgres.search.SearchConfig('talent_pt')), '||', django.contrib.postgres.search.SearchVector('summary', config='talent_en', weight='D'), django.contrib.postgres.search.SearchConfig('talent_pt')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='core_candidate_search_gin'),
+        ),
+    ]
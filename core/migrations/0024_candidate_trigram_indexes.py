@@ -0,0 +1,64 @@
+import core.search
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_candidate_search_document'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        # unaccent() é STABLE (depende do dicionário configurado); fixar o dicionário permite
+        # marcar o wrapper como IMMUTABLE e usá-lo em índices de expressão.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+                    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+                    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS immutable_unaccent(text);",
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('name'))), name='gin_trgm_ops'), name='cand_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('current_title'))), name='gin_trgm_ops'), name='cand_current_title_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('current_company'))), name='gin_trgm_ops'), name='cand_current_company_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('location'))), name='gin_trgm_ops'), name='cand_location_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('seniority'))), name='gin_trgm_ops'), name='cand_seniority_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('skills'))), name='gin_trgm_ops'), name='cand_skills_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('technologies'))), name='gin_trgm_ops'), name='cand_technologies_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('languages'))), name='gin_trgm_ops'), name='cand_languages_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(core.search.ImmutableUnaccent(models.F('certifications'))), name='gin_trgm_ops'), name='cand_certifications_trgm'),
+        ),
+    ]
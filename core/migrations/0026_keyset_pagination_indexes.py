@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_candidate_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='cand_user_updated_id'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-updated_at', '-id'], name='cand_updated_id'),
+        ),
+        migrations.AddIndex(
+            model_name='candidatejob',
+            index=models.Index(models.F('job'), models.OrderBy(models.F('adherence_score'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), name='cj_job_adherence_id'),
+        ),
+    ]
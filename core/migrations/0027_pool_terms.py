@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+# Cópia congelada da reconstrução de core.autocomplete no momento desta migração
+_REBUILD_SOURCES = """
+    SELECT user_id, 'technologies' AS field, lower(immutable_unaccent(tag)) AS key, tag AS term
+    FROM core_candidate, unnest(technology_tags) AS tag
+    UNION ALL
+    SELECT user_id, 'skills', lower(immutable_unaccent(tag)), tag FROM core_candidate, unnest(skill_tags) AS tag
+    UNION ALL
+    SELECT user_id, 'company', left(lower(immutable_unaccent(btrim(current_company))), 255), left(btrim(current_company), 255)
+    FROM core_candidate WHERE btrim(current_company) <> ''
+    UNION ALL
+    SELECT user_id, 'location', left(lower(immutable_unaccent(btrim(location))), 255), left(btrim(location), 255)
+    FROM core_candidate WHERE btrim(location) <> ''
+"""
+REBUILD_SQL = f"""
+DELETE FROM core_poolterm;
+INSERT INTO core_poolterm (scope, field, key, term, count)
+SELECT 'user_' || user_id, field, key, max(term), count(*) FROM ({_REBUILD_SOURCES}) terms GROUP BY user_id, field, key;
+INSERT INTO core_poolterm (scope, field, key, term, count)
+SELECT 'shared', field, key, max(term), count(*) FROM ({_REBUILD_SOURCES}) terms GROUP BY field, key;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PoolTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=32)),
+                ('field', models.CharField(choices=[('technologies', 'Tecnologias'), ('skills', 'Skills'), ('company', 'Empresa'), ('location', 'Localização')], max_length=16)),
+                ('key', models.CharField(max_length=255)),
+                ('term', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope', 'field', 'key'], name='core_poolterm_prefix', opclasses=['varchar_pattern_ops', 'varchar_pattern_ops', 'varchar_pattern_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'field', 'key'), name='core_poolterm_unique')],
+            },
+        ),
+        # Dicionário inicial a partir dos candidatos existentes
+        migrations.RunSQL(REBUILD_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_pool_terms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('matched_terms', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_suggestions', to='core.candidate')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to='core.job')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['job', '-score'], name='core_jobsuggestion_job_score')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'candidate'), name='core_jobsuggestion_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,98 @@
+import hashlib
+import re
+import unicodedata
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import numpy as np
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# Cópia congelada de core.minhash (e de text_tokens de core.search) no momento desta migração:
+# mudanças posteriores nas permutações ou nas faixas não alteram o que ela grava.
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+_PRIME = (1 << 31) - 1
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+_STOPWORDS = frozenset("""
+a ao aos as com da das de do dos e em na nas no nos o os ou para por que se um uma
+an and at by for from in is of on or the to with
+""".split())
+
+
+def _hash32(value):
+    return int.from_bytes(hashlib.blake2b(value, digest_size=4).digest(), 'little')
+
+
+_A = np.array([_hash32(f'a{i}'.encode()) % (_PRIME - 1) + 1 for i in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+_B = np.array([_hash32(f'b{i}'.encode()) % _PRIME for i in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+
+
+def _text_tokens(text):
+    normalized = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in normalized if not unicodedata.combining(char)).lower()
+    return [token for token in _TOKEN_RE.findall(text) if token not in _STOPWORDS]
+
+
+def candidate_minhash(current_title, technology_tags, skill_tags):
+    tokens = {*(technology_tags or []), *(skill_tags or []), *_text_tokens(current_title)}
+    if not tokens:
+        return b'', []
+    values = np.array([_hash32(token.encode()) % _PRIME for token in tokens], dtype=np.uint64)
+    signature = ((_A[:, None] * values[None, :] + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'little', signed=True))
+    return signature.tobytes(), buckets
+
+
+def backfill_minhash(apps, schema_editor):
+    Candidate = apps.get_model('core', 'Candidate')
+    batch = []
+    candidates = Candidate.objects.only('id', 'current_title', 'technology_tags', 'skill_tags').order_by('id')
+    for candidate in candidates.iterator(chunk_size=BATCH_SIZE):
+        candidate.minhash_signature, candidate.lsh_buckets = candidate_minhash(
+            candidate.current_title, candidate.technology_tags, candidate.skill_tags
+        )
+        batch.append(candidate)
+        if len(batch) >= BATCH_SIZE:
+            Candidate.objects.bulk_update(batch, ['minhash_signature', 'lsh_buckets'])
+            batch = []
+    if batch:
+        Candidate.objects.bulk_update(batch, ['minhash_signature', 'lsh_buckets'])
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_job_suggestions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='lsh_buckets',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='minhash_signature',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        # Índice criado depois do backfill
+        migrations.RunPython(backfill_minhash, noop),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['lsh_buckets'], name='cand_lsh_buckets_gin'),
+        ),
+    ]
@@ -0,0 +1,140 @@
+import hashlib
+import re
+import unicodedata
+from urllib.parse import unquote, urlsplit
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# Cópia congelada das chaves de core.dedup (e de normalize_term/text_tokens de core.search) no
+# momento desta migração: mudanças posteriores no app não alteram o que ela grava.
+SIMHASH_BITS = 64
+SIMHASH_FIELDS = {
+    'name': 3,
+    'current_title': 2,
+    'current_company': 2,
+    'location': 1,
+    'skills': 1,
+    'technologies': 1,
+    'summary': 1,
+}
+DEDUP_SOURCE_FIELDS = ('linkedin_url', *SIMHASH_FIELDS)
+_LOCALE_RE = re.compile(r'^[a-z]{2}([-_][a-z]{2})?$')
+_PROFILE_PATH_RE = re.compile(r'^/(in|pub)/([^/]+)')
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+_STOPWORDS = frozenset("""
+a ao aos as com da das de do dos e em na nas no nos o os ou para por que se um uma
+an and at by for from in is of on or the to with
+""".split())
+
+
+def _normalize_term(value):
+    normalized = unicodedata.normalize('NFKD', value)
+    return ''.join(char for char in normalized if not unicodedata.combining(char)).lower()
+
+
+def _text_tokens(text):
+    return [token for token in _TOKEN_RE.findall(_normalize_term(text or '')) if token not in _STOPWORDS]
+
+
+def _canonical_linkedin_url(url):
+    value = (url or '').strip().lower()
+    if not value:
+        return ''
+    if '://' not in value:
+        value = f"https://{value.lstrip('/')}"
+    parts = urlsplit(value)
+    host = parts.hostname or ''
+    path = unquote(parts.path)
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        match = _PROFILE_PATH_RE.match(path)
+        if match:
+            return f'linkedin.com/{match.group(1)}/{match.group(2)}'
+        host = 'linkedin.com'
+    segments = [segment for segment in path.split('/') if segment]
+    if segments and _LOCALE_RE.match(segments[-1]) and len(segments) > 2:
+        segments = segments[:-1]
+    return '/'.join([host, *segments])
+
+
+def _name_key(name):
+    return ' '.join(sorted(_normalize_term(name or '').split()))[:160]
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'little')
+
+
+def _simhash(values):
+    weights = [0] * SIMHASH_BITS
+    found = False
+    for field, weight in SIMHASH_FIELDS.items():
+        tokens = _text_tokens(values.get(field) or '')
+        features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            found = True
+            value = _feature_hash(f'{field}:{feature}')
+            for bit in range(SIMHASH_BITS):
+                weights[bit] += weight if value >> bit & 1 else -weight
+    if not found:
+        return None
+    fingerprint = sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def dedup_keys(values):
+    return _canonical_linkedin_url(values.get('linkedin_url')), _name_key(values.get('name')), _simhash(values)
+
+
+def backfill_dedup_keys(apps, schema_editor):
+    Candidate = apps.get_model('core', 'Candidate')
+    batch = []
+    candidates = Candidate.objects.only('id', *DEDUP_SOURCE_FIELDS).order_by('id')
+    for candidate in candidates.iterator(chunk_size=BATCH_SIZE):
+        candidate.linkedin_key, candidate.name_key, candidate.simhash = dedup_keys(
+            {field: getattr(candidate, field) for field in DEDUP_SOURCE_FIELDS}
+        )
+        batch.append(candidate)
+        if len(batch) >= BATCH_SIZE:
+            Candidate.objects.bulk_update(batch, ['linkedin_key', 'name_key', 'simhash'])
+            batch = []
+    if batch:
+        Candidate.objects.bulk_update(batch, ['linkedin_key', 'name_key', 'simhash'])
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_candidate_minhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='core.candidate'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='linkedin_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='name_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=160),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        # A fusão das duplicatas já existentes fica com o comando merge_duplicate_candidates
+        migrations.RunPython(backfill_dedup_keys, noop),
+    ]
@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+# Cópia congelada das regras de fusão de core.dedup no momento desta migração: etapas do funil
+# em ordem, campos completados a partir dos duplicados (com a coluna de tags derivada, quando há).
+PIPELINE_STAGES = [
+    'PRIMEIRO_CONTATO', 'RESPONDEU', 'ENTREVISTA', 'ENTREVISTA_TECNICA', 'ENVIADO_GESTOR',
+    'CANDIDATO_PRONTO', 'ENVIADO_CLIENTE', 'CONTRATADO',
+]
+FILL_FIELDS = {
+    'current_title': None,
+    'current_company': None,
+    'location': None,
+    'summary': None,
+    'skills': 'skill_tags',
+    'technologies': 'technology_tags',
+    'languages': 'language_tags',
+    'certifications': 'certification_tags',
+    'seniority': None,
+    'experience_time': None,
+    'average_tenure': None,
+}
+
+
+def _merge_into(Candidate, CandidateJob, survivor, duplicates):
+    for field, tags_field in FILL_FIELDS.items():
+        if getattr(survivor, field) in ('', None):
+            for candidate in duplicates:
+                if getattr(candidate, field) not in ('', None):
+                    setattr(survivor, field, getattr(candidate, field))
+                    if tags_field:
+                        setattr(survivor, tags_field, getattr(candidate, tags_field))
+                    break
+    ready_dates = [c.ready_at for c in (survivor, *duplicates) if c.ready_at]
+    survivor.ready_at = max(ready_dates) if ready_dates else None
+    if not survivor.resume_pdf:
+        donor = next((c for c in duplicates if c.resume_pdf), None)
+        if donor:
+            survivor.resume_pdf, survivor.resume_sha256 = donor.resume_pdf.name, donor.resume_sha256
+
+    duplicate_ids = [candidate.id for candidate in duplicates]
+    survivor_links = {link.job_id: link for link in CandidateJob.objects.filter(candidate=survivor)}
+    for link in CandidateJob.objects.filter(candidate_id__in=duplicate_ids).order_by('-updated_at'):
+        current = survivor_links.get(link.job_id)
+        if current is None:
+            CandidateJob.objects.filter(id=link.id).update(candidate=survivor)
+            survivor_links[link.job_id] = link
+            continue
+        if link.pipeline_status in PIPELINE_STAGES and (
+            current.pipeline_status not in PIPELINE_STAGES
+            or PIPELINE_STAGES.index(link.pipeline_status) > PIPELINE_STAGES.index(current.pipeline_status)
+        ):
+            current.pipeline_status, current.ready_at = link.pipeline_status, link.ready_at
+        if link.adherence_score is not None and (
+            current.adherence_score is None or link.adherence_score > current.adherence_score
+        ):
+            current.adherence_score = link.adherence_score
+            current.technical_justification = link.technical_justification
+        current.save()
+    Candidate.objects.filter(duplicate_of_id__in=duplicate_ids).update(duplicate_of=survivor)
+    Candidate.objects.filter(id__in=duplicate_ids).delete()
+    survivor.save()
+
+
+def merge_same_user_urls(apps, schema_editor):
+    """
+    Candidatos do mesmo usuário com a mesma URL em variações diferentes (que a restrição antiga,
+    sensível a maiúsculas, permitia): fica o de extração mais recente, com os vínculos às vagas
+    (etapa mais avançada e maior aderência quando os dois estão na mesma vaga). Casos mais
+    amplos (nome + SimHash) ficam com o comando merge_duplicate_candidates.
+    """
+    Candidate = apps.get_model('core', 'Candidate')
+    CandidateJob = apps.get_model('core', 'CandidateJob')
+    repeated = (
+        Candidate.objects.exclude(linkedin_key='').values('user_id', 'linkedin_key')
+        .annotate(total=Count('id')).filter(total__gt=1).order_by()
+    )
+    for row in repeated:
+        members = sorted(
+            Candidate.objects.filter(user_id=row['user_id'], linkedin_key=row['linkedin_key']),
+            key=lambda c: (c.extracted_at is not None, c.extracted_at or c.updated_at, c.updated_at),
+        )
+        _merge_into(Candidate, CandidateJob, members[-1], members[:-1])
+    # Checa agora as FKs adiadas: o ALTER TABLE seguinte, na mesma transação, falha com elas pendentes
+    schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_candidate_dedup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_same_user_urls, noop),
+        migrations.RemoveConstraint(
+            model_name='candidate',
+            name='core_candidate_user_linkedin_unique',
+        ),
+        migrations.AddConstraint(
+            model_name='candidate',
+            constraint=models.UniqueConstraint(condition=models.Q(('linkedin_key', ''), _negated=True), fields=('user', 'linkedin_key'), name='core_candidate_user_linkedin_key_unique'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_candidate_linkedin_key_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateExperience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('company', models.CharField(blank=True, max_length=160)),
+                ('title', models.CharField(blank=True, max_length=160)),
+                ('location', models.CharField(blank=True, max_length=160)),
+                ('months', models.PositiveIntegerField(default=0)),
+                ('company_key', models.CharField(blank=True, editable=False, max_length=160)),
+                ('title_key', models.CharField(blank=True, editable=False, max_length=160)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='experiences', to='core.candidate')),
+            ],
+            options={
+                'ordering': ['candidate', 'position'],
+                'indexes': [django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('title_key', name='gin_trgm_ops'), name='candexp_title_trgm'), django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('company_key', name='gin_trgm_ops'), name='candexp_company_trgm')],
+                'constraints': [models.UniqueConstraint(fields=('candidate', 'position'), name='core_candexp_candidate_position_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# Cópia congelada de core.role_families (e de text_tokens de core.search) no momento desta
+# migração: mudanças posteriores nas famílias não alteram o que ela grava.
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+_STOPWORDS = frozenset("""
+a ao aos as com da das de do dos e em na nas no nos o os ou para por que se um uma
+an and at by for from in is of on or the to with
+""".split())
+
+ROLE_FAMILIES = {
+    "data_engineer": ("engenheiro de dados", "engenheira de dados", "engenharia de dados", "data engineer", "analytics engineer", "big data"),
+    "data_scientist": ("cientista de dados", "ciência de dados", "data scientist", "data science"),
+    "data_analyst": ("analista de dados", "data analyst", "analista de bi", "bi analyst", "business intelligence", "analista de business intelligence"),
+    "ml_engineer": ("machine learning", "ml engineer", "mlops", "ai engineer", "engenheiro de ia", "engenheira de ia", "engenheiro de inteligência artificial"),
+    "backend_developer": ("backend", "back end", "back-end"),
+    "frontend_developer": ("frontend", "front end", "front-end"),
+    "fullstack_developer": ("fullstack", "full stack", "full-stack"),
+    "mobile_developer": ("mobile", "android", "ios", "react native", "flutter"),
+    "software_engineer": (
+        "software engineer", "engenheiro de software", "engenheira de software", "desenvolvedor", "desenvolvedora",
+        "developer", "programador", "programadora", "analista de sistemas", "analista desenvolvedor", "software developer",
+    ),
+    "devops_engineer": ("devops", "sre", "site reliability", "platform engineer", "engenheiro de plataforma", "cloud engineer", "engenheiro cloud", "engenheiro de cloud", "infraestrutura", "infrastructure"),
+    "qa_engineer": ("qa", "quality assurance", "analista de testes", "analista de qualidade", "tester", "test engineer", "sdet"),
+    "security_engineer": ("segurança da informação", "cybersecurity", "cibersegurança", "security engineer", "analista de segurança"),
+    "database_administrator": ("dba", "database administrator", "administrador de banco de dados"),
+    "product_manager": ("product manager", "gerente de produto", "product owner", "po", "head de produto", "head of product"),
+    "project_manager": ("project manager", "gerente de projetos", "gerente de projeto", "scrum master", "agile coach"),
+    "designer": ("ux", "ui", "product designer", "designer"),
+    "engineering_manager": (
+        "tech lead", "líder técnico", "lider tecnico", "technical lead", "engineering manager", "gerente de engenharia",
+        "head de engenharia", "head of engineering", "cto", "coordenador de desenvolvimento", "coordenador de ti",
+    ),
+    "support_analyst": ("suporte", "support", "help desk", "service desk"),
+}
+
+
+def _text_tokens(text):
+    normalized = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in normalized if not unicodedata.combining(char)).lower()
+    return [token for token in _TOKEN_RE.findall(text) if token not in _STOPWORDS]
+
+
+_FAMILY_PATTERNS = {
+    family: tuple(tuple(_text_tokens(pattern)) for pattern in patterns)
+    for family, patterns in ROLE_FAMILIES.items()
+}
+
+
+def _contains(tokens, pattern):
+    size = len(pattern)
+    return any(tokens[start:start + size] == pattern for start in range(len(tokens) - size + 1))
+
+
+def role_family_months(experiences):
+    months = {}
+    for title, duration in experiences:
+        tokens = tuple(_text_tokens(title))
+        for family, patterns in _FAMILY_PATTERNS.items():
+            if tokens and any(pattern and _contains(tokens, pattern) for pattern in patterns):
+                months[family] = months.get(family, 0) + (duration or 0)
+    return months
+
+
+def backfill_role_years(apps, schema_editor):
+    CandidateExperience = apps.get_model('core', 'CandidateExperience')
+    CandidateRoleYears = apps.get_model('core', 'CandidateRoleYears')
+    by_candidate = {}
+    for candidate_id, title_key, months in (
+        CandidateExperience.objects.order_by('candidate_id').values_list('candidate_id', 'title_key', 'months').iterator(chunk_size=2000)
+    ):
+        by_candidate.setdefault(candidate_id, []).append((title_key, months))
+    rows = [
+        CandidateRoleYears(candidate_id=candidate_id, family=family, months=months)
+        for candidate_id, experiences in by_candidate.items()
+        for family, months in role_family_months(experiences).items()
+    ]
+    CandidateRoleYears.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_candidate_experience'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateRoleYears',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('family', models.CharField(max_length=40)),
+                ('months', models.PositiveIntegerField()),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='role_years', to='core.candidate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['family', 'months'], name='crole_family_months')],
+                'constraints': [models.UniqueConstraint(fields=('candidate', 'family'), name='core_crole_candidate_family_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_role_years, noop),
+    ]
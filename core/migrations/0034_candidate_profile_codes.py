@@ -0,0 +1,116 @@
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# Cópia congelada de core.profile_codes (e de tag_key de core.tags) no momento desta migração:
+# mudanças posteriores nos níveis ou nos bits não alteram o que ela grava.
+SENIORITY_LEVELS = {
+    'trainee': 1,
+    'estagiario': 1,
+    'estagio': 1,
+    'intern': 1,
+    'junior': 2,
+    'jr': 2,
+    'pleno': 3,
+    'mid': 3,
+    'intermediate': 3,
+    'senior': 4,
+    'sr': 4,
+    'especialista': 5,
+    'specialist': 5,
+    'staff': 5,
+    'principal': 5,
+}
+LANGUAGE_BITS = {
+    'portugues': 1 << 0,
+    'ingles': 1 << 1,
+    'espanhol': 1 << 2,
+    'frances': 1 << 3,
+    'alemao': 1 << 4,
+    'italiano': 1 << 5,
+    'japones': 1 << 6,
+    'mandarim': 1 << 7,
+}
+MAX_TAG_LENGTH = 80
+_WORD_RE = re.compile(r'[a-z]+')
+
+
+def _tag_key(value):
+    normalized = unicodedata.normalize('NFKD', value)
+    value = ''.join(ch for ch in normalized if not unicodedata.combining(ch))
+    value = re.sub(r'\s+', ' ', value).strip().lower()
+    return value.strip(' -*·')[:MAX_TAG_LENGTH]
+
+
+def seniority_level(text):
+    levels = [SENIORITY_LEVELS.get(word, 0) for word in _WORD_RE.findall(_tag_key(text or ''))]
+    return max(levels, default=0)
+
+
+def language_mask(language_tags):
+    mask = 0
+    for tag in language_tags or []:
+        mask |= LANGUAGE_BITS.get(tag, 0)
+    return mask
+
+
+def backfill_profile_codes(apps, schema_editor):
+    Candidate = apps.get_model('core', 'Candidate')
+    batch = []
+    candidates = Candidate.objects.only('id', 'seniority', 'language_tags').order_by('id')
+    for candidate in candidates.iterator(chunk_size=BATCH_SIZE):
+        candidate.seniority_level = seniority_level(candidate.seniority)
+        candidate.language_mask = language_mask(candidate.language_tags)
+        batch.append(candidate)
+        if len(batch) >= BATCH_SIZE:
+            Candidate.objects.bulk_update(batch, ['seniority_level', 'language_mask'])
+            batch = []
+    if batch:
+        Candidate.objects.bulk_update(batch, ['seniority_level', 'language_mask'])
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_candidate_role_years'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='language_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='seniority_level',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        # Índices criados depois do backfill
+        migrations.RunPython(backfill_profile_codes, noop),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['user', 'seniority_level'], name='cand_user_seniority_level'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['seniority_level'], name='cand_seniority_level'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['user', 'language_mask'], name='cand_user_language_mask'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['language_mask'], name='cand_language_mask'),
+        ),
+    ]
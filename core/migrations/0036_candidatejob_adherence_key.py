@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0035_candidate_experience_range_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatejob',
+            name='adherence_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
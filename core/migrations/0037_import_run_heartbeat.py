@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_heartbeat(apps, schema_editor):
+    # Execuções anteriores ao heartbeat: contam a partir da criação
+    ImportRun = apps.get_model('core', 'ImportRun')
+    ImportRun.objects.filter(heartbeat_at__isnull=True).update(heartbeat_at=F('created_at'))
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_candidatejob_adherence_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importrun',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_heartbeat, noop),
+        migrations.AddIndex(
+            model_name='importrun',
+            index=models.Index(fields=['status', 'heartbeat_at'], name='core_importrun_status_beat'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# As chaves do autocomplete passam a ser calculadas só no banco, e o banco compartilhado deixa de
+# contar as duplicatas entre usuários: reconstrói o dicionário. Cópia congelada da reconstrução
+# de core.autocomplete no momento desta migração.
+_TERM_ROWS = """
+    SELECT * FROM (
+        SELECT c.user_id, c.duplicate_of_id, t.field,
+               left(lower(immutable_unaccent(btrim(t.term))), 255) AS key, left(btrim(t.term), 255) AS term
+        FROM core_candidate c CROSS JOIN LATERAL (
+            SELECT 'technologies' AS field, tag AS term FROM unnest(c.technology_tags) AS tag
+            UNION ALL SELECT 'skills', tag FROM unnest(c.skill_tags) AS tag
+            UNION ALL SELECT 'company', c.current_company
+            UNION ALL SELECT 'location', c.location
+        ) t
+    ) terms WHERE key <> ''
+"""
+REBUILD_SQL = f"""
+DELETE FROM core_poolterm;
+INSERT INTO core_poolterm (scope, field, key, term, count)
+SELECT 'user_' || user_id, field, key, max(term), count(*) FROM ({_TERM_ROWS}) terms
+GROUP BY user_id, field, key;
+INSERT INTO core_poolterm (scope, field, key, term, count)
+SELECT 'shared', field, key, max(term), count(*) FROM ({_TERM_ROWS}) terms
+WHERE duplicate_of_id IS NULL GROUP BY field, key;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0037_import_run_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunSQL(REBUILD_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0038_rebuild_pool_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='shared_pool_suggestions',
+            field=models.BooleanField(default=False),
+        ),
+    ]
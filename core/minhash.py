@@ -0,0 +1,95 @@
+"""
+Candidatos parecidos ("mais como este") por MinHash com LSH.
+
+O perfil de um candidato é o conjunto das suas tags canônicas de tecnologias e skills mais as
+palavras do cargo. Candidate.save() guarda a assinatura MinHash desse conjunto
+(NUM_PERMUTATIONS valores de 32 bits, 256 bytes em minhash_signature) e as chaves LSH de
+BANDS faixas de ROWS_PER_BAND valores (lsh_buckets, array de bigint com índice GIN).
+
+Dois candidatos com similaridade de Jaccard s caem numa mesma faixa com probabilidade
+1 - (1 - s^ROWS_PER_BAND)^BANDS (~0,89 para s = 0,6 e ~0,03 para s = 0,2). A busca de
+vizinhos é um lsh_buckets && ARRAY[...] servido pelo índice GIN, que só lê os candidatos de
+faixas em comum (não varre o banco, nem o compartilhado), e ordena esses poucos pela
+similaridade estimada pelas assinaturas.
+"""
+import hashlib
+
+import numpy as np
+
+from .search import text_tokens
+
+# Campos de texto de Candidate de que o perfil depende (as tags vêm de skills e technologies)
+MINHASH_SOURCE_FIELDS = ("current_title", "skills", "technologies")
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SIMILAR_LIMIT = 10
+MIN_SIMILARITY = 0.2
+# Teto de candidatos lidos das faixas em comum antes de ordenar pela similaridade
+MAX_BUCKET_CANDIDATES = 500
+
+_PRIME = (1 << 31) - 1
+
+
+def _hash32(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=4).digest(), "little")
+
+
+# Permutações h(x) = (a * x + b) mod p; coeficientes derivados do índice, estáveis entre processos
+_A = np.array([_hash32(f"a{i}".encode()) % (_PRIME - 1) + 1 for i in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+_B = np.array([_hash32(f"b{i}".encode()) % _PRIME for i in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+
+
+def profile_tokens(current_title: str, technology_tags, skill_tags) -> set[str]:
+    return {*(technology_tags or []), *(skill_tags or []), *text_tokens(current_title)}
+
+
+def minhash_signature(tokens: set[str]) -> np.ndarray | None:
+    if not tokens:
+        return None
+    values = np.array([_hash32(token.encode()) % _PRIME for token in tokens], dtype=np.uint64)
+    return ((_A[:, None] * values[None, :] + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def lsh_buckets(signature: np.ndarray | None) -> list[int]:
+    """Uma chave bigint por faixa (o número da faixa entra no hash, então faixas não colidem entre si)."""
+    if signature is None:
+        return []
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def candidate_minhash(current_title: str, technology_tags, skill_tags) -> tuple[bytes, list[int]]:
+    """(minhash_signature, lsh_buckets) do candidato; vazios se não há tags nem cargo."""
+    signature = minhash_signature(profile_tokens(current_title, technology_tags, skill_tags))
+    return (signature.tobytes() if signature is not None else b""), lsh_buckets(signature)
+
+
+def estimated_similarity(signature: bytes, other: bytes) -> float:
+    """Fração de permutações com o mesmo mínimo: estimativa do Jaccard dos dois perfis."""
+    if not signature or not other:
+        return 0.0
+    return float(np.mean(np.frombuffer(signature, dtype=np.uint32) == np.frombuffer(other, dtype=np.uint32)))
+
+
+def similar_candidates(candidate, candidates, limit: int = SIMILAR_LIMIT) -> list[tuple[object, float]]:
+    """
+    (candidato, similaridade) dos mais parecidos com `candidate` dentro do queryset
+    `candidates` (o banco do usuário ou o compartilhado), do mais parecido ao menos.
+    """
+    if not candidate.lsh_buckets:
+        return []
+    neighbors = (
+        candidates.filter(lsh_buckets__overlap=candidate.lsh_buckets)
+        .exclude(id=candidate.id)
+        .defer("search_document")[:MAX_BUCKET_CANDIDATES]
+    )
+    signature = bytes(candidate.minhash_signature)
+    scored = [(neighbor, estimated_similarity(signature, bytes(neighbor.minhash_signature))) for neighbor in neighbors]
+    scored = [(neighbor, similarity) for neighbor, similarity in scored if similarity >= MIN_SIMILARITY]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:limit]
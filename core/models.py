@@ -1,7 +1,17 @@
 import uuid
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, Q
+
+from .dedup import DEDUP_SOURCE_FIELDS, dedup_keys
+from .minhash import MINHASH_SOURCE_FIELDS, candidate_minhash
+from .profile_codes import language_mask, seniority_level
+from .search import TRIGRAM_FIELDS, search_document_expression, unaccent_lower
+from .tags import MAX_TAG_LENGTH, TAG_FIELDS, canonical_tags
 
 
 def resume_upload_to(instance, filename):
@@ -77,6 +87,8 @@ class Job(models.Model):
     boolean_search = models.TextField(blank=True)
     notes = models.TextField(blank=True)
     status = models.CharField(max_length=32, choices=Status.choices, default=Status.OPEN)
+    # Sugestões contínuas (core.job_matching) também com candidatos do banco compartilhado (PREMIUM)
+    shared_pool_suggestions = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -86,6 +98,37 @@ class Job(models.Model):
         return self.title
 
 
+class CandidateQuerySet(models.QuerySet):
+    # bulk_create/bulk_update não passam por save(): derivam os mesmos campos aqui
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.derive_fields()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        derived = set()
+        for obj in objs:
+            derived |= obj.derive_fields(fields)
+        return super().bulk_update(objs, [*fields, *sorted(derived - set(fields))], *args, **kwargs)
+
+    def pool(self, user_id, shared_pool: bool = False):
+        """Banco de talentos: os candidatos do usuário ou o compartilhado, sem as duplicatas entre usuários."""
+        if shared_pool:
+            return self.filter(duplicate_of__isnull=True)
+        return self.filter(user_id=user_id)
+
+
+class CandidateManager(models.Manager.from_queryset(CandidateQuerySet)):
+    def get_queryset(self):
+        # O tsvector de busca só é usado em filtros e no ts_rank, dentro do banco, e é a maior
+        # coluna da linha. Nenhum código Python lê o valor, e o Django já o trata como adiado
+        # depois de um save() (coluna gerada); adiar aqui vale também para os
+        # Candidate.objects.get() dos formulários e das importações.
+        return super().get_queryset().defer('search_document')
+
+
 class Candidate(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -113,21 +156,182 @@ class Candidate(models.Model):
         null=True,
         help_text="PDF do currículo do candidato. Usado para avaliação mais precisa quando vinculado a uma vaga.",
     )
+    resume_sha256 = models.CharField(
+        "Hash do currículo",
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 do PDF. Currículos idênticos compartilham o mesmo arquivo.",
+    )
+    resume_text_sha256 = models.CharField(
+        "Hash do texto do currículo",
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 do texto extraído do PDF. Usado para pular a extração por IA de currículos sem alteração.",
+    )
+    extracted_at = models.DateTimeField("Extraído pela IA em", null=True, blank=True)
+    # Tags canônicas derivadas dos campos de texto (preenchidas no save)
+    skill_tags = ArrayField(models.CharField(max_length=MAX_TAG_LENGTH), default=list, blank=True, editable=False)
+    technology_tags = ArrayField(models.CharField(max_length=MAX_TAG_LENGTH), default=list, blank=True, editable=False)
+    language_tags = ArrayField(models.CharField(max_length=MAX_TAG_LENGTH), default=list, blank=True, editable=False)
+    certification_tags = ArrayField(models.CharField(max_length=MAX_TAG_LENGTH), default=list, blank=True, editable=False)
+    # Senioridade ordinal e idiomas em bits (core.profile_codes), para filtros por comparação
+    seniority_level = models.PositiveSmallIntegerField(default=0, editable=False)
+    language_mask = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Assinatura MinHash e chaves LSH do perfil (tags e cargo) para candidatos parecidos (core.minhash)
+    minhash_signature = models.BinaryField(default=b'', blank=True, editable=False)
+    lsh_buckets = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
+    # Chaves de duplicata (core.dedup): URL canônica, nome normalizado e SimHash do perfil
+    linkedin_key = models.CharField(max_length=300, blank=True, db_index=True, editable=False)
+    name_key = models.CharField(max_length=160, blank=True, db_index=True, editable=False)
+    simhash = models.BigIntegerField(null=True, blank=True, editable=False)
+    # Mesma pessoa importada por outro usuário: fica fora do banco compartilhado
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='duplicates',
+    )
+    search_document = models.GeneratedField(
+        expression=search_document_expression(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CandidateManager()
+
     class Meta:
         ordering = ['-updated_at', '-created_at']
+        indexes = [
+            # Paginação por cursor: (updated_at, id) decrescente, no banco do usuário e no compartilhado
+            models.Index(fields=['user', '-updated_at', '-id'], name='cand_user_updated_id'),
+            models.Index(fields=['-updated_at', '-id'], name='cand_updated_id'),
+            GinIndex(fields=['search_document'], name='core_candidate_search_gin'),
+            # Filtros por substring sem acento: lower(immutable_unaccent(coluna)) LIKE '%termo%'
+            *[
+                GinIndex(OpClass(unaccent_lower(field), name='gin_trgm_ops'), name=f'cand_{field}_trgm')
+                for field in TRIGRAM_FIELDS
+            ],
+            # Filtros exatos por tag: @> (todas), && (qualquer)
+            *[GinIndex(fields=[tags_field], name=f'cand_{tags_field}_gin') for tags_field in TAG_FIELDS.values()],
+            # Candidatos parecidos: faixas LSH em comum (&&)
+            GinIndex(fields=['lsh_buckets'], name='cand_lsh_buckets_gin'),
+            # "Pleno ou acima" e "Inglês e Espanhol", no banco do usuário e no compartilhado
+            models.Index(fields=['user', 'seniority_level'], name='cand_user_seniority_level'),
+            models.Index(fields=['seniority_level'], name='cand_seniority_level'),
+            models.Index(fields=['user', 'language_mask'], name='cand_user_language_mask'),
+            models.Index(fields=['language_mask'], name='cand_language_mask'),
+            # Filtros de faixa (core.experience.EXPERIENCE_RANGE_FILTERS)
+            models.Index(fields=['user', 'experience_time'], name='cand_user_experience_time'),
+            models.Index(fields=['experience_time'], name='cand_experience_time'),
+            models.Index(fields=['user', 'average_tenure'], name='cand_user_average_tenure'),
+            models.Index(fields=['average_tenure'], name='cand_average_tenure'),
+        ]
         constraints = [
+            # Buscas por URL usam a chave canônica (minúscula, sem variações): única por usuário,
+            # e o índice simples de linkedin_key atende o banco compartilhado
             models.UniqueConstraint(
-                fields=('user', 'linkedin_url'),
-                name='core_candidate_user_linkedin_unique',
+                fields=('user', 'linkedin_key'),
+                condition=~Q(linkedin_key=''),
+                name='core_candidate_user_linkedin_key_unique',
             ),
         ]
 
     def __str__(self) -> str:
         return self.name
 
+    def derive_fields(self, changed=None) -> set[str]:
+        """
+        Recalcula os campos derivados (tags, seniority_level, language_mask, MinHash e chaves
+        de deduplicação) a partir dos campos de texto em changed, ou de todos se None.
+        Devolve os nomes dos campos derivados alterados, para update_fields/bulk_update.
+        """
+        changed = None if changed is None else set(changed)
+        derived = set()
+        for text_field, tags_field in TAG_FIELDS.items():
+            if changed is None or text_field in changed:
+                setattr(self, tags_field, canonical_tags(getattr(self, text_field), text_field))
+                derived.add(tags_field)
+        if changed is None or 'seniority' in changed:
+            self.seniority_level = seniority_level(self.seniority)
+            derived.add('seniority_level')
+        if changed is None or 'languages' in changed:
+            self.language_mask = language_mask(self.language_tags)
+            derived.add('language_mask')
+        if changed is None or changed & set(MINHASH_SOURCE_FIELDS):
+            self.minhash_signature, self.lsh_buckets = candidate_minhash(
+                self.current_title, self.technology_tags, self.skill_tags
+            )
+            derived.update(('minhash_signature', 'lsh_buckets'))
+        if changed is None or changed & set(DEDUP_SOURCE_FIELDS):
+            self.linkedin_key, self.name_key, self.simhash = dedup_keys(
+                {field: getattr(self, field) for field in DEDUP_SOURCE_FIELDS}
+            )
+            derived.update(('linkedin_key', 'name_key', 'simhash'))
+        return derived
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        derived = self.derive_fields(update_fields)
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *derived}
+        super().save(*args, **kwargs)
+
+
+class CandidateExperience(models.Model):
+    """Experiência da seção "Experiência" do currículo (core.experience); position 0 é a mais recente."""
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='experiences')
+    position = models.PositiveSmallIntegerField()
+    company = models.CharField(max_length=160, blank=True)
+    title = models.CharField(max_length=160, blank=True)
+    location = models.CharField(max_length=160, blank=True)
+    months = models.PositiveIntegerField(default=0)
+    # Cargo e empresa normalizados (core.experience.experience_key) para os filtros
+    company_key = models.CharField(max_length=160, blank=True, editable=False)
+    title_key = models.CharField(max_length=160, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['candidate', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=('candidate', 'position'), name='core_candexp_candidate_position_unique'),
+        ]
+        indexes = [
+            # "Já teve o cargo X" / "já trabalhou em X": LIKE '%termo%' nas chaves normalizadas
+            GinIndex(OpClass('title_key', name='gin_trgm_ops'), name='candexp_title_trgm'),
+            GinIndex(OpClass('company_key', name='gin_trgm_ops'), name='candexp_company_trgm'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.title} @ {self.company}"
+
+
+class CandidateRoleYears(models.Model):
+    """Meses de experiência do candidato numa família de cargo (core.role_families), somados das experiências."""
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='role_years')
+    family = models.CharField(max_length=40)
+    months = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('candidate', 'family'), name='core_crole_candidate_family_unique'),
+        ]
+        indexes = [
+            # "≥ N anos como X": faixa de meses dentro da família
+            models.Index(fields=['family', 'months'], name='crole_family_months'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.candidate_id} {self.family}: {self.months} meses"
+
+    @property
+    def years(self) -> float:
+        return round(self.months / 12, 1)
+
 
 class CandidateJob(models.Model):
     class PipelineStatus(models.TextChoices):
@@ -146,12 +350,21 @@ class CandidateJob(models.Model):
     ready_at = models.DateField(null=True, blank=True)
     adherence_score = models.IntegerField(null=True, blank=True)
     technical_justification = models.TextField(blank=True)
+    # Descrição, pesos e cargos da vaga usados na aderência (core.pdf_extractor.adherence_key)
+    adherence_key = models.CharField(max_length=64, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-updated_at', '-created_at']
         unique_together = ('job', 'candidate')
+        indexes = [
+            # Paginação por cursor da vaga: aderência (nulos no fim) e id
+            models.Index(
+                F('job'), F('adherence_score').desc(nulls_last=True), F('id').desc(),
+                name='cj_job_adherence_id',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         from django.utils import timezone
@@ -170,3 +383,102 @@ class CandidateJob(models.Model):
                 if self.candidate_id:
                     Candidate.objects.filter(id=self.candidate_id).update(ready_at=now_date)
         super().save(*args, **kwargs)
+
+
+class JobSuggestion(models.Model):
+    """Candidato sugerido para uma vaga aberta pela consulta permanente da vaga (core.job_matching)."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='suggestions')
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='job_suggestions')
+    score = models.IntegerField()
+    matched_terms = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=('job', 'candidate'), name='core_jobsuggestion_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['job', '-score'], name='core_jobsuggestion_job_score'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.candidate} → {self.job} ({self.score})"
+
+
+class PoolTerm(models.Model):
+    """Termo do dicionário de autocomplete de um banco (mantido incrementalmente por core.autocomplete)."""
+    class Field(models.TextChoices):
+        TECHNOLOGIES = 'technologies', 'Tecnologias'
+        SKILLS = 'skills', 'Skills'
+        COMPANY = 'company', 'Empresa'
+        LOCATION = 'location', 'Localização'
+
+    # Escopo do banco como em core.pool_cache: user_{id} ou shared
+    scope = models.CharField(max_length=32)
+    field = models.CharField(max_length=16, choices=Field.choices)
+    # Forma normalizada (sem acento, minúscula) usada na busca por prefixo
+    key = models.CharField(max_length=255)
+    term = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('scope', 'field', 'key'), name='core_poolterm_unique'),
+        ]
+        indexes = [
+            # LIKE 'prefixo%' só usa btree com pattern_ops (a collation do banco não é C)
+            models.Index(
+                fields=['scope', 'field', 'key'],
+                name='core_poolterm_prefix',
+                opclasses=['varchar_pattern_ops', 'varchar_pattern_ops', 'varchar_pattern_ops'],
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_field_display()}: {self.term} ({self.count})"
+
+
+class ImportRun(models.Model):
+    """Execução em background (importação ou busca no banco). O progresso ao vivo fica no cache."""
+    class Kind(models.TextChoices):
+        TALENT_POOL_IMPORT = 'TALENT_POOL_IMPORT', 'Importação no banco de talentos'
+        JOB_IMPORT = 'JOB_IMPORT', 'Importação para vaga'
+        POOL_SEARCH = 'POOL_SEARCH', 'Busca no banco de talentos'
+
+    class Status(models.TextChoices):
+        RUNNING = 'running', 'Em andamento'
+        COMPLETED = 'completed', 'Concluída'
+        ERROR = 'error', 'Erro'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='import_runs',
+    )
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='import_runs', null=True, blank=True)
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.RUNNING)
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    errors = models.IntegerField(default=0)
+    result = models.JSONField(default=dict, blank=True)
+    message = models.TextField(blank=True)
+    node = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Última gravação de progresso no banco (execuções paradas sem heartbeat viram erro)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='core_importrun_user_created'),
+            models.Index(fields=['user', 'kind', 'job', '-created_at'], name='core_importrun_user_kind_job'),
+            models.Index(fields=['status', 'heartbeat_at'], name='core_importrun_status_beat'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} ({self.get_status_display()})"
@@ -0,0 +1,197 @@
+"""
+Paginação por cursor (keyset) para listas grandes de candidatos.
+
+Em vez de OFFSET (que varre todas as linhas das páginas anteriores) e de um COUNT(*) a cada
+página, a próxima página é "as linhas depois da última exibida" na ordenação, por exemplo
+(updated_at, id) < (x, y). Com um índice na mesma ordenação, a página 500 custa o mesmo que a
+página 1. O cursor é opaco (JSON em base64 url-safe) e vai na query string ou no JSON.
+
+O total é opcional: contagens ficam em cache por COUNT_CACHE_TIMEOUT e, acima de
+COUNT_EXACT_LIMIT linhas estimadas pelo planner, o total exibido é a estimativa.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import F, Q
+
+PER_PAGE = 10
+COUNT_CACHE_TIMEOUT = 60
+COUNT_EXACT_LIMIT = 10000
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """Campo da ordenação. Campos nullable ficam com nulos no fim (ordem direta)."""
+    field: str
+    descending: bool = True
+    nullable: bool = False
+
+    def order_by(self, reverse: bool = False):
+        descending = self.descending != reverse
+        expression = F(self.field)
+        if self.nullable:
+            # Ordem direta: nulos no fim; ordem reversa (página anterior): nulos no começo
+            return expression.desc(nulls_last=True) if descending else expression.asc(nulls_first=True)
+        return expression.desc() if descending else expression.asc()
+
+
+UPDATED_AT_KEYS = (SortKey("updated_at"), SortKey("id"))
+ADHERENCE_KEYS = (SortKey("adherence_score", nullable=True), SortKey("id"))
+SEARCH_RANK_KEYS = (SortKey("search_rank"), SortKey("updated_at"), SortKey("id"))
+POOL_RANK_KEYS = (SortKey("pool_rank", descending=False), SortKey("id"))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class CursorPage:
+    object_list: list
+    has_next: bool = False
+    has_previous: bool = False
+    next_cursor: str = ""
+    previous_cursor: str = ""
+    last_cursor: str = ""
+    total: int | None = None
+    total_is_estimate: bool = False
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(direction: str, values: list | None) -> str:
+    payload = json.dumps({"d": direction, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, list | None]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        direction, values = payload["d"], payload["v"]
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise InvalidCursor("Cursor inválido.")
+    if direction not in ("n", "p") or (values is not None and not isinstance(values, list)):
+        raise InvalidCursor("Cursor inválido.")
+    return direction, values
+
+
+def _after(keys, values, reverse: bool) -> Q:
+    """Condição 'linha vem depois de values' na ordenação (direta ou reversa)."""
+    key, value = keys[0], values[0]
+    descending = key.descending != reverse
+    if value is None:
+        # Depois de um nulo: na ordem direta só outros nulos; na reversa, também os não nulos
+        beyond = Q(**{f"{key.field}__isnull": False}) if reverse else None
+        equal = Q(**{f"{key.field}__isnull": True})
+    else:
+        beyond = Q(**{f"{key.field}__{'lt' if descending else 'gt'}": value})
+        if key.nullable and not reverse:
+            beyond |= Q(**{f"{key.field}__isnull": True})
+        equal = Q(**{key.field: value})
+    if len(keys) == 1:
+        return beyond if beyond is not None else Q(pk__in=[])
+    rest = equal & _after(keys[1:], values[1:], reverse)
+    return rest if beyond is None else beyond | rest
+
+
+def _bound(keys, values, reverse: bool) -> Q:
+    """Limite redundante só na primeira chave (k <= x), que o índice usa como intervalo."""
+    key, value = keys[0], values[0]
+    if value is None or key.nullable:
+        return Q()
+    descending = key.descending != reverse
+    return Q(**{f"{key.field}__{'lte' if descending else 'gte'}": value})
+
+
+def _values(obj, keys) -> list:
+    return [_json_value(getattr(obj, key.field)) for key in keys]
+
+
+def paginate(qs, keys, cursor: str = "", per_page: int = PER_PAGE) -> CursorPage:
+    """
+    Página de qs ordenada por keys. cursor vazio = primeira página. Cursores inválidos
+    voltam à primeira página.
+    """
+    keys = tuple(keys)
+    try:
+        direction, values = decode_cursor(cursor) if cursor else ("n", None)
+        if values is not None and len(values) != len(keys):
+            raise InvalidCursor("Cursor inválido.")
+    except InvalidCursor:
+        direction, values = "n", None
+
+    reverse = direction == "p"
+    page_qs = qs.order_by(*[key.order_by(reverse) for key in keys])
+    if values is not None:
+        page_qs = page_qs.filter(_bound(keys, values, reverse), _after(keys, values, reverse))
+    rows = list(page_qs[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if reverse:
+        rows.reverse()
+        has_next = values is not None
+        has_previous = has_more
+    else:
+        has_next = has_more
+        has_previous = values is not None
+
+    page = CursorPage(object_list=rows, has_next=has_next, has_previous=has_previous)
+    if rows:
+        if has_next:
+            page.next_cursor = encode_cursor("n", _values(rows[-1], keys))
+            page.last_cursor = encode_cursor("p", None)
+        if has_previous:
+            page.previous_cursor = encode_cursor("p", _values(rows[0], keys))
+    return page
+
+
+def _estimated_rows(qs) -> int | None:
+    try:
+        plan = json.loads(qs.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+def page_total(qs, cache_prefix: str = "count") -> tuple[int, bool]:
+    """
+    Total de linhas de qs para exibição: (total, é_estimativa). Fica em cache pela consulta;
+    consultas grandes usam a estimativa do planner em vez de COUNT(*).
+    """
+    sql, params = qs.order_by().query.sql_with_params()
+    key = f"{cache_prefix}_{hashlib.sha1(f'{sql}{params!r}'.encode()).hexdigest()}"
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached)
+    estimate = _estimated_rows(qs)
+    if estimate is not None and estimate > COUNT_EXACT_LIMIT:
+        result = (estimate, True)
+    else:
+        result = (qs.order_by().count(), False)
+    cache.set(key, result, timeout=COUNT_CACHE_TIMEOUT)
+    return result
@@ -1,16 +1,29 @@
+import hashlib
+import io
+import json
+import logging
 import re
+from dataclasses import dataclass
+from datetime import timedelta
 from decimal import Decimal
 from pathlib import Path
 import unicodedata
 import time
 
-from django.core.files import File
-from django.db import connection
-from django.db.models import F, Func, Q
-from django.db.models.functions import Lower
+from django.utils import timezone
 from pypdf import PdfReader
 
 from .models import Candidate, CandidateJob
+from .resume_storage import file_sha256, store_resume_blob
+from .boolean_search import BooleanSearchError, apply_boolean_search
+from .dedup import canonical_linkedin_url, merge_duplicates
+from .experience import replace_experiences, role_years_for
+from .job_matching import job_terms, match_candidates
+from .pool_cache import filtered_candidate_ids
+from .pool_filter import CandidateFilter
+from .keyword_index import keyword_indexes
+from .semantic_index import semantic_indexes
+from .tags import TECHNOLOGY_ALIASES
 from .llm_extractor import (
     extract_candidate_with_llm,
     extract_candidates_batch_with_llm,
@@ -20,11 +33,49 @@ from .llm_extractor import (
     calculate_adherence_batch_for_candidates,
 )
 
+logger = logging.getLogger(__name__)
 
-def _save_resume_pdf(candidate: Candidate, pdf_path: Path) -> None:
-    """Salva ou substitui o PDF do currículo no candidato."""
-    with open(pdf_path, "rb") as f:
-        candidate.resume_pdf.save(Path(pdf_path).name, File(f), save=True)
+
+@dataclass(frozen=True)
+class ResumeScan:
+    """Leitura local de um PDF na pré-leitura da importação (o arquivo é lido e interpretado uma vez)."""
+    content_hash: str
+    text_hash: str = ""
+    experience: list[dict] | None = None
+
+
+def adherence_key(job_description: str, weights: dict[str, int], role_titles: list[str]) -> str:
+    """Impressão digital da vaga usada numa aderência (descrição, pesos e cargos)."""
+    payload = json.dumps([job_description.strip(), sorted(weights.items()), role_titles], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _save_resume_pdf(candidate: Candidate, pdf_path: Path, scan: ResumeScan | None = None) -> None:
+    """
+    Salva ou substitui o PDF do currículo no candidato (armazenamento por hash) e marca a
+    extração pela IA. Se o conteúdo do PDF não mudou, o arquivo não é regravado. Com a
+    pré-leitura do PDF, reaproveita os hashes e substitui a linha do tempo de experiências.
+    """
+    candidate.extracted_at = timezone.now()
+    update_fields = ["extracted_at"]
+    if scan and scan.text_hash:
+        candidate.resume_text_sha256 = scan.text_hash
+        update_fields.append("resume_text_sha256")
+    content_hash = scan.content_hash if scan else file_sha256(pdf_path)
+    if candidate.resume_sha256 != content_hash or not candidate.resume_pdf:
+        candidate.resume_pdf.name = store_resume_blob(pdf_path, content_hash)
+        candidate.resume_sha256 = content_hash
+        update_fields += ["resume_pdf", "resume_sha256"]
+    candidate.save(update_fields=update_fields)
+    if scan and scan.experience is not None:
+        replace_experiences(candidate.id, scan.experience)
+
+
+# Currículos com o mesmo texto extraídos pela IA há menos tempo que isso não são reenviados ao LLM
+RESUME_REEXTRACT_AFTER = timedelta(days=30)
+
+# Acima disso a busca no banco aplica a busca booleana da vaga antes de rankear com IA
+BOOLEAN_NARROWING_MIN_POOL = 200
 
 
 SECTION_TITLES = {
@@ -49,25 +100,6 @@ SECTION_TITLES = {
 }
 
 
-def _normalize_search_term(value: str) -> str:
-    normalized = unicodedata.normalize("NFKD", value)
-    return "".join(char for char in normalized if not unicodedata.combining(char)).lower()
-
-
-def _apply_unaccent_filter(qs, field: str, term: str, alias_prefix: str):
-    if not term:
-        return qs
-    if connection.vendor != "postgresql":
-        return qs.filter(**{f"{field}__icontains": term})
-    normalized = _normalize_search_term(term)
-    alias = f"{alias_prefix}_{field.replace('__', '_')}"
-    qs = qs.annotate(**{alias: Lower(Func(F(field), function="unaccent"))})
-    return qs.filter(
-        Q(**{f"{field}__icontains": term}) |
-        Q(**{f"{alias}__contains": normalized})
-    )
-
-
 def _fix_mojibake(text: str) -> str:
     def score(value: str) -> int:
         return value.count("�") + value.count("Ã") + value.count("Â")
@@ -342,201 +374,6 @@ def _extract_certifications(lines: list[str]) -> str:
 
 
 def _normalize_technologies(technologies: list[str]) -> list[str]:
-    aliases = {
-        "ai": "AI",
-        "ia": "AI",
-        "ml": "Machine Learning",
-        "machine learning": "Machine Learning",
-        "deep learning": "Deep Learning",
-        "data science": "Data Science",
-        "data engineering": "Data Engineering",
-        "data analytics": "Data Analytics",
-        "nlp": "NLP",
-        "llm": "LLM",
-        "generative ai": "Generative AI",
-        "genai": "Generative AI",
-        "rag": "RAG",
-        "vector db": "Vector Database",
-        "vector database": "Vector Database",
-        "vector search": "Vector Search",
-        "prompt engineering": "Prompt Engineering",
-        "computer vision": "Computer Vision",
-        "cv": "Computer Vision",
-        "pytorch": "PyTorch",
-        "tensorflow": "TensorFlow",
-        "scikit learn": "scikit-learn",
-        "sklearn": "scikit-learn",
-        "keras": "Keras",
-        "xgboost": "XGBoost",
-        "lightgbm": "LightGBM",
-        "catboost": "CatBoost",
-        "hugging face": "Hugging Face",
-        "langchain": "LangChain",
-        "llamaindex": "LlamaIndex",
-        "openai": "OpenAI",
-        "azure openai": "Azure OpenAI",
-        "bedrock": "Amazon Bedrock",
-        "vertex ai": "Vertex AI",
-        "databricks": "Databricks",
-        "mlflow": "MLflow",
-        "kubeflow": "Kubeflow",
-        "airflow": "Apache Airflow",
-        "prefect": "Prefect",
-        "dbt": "dbt",
-        "snowflake": "Snowflake",
-        "bigquery": "BigQuery",
-        "redshift": "Redshift",
-        "synapse": "Azure Synapse",
-        "spark": "Apache Spark",
-        "hadoop": "Hadoop",
-        "kafka": "Kafka",
-        "flink": "Apache Flink",
-        "beam": "Apache Beam",
-        "hive": "Hive",
-        "trino": "Trino",
-        "presto": "Presto",
-        "lakehouse": "Lakehouse",
-        "delta lake": "Delta Lake",
-        "iceberg": "Apache Iceberg",
-        "hudi": "Apache Hudi",
-        "aws": "AWS",
-        "amazon web services": "AWS",
-        "azure": "Azure",
-        "gcp": "GCP",
-        "google cloud": "GCP",
-        "oracle cloud": "OCI",
-        "oci": "OCI",
-        "digitalocean": "DigitalOcean",
-        "docker": "Docker",
-        "kubernetes": "Kubernetes",
-        "k8s": "Kubernetes",
-        "openshift": "OpenShift",
-        "helm": "Helm",
-        "argo cd": "ArgoCD",
-        "argocd": "ArgoCD",
-        "istio": "Istio",
-        "linkerd": "Linkerd",
-        "terraform": "Terraform",
-        "pulumi": "Pulumi",
-        "cloudformation": "CloudFormation",
-        "ansible": "Ansible",
-        "chef": "Chef",
-        "puppet": "Puppet",
-        "packer": "Packer",
-        "redis": "Redis",
-        "memcached": "Memcached",
-        "elasticsearch": "Elasticsearch",
-        "opensearch": "OpenSearch",
-        "logstash": "Logstash",
-        "kibana": "Kibana",
-        "grafana": "Grafana",
-        "prometheus": "Prometheus",
-        "loki": "Loki",
-        "datadog": "Datadog",
-        "new relic": "New Relic",
-        "splunk": "Splunk",
-        "sentry": "Sentry",
-        "opentelemetry": "OpenTelemetry",
-        "postgresql": "PostgreSQL",
-        "postgres": "PostgreSQL",
-        "sql server": "SQL Server",
-        "mysql": "MySQL",
-        "mariadb": "MariaDB",
-        "oracle": "Oracle",
-        "sqlite": "SQLite",
-        "cassandra": "Cassandra",
-        "couchbase": "Couchbase",
-        "couchdb": "CouchDB",
-        "neo4j": "Neo4j",
-        "arango": "ArangoDB",
-        "mongodb": "MongoDB",
-        "dynamodb": "DynamoDB",
-        "kafka": "Kafka",
-        "rabbitmq": "RabbitMQ",
-        "activemq": "ActiveMQ",
-        "sqs": "SQS",
-        "sns": "SNS",
-        "eventbridge": "EventBridge",
-        "kinesis": "Kinesis",
-        "java": "Java",
-        "python": "Python",
-        "go": "Go",
-        "golang": "Go",
-        "ruby": "Ruby",
-        "php": "PHP",
-        "c": "C",
-        "c++": "C++",
-        "rust": "Rust",
-        "scala": "Scala",
-        "kotlin": "Kotlin",
-        "swift": "Swift",
-        "objective-c": "Objective-C",
-        "javascript": "JavaScript",
-        "js": "JavaScript",
-        "typescript": "TypeScript",
-        "ts": "TypeScript",
-        "angular": "Angular",
-        "react": "React",
-        "vue": "Vue.js",
-        "svelte": "Svelte",
-        "node.js": "Node.js",
-        "nodejs": "Node.js",
-        "spring boot": "Spring Boot",
-        "spring": "Spring",
-        "django": "Django",
-        "flask": "Flask",
-        "fastapi": "FastAPI",
-        "express": "Express",
-        "nest": "NestJS",
-        "nestjs": "NestJS",
-        "laravel": "Laravel",
-        "rails": "Ruby on Rails",
-        "ruby on rails": "Ruby on Rails",
-        "dotnet": ".NET",
-        "azure devops": "Azure DevOps",
-        "jenkins": "Jenkins",
-        "github actions": "GitHub Actions",
-        "gitlab ci": "GitLab CI",
-        "circleci": "CircleCI",
-        "travis": "Travis CI",
-        "bamboo": "Bamboo",
-        "sonarqube": "SonarQube",
-        "github": "GitHub",
-        "gitlab": "GitLab",
-        "bitbucket": "Bitbucket",
-        "git": "Git",
-        "jira": "Jira",
-        "confluence": "Confluence",
-        "trello": "Trello",
-        "asana": "Asana",
-        "monday": "Monday.com",
-        ".net": ".NET",
-        ".net core": ".NET Core",
-        ".net framework": ".NET Framework",
-        "c#": "C#",
-        "graphql": "GraphQL",
-        "rest": "REST",
-        "grpc": "gRPC",
-        "soap": "SOAP",
-        "microservices": "Microservices",
-        "event-driven": "Event-Driven",
-        "eda": "Event-Driven",
-        "ddd": "DDD",
-        "cqrs": "CQRS",
-        "tdd": "TDD",
-        "ci/cd": "CI/CD",
-        "oauth": "OAuth",
-        "oauth2": "OAuth2",
-        "oidc": "OpenID Connect",
-        "jwt": "JWT",
-        "saml": "SAML",
-        "keycloak": "Keycloak",
-        "okta": "Okta",
-        "linux": "Linux",
-        "windows": "Windows",
-        "macos": "macOS",
-    }
-
     normalized = []
     seen = set()
     for item in technologies:
@@ -544,8 +381,8 @@ def _normalize_technologies(technologies: list[str]) -> list[str]:
         if not clean:
             continue
         key = _normalize_text(clean)
-        if key in aliases:
-            label = aliases[key]
+        if key in TECHNOLOGY_ALIASES:
+            label = TECHNOLOGY_ALIASES[key]
         else:
             label = clean
         norm_key = _normalize_text(label)
@@ -914,10 +751,146 @@ def _infer_seniority_from_years(total_years: Decimal | None) -> str:
     return ""
 
 
-def parse_candidate_from_pdf(path: str | Path, role_titles: list[str] | None = None) -> dict:
-    reader = PdfReader(str(path))
+def _read_pdf_text(path) -> str:
+    """Texto do PDF; path pode ser um caminho ou um arquivo aberto (ex.: FieldFile do storage)."""
+    reader = PdfReader(path if hasattr(path, "read") else str(path))
     text = "\n".join(page.extract_text() or "" for page in reader.pages)
-    text = _fix_mojibake(text)
+    return _fix_mojibake(text)
+
+
+def stored_resume_experience(candidate: Candidate) -> list[dict]:
+    """Blocos de experiência do currículo já armazenado do candidato (backfill sem reimportar)."""
+    with candidate.resume_pdf.open("rb") as resume:
+        return _extract_experience_blocks(_clean_lines(_read_pdf_text(resume)))
+
+
+def _resume_text_hash(text: str) -> str:
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _candidates_by_linkedin_url(url: str, user_id=None, shared_pool: bool = False):
+    """Candidatos com essa URL do LinkedIn em qualquer variação (chave canônica indexada)."""
+    qs = Candidate.objects.filter(linkedin_key=canonical_linkedin_url(url))
+    if not shared_pool and user_id:
+        qs = qs.filter(user_id=user_id)
+    return qs
+
+
+def _prescan_resumes(pdf_files: list[Path], user_id=None, shared_pool: bool = False) -> tuple[dict, dict]:
+    """
+    Leitura local (pypdf, sem LLM) de cada PDF, uma vez só: hash do conteúdo, hash do texto,
+    URL do LinkedIn e blocos de experiência. Retorna ({pdf: ResumeScan}, {pdf: candidato}),
+    onde o segundo dicionário traz os PDFs cujo candidato (mesma URL) já tem o mesmo texto
+    extraído recentemente pela IA.
+    """
+    scans = {}
+    url_keys = {}
+    for pdf_file in pdf_files:
+        try:
+            content = Path(pdf_file).read_bytes()
+        except OSError:
+            continue
+        content_hash = hashlib.sha256(content).hexdigest()
+        try:
+            text = _read_pdf_text(io.BytesIO(content))
+        except Exception:
+            scans[pdf_file] = ResumeScan(content_hash)
+            continue
+        scans[pdf_file] = ResumeScan(
+            content_hash, _resume_text_hash(text), _extract_experience_blocks(_clean_lines(text))
+        )
+        url = _find_linkedin_url(text)
+        if url:
+            url_keys[pdf_file] = canonical_linkedin_url(url)
+
+    if not url_keys:
+        return scans, {}
+
+    qs = Candidate.objects.filter(
+        resume_text_sha256__in={scans[pdf_file].text_hash for pdf_file in url_keys},
+        extracted_at__gte=timezone.now() - RESUME_REEXTRACT_AFTER,
+    )
+    if not shared_pool and user_id:
+        qs = qs.filter(user_id=user_id)
+    by_hash = {}
+    for candidate in qs:
+        by_hash.setdefault(candidate.resume_text_sha256, []).append(candidate)
+
+    unchanged = {}
+    for pdf_file, url_key in url_keys.items():
+        for candidate in by_hash.get(scans[pdf_file].text_hash, []):
+            if canonical_linkedin_url(candidate.linkedin_url) == url_key:
+                unchanged[pdf_file] = candidate
+                break
+    return scans, unchanged
+
+
+def _candidate_structured_data(candidate: Candidate, role_years: Decimal | None = None) -> dict:
+    """Dados do candidato já no banco para a aderência; role_years é o tempo nos cargos da vaga (core.experience.role_years_for)."""
+    return {
+        "name": candidate.name or "",
+        "current_title": candidate.current_title or "",
+        "current_company": candidate.current_company or "",
+        "location": candidate.location or "",
+        "skills": candidate.skills or "",
+        "technologies": candidate.technologies or "",
+        "languages": candidate.languages or "",
+        "certifications": candidate.certifications or "",
+        "seniority": candidate.seniority or "",
+        "experience_time": str(candidate.experience_time) if candidate.experience_time else "",
+        "average_tenure": str(candidate.average_tenure) if candidate.average_tenure else "",
+        "role_experience_time": str(role_years) if role_years else "",
+        "summary": candidate.summary or "",
+    }
+
+
+def _link_unchanged_candidates(
+    candidates: list[Candidate],
+    job_id: int,
+    job_description: str,
+    weights: dict[str, int],
+    role_titles: list[str],
+) -> None:
+    """
+    Vincula à vaga candidatos cujo currículo não mudou, sem reenviar o PDF ao LLM. Quem já
+    tem aderência nesta vaga calculada com a mesma descrição, pesos e cargos (adherence_key;
+    vazia nas aderências anteriores a ela) é mantido sem nenhuma chamada ao LLM; os demais
+    recebem aderência pelos dados estruturados (chamada só de texto, bem mais barata).
+    """
+    scoring_key = adherence_key(job_description, weights, role_titles)
+    scored_ids = set(
+        CandidateJob.objects.filter(
+            job_id=job_id, candidate__in=candidates, adherence_score__isnull=False, adherence_key__in=(scoring_key, "")
+        ).values_list("candidate_id", flat=True)
+    )
+    pending = [c for c in candidates if c.id not in scored_ids]
+    role_years = role_years_for([c.id for c in pending], role_titles)
+    for batch_start in range(0, len(pending), 10):
+        batch = pending[batch_start:batch_start + 10]
+        try:
+            adherence_results = calculate_adherence_batch_for_candidates(
+                [_candidate_structured_data(c, role_years.get(c.id)) for c in batch],
+                job_description=job_description,
+                weights=weights,
+                role_titles=role_titles,
+            )
+        except Exception:
+            adherence_results = [{} for _ in batch]
+        for candidate, data in zip(batch, adherence_results):
+            CandidateJob.objects.update_or_create(
+                job_id=job_id,
+                candidate=candidate,
+                defaults={
+                    "adherence_score": data.get("adherence"),
+                    "technical_justification": data.get("technical_justification", ""),
+                    "adherence_key": scoring_key,
+                },
+            )
+
+
+def parse_candidate_from_pdf(path: str | Path, role_titles: list[str] | None = None) -> dict:
+    text = _read_pdf_text(path)
     lines = _clean_lines(text)
 
     name, name_idx = _find_name(lines)
@@ -987,6 +960,43 @@ def parse_candidate_from_pdf(path: str | Path, role_titles: list[str] | None = N
     }
 
 
+def _after_import_batch(candidate_ids: list[int], user_id=None) -> None:
+    """
+    Fusão de duplicatas, sugestões para as vagas abertas e índices do banco, só com os
+    candidatos gravados no lote (com o banco compartilhado, podem ser de outros usuários).
+    """
+    if not candidate_ids:
+        return
+    # Tudo aqui é secundário: uma falha é registrada no log, mas não interrompe a importação
+    batch_ids, relinked = list(candidate_ids), []
+    try:
+        # Antes do resto: os candidatos que ficam são regravados e entram no lote
+        result = merge_duplicates(candidate_ids=batch_ids)
+        batch_ids += result["survivors"]
+        relinked = result["relinked"]
+    except Exception:
+        logger.exception("Falha ao fundir duplicatas do lote (usuário %s)", user_id)
+    try:
+        match_candidates(batch_ids)
+    except Exception:
+        logger.exception("Falha ao sugerir o lote para as vagas abertas (usuário %s)", user_id)
+    for store in (semantic_indexes, keyword_indexes):
+        try:
+            # Quem virou (ou deixou de ser) duplicata de outro usuário entra/sai do índice compartilhado
+            store.add_candidates(batch_ids + relinked)
+        except Exception:
+            logger.exception("Falha ao atualizar o índice %s com o lote (usuário %s)", store.name, user_id)
+
+
+def _flush_pool_indexes(user_id=None) -> None:
+    """Fim da importação: aplica de uma vez o que os lotes registraram nos índices do banco."""
+    for store in (semantic_indexes, keyword_indexes):
+        try:
+            store.flush_pending(user_id)
+        except Exception:
+            logger.exception("Falha ao gravar o índice %s no fim da importação (usuário %s)", store.name, user_id)
+
+
 def import_candidates_from_folder(
     folder_path: str,
     job_description: str,
@@ -1008,17 +1018,35 @@ def import_candidates_from_folder(
     role_titles = []
     if role_title:
         role_titles = [item.strip() for item in role_title.split("/") if item.strip()]
+    scoring_key = adherence_key(job_description, weights, role_titles)
     created = 0
     updated = 0
     skipped = 0
     errors = 0
     error_details = []
-    
+
+    # Caminho rápido: currículos sem alteração não passam pelo LLM, só são vinculados à vaga
+    scans, unchanged = _prescan_resumes(pdf_files, user_id=user_id, shared_pool=shared_pool)
+    skipped_unchanged = len(unchanged)
+    if unchanged:
+        if job_id:
+            _link_unchanged_candidates(list(unchanged.values()), job_id, job_description, weights, role_titles)
+        pdf_files = [pdf_file for pdf_file in pdf_files if pdf_file not in unchanged]
+        if progress_callback:
+            progress_callback(
+                total=total_files,
+                processed=skipped_unchanged,
+                current=f"{skipped_unchanged} currículo(s) sem alteração",
+                status="running",
+                errors=errors,
+            )
+
     # Processa em lotes de 10 PDFs
     batch_size = 10
-    processed_count = 0
+    processed_count = skipped_unchanged
     
     for batch_start in range(0, len(pdf_files), batch_size):
+        batch_ids = []
         batch = pdf_files[batch_start:batch_start + batch_size]
         batch_num = (batch_start // batch_size) + 1
         total_batches = (len(pdf_files) + batch_size - 1) // batch_size
@@ -1067,10 +1095,7 @@ def import_candidates_from_folder(
                         "seniority": data.get("seniority") or "",
                     }
 
-                    if shared_pool:
-                        qs = Candidate.objects.filter(linkedin_url__iexact=linkedin_url)
-                    else:
-                        qs = Candidate.objects.filter(user_id=user_id, linkedin_url__iexact=linkedin_url) if user_id else Candidate.objects.filter(linkedin_url__iexact=linkedin_url)
+                    qs = _candidates_by_linkedin_url(linkedin_url, user_id, shared_pool)
                     candidate = qs.first()
                     if candidate:
                         changed = False
@@ -1089,7 +1114,7 @@ def import_candidates_from_folder(
                             candidate.save()
                             updated += 1
                         # Salva ou substitui o PDF (candidato existente: sempre reextrair dados + PDF)
-                        _save_resume_pdf(candidate, pdf_file)
+                        _save_resume_pdf(candidate, pdf_file, scans.get(pdf_file))
                     else:
                         # Garante que todos os campos de texto sejam strings, nunca None
                         safe_payload = {}
@@ -1103,8 +1128,9 @@ def import_candidates_from_folder(
                         candidate = Candidate.objects.create(**safe_payload)
                         created += 1
                         # Salva o PDF no novo candidato
-                        _save_resume_pdf(candidate, pdf_file)
+                        _save_resume_pdf(candidate, pdf_file, scans.get(pdf_file))
 
+                    batch_ids.append(candidate.id)
                     if job_id:
                         CandidateJob.objects.update_or_create(
                             job_id=job_id,
@@ -1112,6 +1138,7 @@ def import_candidates_from_folder(
                             defaults={
                                 "adherence_score": data.get("adherence"),
                                 "technical_justification": data.get("technical_justification", ""),
+                                "adherence_key": scoring_key,
                             },
                         )
                     
@@ -1182,10 +1209,7 @@ def import_candidates_from_folder(
                             "seniority": data.get("seniority") or "",
                         }
 
-                        if shared_pool:
-                            qs = Candidate.objects.filter(linkedin_url__iexact=linkedin_url)
-                        else:
-                            qs = Candidate.objects.filter(user_id=user_id, linkedin_url__iexact=linkedin_url) if user_id else Candidate.objects.filter(linkedin_url__iexact=linkedin_url)
+                        qs = _candidates_by_linkedin_url(linkedin_url, user_id, shared_pool)
                         candidate = qs.first()
                         if candidate:
                             changed = False
@@ -1204,7 +1228,7 @@ def import_candidates_from_folder(
                                 candidate.save()
                                 updated += 1
                             # Salva ou substitui o PDF (candidato existente)
-                            _save_resume_pdf(candidate, pdf_file)
+                            _save_resume_pdf(candidate, pdf_file, scans.get(pdf_file))
                         else:
                             # Garante que todos os campos de texto sejam strings, nunca None
                             safe_payload = {}
@@ -1218,8 +1242,9 @@ def import_candidates_from_folder(
                             candidate = Candidate.objects.create(**safe_payload)
                             created += 1
                             # Salva o PDF no novo candidato
-                            _save_resume_pdf(candidate, pdf_file)
+                            _save_resume_pdf(candidate, pdf_file, scans.get(pdf_file))
 
+                        batch_ids.append(candidate.id)
                         if job_id:
                             CandidateJob.objects.update_or_create(
                                 job_id=job_id,
@@ -1227,6 +1252,7 @@ def import_candidates_from_folder(
                                 defaults={
                                     "adherence_score": data.get("adherence"),
                                     "technical_justification": data.get("technical_justification", ""),
+                                    "adherence_key": scoring_key,
                                 },
                             )
                         
@@ -1262,10 +1288,15 @@ def import_candidates_from_folder(
                 
                 time.sleep(2)
 
+        # Sugestões para as vagas abertas: só os candidatos gravados neste lote
+        _after_import_batch(batch_ids, user_id)
+    _flush_pool_indexes(user_id)
+
     result = {
         "created": created,
         "updated": updated,
         "skipped": skipped,
+        "skipped_unchanged": skipped_unchanged,
         "errors": errors,
         "total": total_files,
         "error_details": error_details[:10],
@@ -1296,12 +1327,27 @@ def import_candidates_from_folder_no_ranking(
     skipped = 0
     errors = 0
     error_details = []
+
+    # Caminho rápido: currículos sem alteração não passam pelo LLM
+    scans, unchanged = _prescan_resumes(pdf_files, user_id=user_id, shared_pool=shared_pool)
+    skipped_unchanged = len(unchanged)
+    if unchanged:
+        pdf_files = [pdf_file for pdf_file in pdf_files if pdf_file not in unchanged]
+        if progress_callback:
+            progress_callback(
+                total=total_files,
+                processed=skipped_unchanged,
+                current=f"{skipped_unchanged} currículo(s) sem alteração",
+                status="running",
+                errors=errors,
+            )
     
     # Processa em lotes de 10 PDFs
     batch_size = 10
-    processed_count = 0
+    processed_count = skipped_unchanged
     
     for batch_start in range(0, len(pdf_files), batch_size):
+        batch_ids = []
         batch = pdf_files[batch_start:batch_start + batch_size]
         batch_num = (batch_start // batch_size) + 1
         total_batches = (len(pdf_files) + batch_size - 1) // batch_size
@@ -1345,10 +1391,7 @@ def import_candidates_from_folder_no_ranking(
                         "seniority": data.get("seniority") or "",
                     }
 
-                    if shared_pool:
-                        qs = Candidate.objects.filter(linkedin_url__iexact=linkedin_url)
-                    else:
-                        qs = Candidate.objects.filter(user_id=user_id, linkedin_url__iexact=linkedin_url) if user_id else Candidate.objects.filter(linkedin_url__iexact=linkedin_url)
+                    qs = _candidates_by_linkedin_url(linkedin_url, user_id, shared_pool)
                     candidate = qs.first()
                     if candidate:
                         changed = False
@@ -1367,7 +1410,7 @@ def import_candidates_from_folder_no_ranking(
                             candidate.save()
                             updated += 1
                         # Salva ou substitui o PDF (candidato existente: sempre reextrair dados + PDF)
-                        _save_resume_pdf(candidate, pdf_file)
+                        _save_resume_pdf(candidate, pdf_file, scans.get(pdf_file))
                     else:
                         # Garante que todos os campos de texto sejam strings, nunca None
                         safe_payload = {}
@@ -1381,8 +1424,9 @@ def import_candidates_from_folder_no_ranking(
                         candidate = Candidate.objects.create(**safe_payload)
                         created += 1
                         # Salva o PDF no novo candidato
-                        _save_resume_pdf(candidate, pdf_file)
+                        _save_resume_pdf(candidate, pdf_file, scans.get(pdf_file))
                     
+                    batch_ids.append(candidate.id)
                     # Incrementa contador apenas após salvar com sucesso
                     processed_count += 1
                     
@@ -1445,7 +1489,7 @@ def import_candidates_from_folder_no_ranking(
                             "seniority": data.get("seniority") or "",
                         }
 
-                        qs = Candidate.objects.filter(user_id=user_id, linkedin_url__iexact=linkedin_url) if user_id else Candidate.objects.filter(linkedin_url__iexact=linkedin_url)
+                        qs = _candidates_by_linkedin_url(linkedin_url, user_id)
                         candidate = qs.first()
                         if candidate:
                             changed = False
@@ -1464,7 +1508,7 @@ def import_candidates_from_folder_no_ranking(
                                 candidate.save()
                                 updated += 1
                             # Salva ou substitui o PDF (candidato existente)
-                            _save_resume_pdf(candidate, pdf_file)
+                            _save_resume_pdf(candidate, pdf_file, scans.get(pdf_file))
                         else:
                             # Garante que todos os campos de texto sejam strings, nunca None
                             safe_payload = {}
@@ -1478,8 +1522,9 @@ def import_candidates_from_folder_no_ranking(
                             candidate = Candidate.objects.create(**safe_payload)
                             created += 1
                             # Salva o PDF no novo candidato
-                            _save_resume_pdf(candidate, pdf_file)
+                            _save_resume_pdf(candidate, pdf_file, scans.get(pdf_file))
                         
+                        batch_ids.append(candidate.id)
                         # Incrementa contador apenas após salvar com sucesso
                         processed_count += 1
                         
@@ -1512,10 +1557,15 @@ def import_candidates_from_folder_no_ranking(
                 
                 time.sleep(2)
 
+        # Sugestões para as vagas abertas: só os candidatos gravados neste lote
+        _after_import_batch(batch_ids, user_id)
+    _flush_pool_indexes(user_id)
+
     result = {
         "created": created,
         "updated": updated,
         "skipped": skipped,
+        "skipped_unchanged": skipped_unchanged,
         "errors": errors,
         "total": total_files,
         "error_details": error_details[:10],
@@ -1534,48 +1584,51 @@ def search_and_rank_candidates_from_pool(
     filters: dict | None = None,
     user_id=None,
     shared_pool: bool = False,
+    boolean_search: str = "",
 ) -> dict:
-    """Busca candidatos no banco de talentos do usuário e calcula aderência para a vaga."""
-    from .models import Candidate, CandidateJob
-    
-    # Busca candidatos do usuário não vinculados à vaga
-    linked_candidate_ids = CandidateJob.objects.filter(job_id=job_id).values_list('candidate_id', flat=True)
-    candidates = Candidate.objects.exclude(id__in=linked_candidate_ids)
-    if user_id is not None and not shared_pool:
-        candidates = candidates.filter(user_id=user_id)
+    """
+    Busca candidatos no banco de talentos do usuário e calcula aderência para a vaga.
+    boolean_search é a busca booleana da vaga: aplicada se filters["use_boolean_search"] ou,
+    automaticamente, quando o banco filtrado passa de BOOLEAN_NARROWING_MIN_POOL candidatos.
+    """
+    from .models import Candidate, CandidateJob, Job
     
-    # Aplica filtros se fornecidos
-    if filters:
-        name_filter = filters.get('name', '').strip()
-        location_filter = filters.get('location', '').strip()
-        seniority_filter = filters.get('seniority', '').strip()
-        company_filter = filters.get('company', '').strip()
-        technologies_filter = filters.get('technologies', '').strip()
-        skills_filter = filters.get('skills', '').strip()
-        languages_filter = filters.get('languages', '').strip()
-        certifications_filter = filters.get('certifications', '').strip()
-        ready_only = filters.get('ready_only', False)
-        
-        if name_filter:
-            candidates = _apply_unaccent_filter(candidates, 'name', name_filter, 'name')
-        if location_filter:
-            candidates = _apply_unaccent_filter(candidates, 'location', location_filter, 'location')
-        if seniority_filter:
-            candidates = _apply_unaccent_filter(candidates, 'seniority', seniority_filter, 'seniority')
-        if company_filter:
-            candidates = _apply_unaccent_filter(candidates, 'current_company', company_filter, 'company')
-        if technologies_filter:
-            candidates = _apply_unaccent_filter(candidates, 'technologies', technologies_filter, 'technologies')
-        if skills_filter:
-            candidates = _apply_unaccent_filter(candidates, 'skills', skills_filter, 'skills')
-        if languages_filter:
-            candidates = _apply_unaccent_filter(candidates, 'languages', languages_filter, 'languages')
-        if certifications_filter:
-            candidates = _apply_unaccent_filter(candidates, 'certifications', certifications_filter, 'certifications')
-        if ready_only:
-            candidates = candidates.exclude(ready_at__isnull=True)
+    # Mesma consulta (e mesma chave de cache de ids) do preview
+    job = Job.objects.only("must_have", "nice_to_have", "stack").get(id=job_id)
+    candidate_filter = CandidateFilter(
+        job_id=job_id,
+        user_id=user_id,
+        shared_pool=shared_pool or user_id is None,
+        filters=filters or {},
+        boolean_search=boolean_search,
+        semantic_query=job_description,
+        keyword_terms=tuple(job_terms(job)),
+    )
+    use_boolean_search = candidate_filter.uses_boolean_search
+    narrowed_by_boolean_search = use_boolean_search
+    candidates = candidate_filter.ranking_queryset()
+
+    # Reaproveita os ids já materializados pelo preview com os mesmos filtros
+    candidate_ids = filtered_candidate_ids(candidates, candidate_filter.cache_key)
+    if candidate_ids is not None:
+        candidates = Candidate.objects.filter(id__in=candidate_ids)
+
+    # Estreita o banco pela busca booleana da vaga antes do rankeamento por IA
+    if boolean_search and not use_boolean_search:
+        pool_size = len(candidate_ids) if candidate_ids is not None else candidates.count()
+        if pool_size > BOOLEAN_NARROWING_MIN_POOL:
+            try:
+                candidates = apply_boolean_search(candidates, boolean_search)
+                narrowed_by_boolean_search = True
+            except BooleanSearchError:
+                pass
     
-    total_candidates = candidates.count()
+    candidates_list = list(candidates)
+    if candidate_ids is not None:
+        # id__in não preserva a ordem (mais relevantes primeiro)
+        position = {candidate_id: index for index, candidate_id in enumerate(candidate_ids)}
+        candidates_list.sort(key=lambda candidate: position[candidate.id])
+    total_candidates = len(candidates_list)
     if progress_callback:
         progress_callback(total=total_candidates, processed=0, current=None, status="running")
     
@@ -1585,6 +1638,7 @@ def search_and_rank_candidates_from_pool(
             "errors": 0,
             "total": 0,
             "error_details": [],
+            "narrowed_by_boolean_search": narrowed_by_boolean_search,
         }
         if progress_callback:
             progress_callback(total=0, processed=0, current=None, status="completed", result=result)
@@ -1593,6 +1647,7 @@ def search_and_rank_candidates_from_pool(
     role_titles = []
     if role_title:
         role_titles = [item.strip() for item in role_title.split("/") if item.strip()]
+    scoring_key = adherence_key(job_description, weights, role_titles)
     
     linked = 0
     errors = 0
@@ -1602,12 +1657,12 @@ def search_and_rank_candidates_from_pool(
     batch_size = 10
     processed_count = 0
     
-    candidates_list = list(candidates)
-    
     for batch_start in range(0, len(candidates_list), batch_size):
         batch = candidates_list[batch_start:batch_start + batch_size]
         batch_num = (batch_start // batch_size) + 1
         total_batches = (len(candidates_list) + batch_size - 1) // batch_size
+        # Tempo nos cargos da vaga, já somado por família de cargo (sem reler os PDFs)
+        role_years = role_years_for([candidate.id for candidate in batch], role_titles)
         
         try:
             # Separa candidatos com PDF (avaliação via currículo completo) dos sem PDF (dados estruturados)
@@ -1622,20 +1677,7 @@ def search_and_rank_candidates_from_pool(
                             continue
                     except (ValueError, OSError):
                         pass
-                without_pdf.append((candidate, {
-                    "name": candidate.name or "",
-                    "current_title": candidate.current_title or "",
-                    "current_company": candidate.current_company or "",
-                    "location": candidate.location or "",
-                    "skills": candidate.skills or "",
-                    "technologies": candidate.technologies or "",
-                    "languages": candidate.languages or "",
-                    "certifications": candidate.certifications or "",
-                    "seniority": candidate.seniority or "",
-                    "experience_time": str(candidate.experience_time) if candidate.experience_time else "",
-                    "average_tenure": str(candidate.average_tenure) if candidate.average_tenure else "",
-                    "summary": candidate.summary or "",
-                }))
+                without_pdf.append((candidate, _candidate_structured_data(candidate, role_years.get(candidate.id))))
 
             # Mapa candidato -> {adherence, technical_justification}
             results_map = {}
@@ -1682,6 +1724,7 @@ def search_and_rank_candidates_from_pool(
                         defaults={
                             "adherence_score": adherence_data.get("adherence"),
                             "technical_justification": adherence_data.get("technical_justification", ""),
+                            "adherence_key": scoring_key,
                         },
                     )
                     linked += 1
@@ -1738,20 +1781,7 @@ def search_and_rank_candidates_from_pool(
                                 raise FileNotFoundError("PDF não encontrado")
                         except (ValueError, OSError, FileNotFoundError):
                             # Fallback para dados estruturados se PDF inacessível
-                            candidate_data = {
-                                "name": candidate.name or "",
-                                "current_title": candidate.current_title or "",
-                                "current_company": candidate.current_company or "",
-                                "location": candidate.location or "",
-                                "skills": candidate.skills or "",
-                                "technologies": candidate.technologies or "",
-                                "languages": candidate.languages or "",
-                                "certifications": candidate.certifications or "",
-                                "seniority": candidate.seniority or "",
-                                "experience_time": str(candidate.experience_time) if candidate.experience_time else "",
-                                "average_tenure": str(candidate.average_tenure) if candidate.average_tenure else "",
-                                "summary": candidate.summary or "",
-                            }
+                            candidate_data = _candidate_structured_data(candidate, role_years.get(candidate.id))
                             adherence_data = calculate_adherence_for_candidate(
                                 candidate_data,
                                 job_description=job_description,
@@ -1760,20 +1790,7 @@ def search_and_rank_candidates_from_pool(
                             )
                     else:
                         # Candidato sem PDF: usa dados estruturados (comportamento atual)
-                        candidate_data = {
-                            "name": candidate.name or "",
-                            "current_title": candidate.current_title or "",
-                            "current_company": candidate.current_company or "",
-                            "location": candidate.location or "",
-                            "skills": candidate.skills or "",
-                            "technologies": candidate.technologies or "",
-                            "languages": candidate.languages or "",
-                            "certifications": candidate.certifications or "",
-                            "seniority": candidate.seniority or "",
-                            "experience_time": str(candidate.experience_time) if candidate.experience_time else "",
-                            "average_tenure": str(candidate.average_tenure) if candidate.average_tenure else "",
-                            "summary": candidate.summary or "",
-                        }
+                        candidate_data = _candidate_structured_data(candidate, role_years.get(candidate.id))
                         adherence_data = calculate_adherence_for_candidate(
                             candidate_data,
                             job_description=job_description,
@@ -1787,6 +1804,7 @@ def search_and_rank_candidates_from_pool(
                         defaults={
                             "adherence_score": adherence_data.get("adherence"),
                             "technical_justification": adherence_data.get("technical_justification", ""),
+                            "adherence_key": scoring_key,
                         },
                     )
                     linked += 1
@@ -1822,6 +1840,7 @@ def search_and_rank_candidates_from_pool(
         "errors": errors,
         "total": total_candidates,
         "error_details": error_details[:10],
+        "narrowed_by_boolean_search": narrowed_by_boolean_search,
     }
     if progress_callback:
         progress_callback(total=total_candidates, processed=processed_count, current=None, status="completed", result=result)
@@ -0,0 +1,90 @@
+"""
+Versão do banco de talentos para cache de resultados derivados (facetas, ids filtrados).
+
+Cada escopo de banco (o banco de um usuário ou o banco compartilhado do plano PREMIUM) tem uma
+versão no cache, trocada a cada escrita de Candidate ou CandidateJob. Os valores derivados são
+guardados sob chaves que incluem a versão, então uma escrita invalida tudo de uma vez sem
+precisar apagar chave por chave: as entradas antigas só deixam de ser lidas e expiram.
+"""
+import hashlib
+import json
+import secrets
+
+from django.core.cache import cache
+
+SHARED_SCOPE = "shared"
+RESULT_IDS_LIMIT = 20000
+RESULT_IDS_TIMEOUT = 60 * 30
+
+
+def pool_scope(user_id: int, shared_pool: bool) -> str:
+    return SHARED_SCOPE if shared_pool else f"user_{user_id}"
+
+
+def _version_key(scope: str) -> str:
+    return f"pool_version_{scope}"
+
+
+def _new_version() -> int:
+    # Aleatória e não incremental: duas escritas concorrentes nunca gravam a mesma versão
+    return secrets.randbits(63)
+
+
+def pool_version(scope: str) -> int:
+    """Versão atual do escopo (criada na primeira leitura)."""
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_pool_version(user_id: int | None) -> None:
+    """
+    Invalida o banco do usuário e o compartilhado (que inclui os candidatos de todos).
+    Grava uma versão nova em vez de cache.incr: no FileBasedCache o incr é ler e gravar, e
+    dois processos podiam gravar o mesmo valor, perdendo uma invalidação. O set é uma
+    escrita só (arquivo temporário + rename), então cada escrita troca a versão.
+    """
+    scopes = [SHARED_SCOPE] + ([f"user_{user_id}"] if user_id else [])
+    cache.set_many({_version_key(scope): _new_version() for scope in scopes}, timeout=None)
+
+
+def pool_cache_key(prefix: str, scope: str, *parts, filters: dict | None = None) -> str:
+    """Chave de cache ligada à versão do escopo; filters entra normalizado (ordem das chaves)."""
+    normalized = json.dumps(filters or {}, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha1(normalized.encode()).hexdigest()
+    extra = "_".join(str(part) for part in parts)
+    return f"{prefix}_{scope}_{pool_version(scope)}_{extra}_{digest}"
+
+
+def normalize_filters(filters: dict | None) -> dict:
+    """Filtros sem valores vazios e com textos aparados, para que filtros equivalentes tenham a mesma chave."""
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value in ("", None, False):
+            continue
+        normalized[key] = value
+    return normalized
+
+
+def result_ids_cache_key(scope: str, job_id: int, filters: dict | None) -> str:
+    return pool_cache_key("pool_ids", scope, job_id, filters=normalize_filters(filters))
+
+
+def filtered_candidate_ids(qs, cache_key: str) -> list[int] | None:
+    """
+    Ids (na ordem do queryset) dos candidatos filtrados, materializados uma vez e reaproveitados
+    pelo preview e pelo rankeamento. None quando o conjunto passa de RESULT_IDS_LIMIT.
+    """
+    ids = cache.get(cache_key)
+    if ids is None:
+        ids = list(qs.values_list("id", flat=True)[:RESULT_IDS_LIMIT + 1])
+        if len(ids) > RESULT_IDS_LIMIT:
+            return None
+        cache.set(cache_key, ids, timeout=RESULT_IDS_TIMEOUT)
+    return ids
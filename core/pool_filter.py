@@ -0,0 +1,175 @@
+"""
+Filtro compilado da busca de candidatos no banco de talentos para uma vaga.
+
+O preview (preview_candidates_search) e o rankeamento (search_and_rank_candidates_from_pool)
+usam o mesmo CandidateFilter, então geram exatamente a mesma consulta e a mesma chave de
+cache de ids (core.pool_cache). Com filters["semantic_search"], a consulta fica restrita aos
+SEMANTIC_TOP_N candidatos semanticamente mais próximos do texto da vaga (core.semantic_index),
+nessa ordem; com filters["keyword_ranking"], aos KEYWORD_TOP_N candidatos mais relevantes
+pelos termos da vaga, na ordem BM25 (core.keyword_index). Com os dois, vale a interseção na
+ordem BM25.
+"Ainda não vinculado à vaga" é um NOT EXISTS correlacionado
+(anti-join no PostgreSQL), servido pelo índice único de CandidateJob(job_id, candidate_id).
+"""
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from django.db.models import Case, Exists, IntegerField, OuterRef, Value, When
+
+from .boolean_search import apply_boolean_search
+from .experience import apply_experience_filters, experience_filters_from
+from .models import Candidate, CandidateJob
+from .pool_cache import normalize_filters, pool_scope, result_ids_cache_key
+from .profile_codes import apply_seniority_filters, seniority_filters_from
+from .search import apply_keyword_search, apply_tag_filters, apply_unaccent_filter, tag_filters_from
+from .keyword_index import KEYWORD_TOP_N, KeywordMatch, keyword_ranking
+from .semantic_index import SEMANTIC_TOP_N, semantic_candidate_ids
+
+# Filtros por substring do modal de busca no banco (chave do filtro -> campo de Candidate)
+POOL_TEXT_FILTERS = {
+    "name": "name",
+    "location": "location",
+    "seniority": "seniority",
+    "company": "current_company",
+    "technologies": "technologies",
+    "skills": "skills",
+    "languages": "languages",
+    "certifications": "certifications",
+}
+
+
+def pool_search_filters(data, boolean_search: str = "") -> dict:
+    """Filtros preenchidos do modal de busca (request.POST) no formato salvo/enviado ao rankeamento."""
+    filters = {}
+    for key in ("q", *POOL_TEXT_FILTERS):
+        value = (data.get(key) or "").strip()
+        if value:
+            filters[key] = value
+    if data.get("ready_only") == "on":
+        filters["ready_only"] = True
+    if data.get("use_boolean_search") == "on" and boolean_search:
+        filters["use_boolean_search"] = True
+    if data.get("semantic_search") == "on":
+        filters["semantic_search"] = True
+    if data.get("keyword_ranking") == "on":
+        filters["keyword_ranking"] = True
+    filters.update(tag_filters_from(data))
+    filters.update(experience_filters_from(data))
+    filters.update(seniority_filters_from(data))
+    return filters
+
+
+@dataclass(frozen=True)
+class CandidateFilter:
+    """
+    Candidatos do banco (do usuário ou compartilhado) ainda não vinculados à vaga, com os
+    filtros do modal. boolean_search só é aplicada se filters["use_boolean_search"],
+    semantic_query (o texto da vaga) só se filters["semantic_search"] e keyword_terms
+    ((termo, peso) da vaga, core.job_matching.job_terms) só se filters["keyword_ranking"].
+    """
+    job_id: int
+    user_id: int | None
+    shared_pool: bool = False
+    filters: dict = field(default_factory=dict)
+    boolean_search: str = ""
+    semantic_query: str = ""
+    keyword_terms: tuple = ()
+
+    @property
+    def keywords(self) -> str:
+        return (self.filters.get("q") or "").strip()
+
+    @property
+    def uses_boolean_search(self) -> bool:
+        return bool(self.boolean_search and self.filters.get("use_boolean_search"))
+
+    @property
+    def uses_semantic_search(self) -> bool:
+        return bool(self.semantic_query and self.filters.get("semantic_search"))
+
+    @cached_property
+    def semantic_ids(self) -> list[int] | None:
+        """Ids mais próximos do texto da vaga; None sem busca semântica ou com o índice em construção."""
+        if not self.uses_semantic_search:
+            return None
+        return semantic_candidate_ids(pool_scope(self.user_id, self.shared_pool), self.semantic_query)
+
+    @property
+    def uses_keyword_ranking(self) -> bool:
+        return bool(self.keyword_terms and self.filters.get("keyword_ranking"))
+
+    @cached_property
+    def keyword_matches(self) -> dict[int, KeywordMatch] | None:
+        """Ranking BM25 por id (na ordem); None sem o ranking ou com o índice em construção."""
+        if not self.uses_keyword_ranking:
+            return None
+        matches = keyword_ranking(pool_scope(self.user_id, self.shared_pool), list(self.keyword_terms))
+        if matches is None:
+            return None
+        return {match.candidate_id: match for match in matches}
+
+    @cached_property
+    def ranked_ids(self) -> list[int] | None:
+        """Ids da busca semântica e/ou do ranking BM25, na ordem em que devem aparecer."""
+        if self.keyword_matches is None:
+            return self.semantic_ids
+        if self.semantic_ids is None:
+            return list(self.keyword_matches)
+        semantic = set(self.semantic_ids)
+        return [candidate_id for candidate_id in self.keyword_matches if candidate_id in semantic]
+
+    @property
+    def ranking_limit(self) -> int | None:
+        """Corte aplicado pela busca semântica e/ou pelo ranking BM25; None sem eles."""
+        limits = []
+        if self.semantic_ids is not None:
+            limits.append(SEMANTIC_TOP_N)
+        if self.keyword_matches is not None:
+            limits.append(KEYWORD_TOP_N)
+        return min(limits, default=None)
+
+    def queryset(self):
+        """Consulta filtrada. Levanta BooleanSearchError se a busca booleana aplicada for inválida."""
+        linked = CandidateJob.objects.filter(job_id=self.job_id, candidate_id=OuterRef("pk"))
+        candidates = Candidate.objects.pool(self.user_id, self.shared_pool).filter(~Exists(linked))
+        if self.keywords:
+            candidates = apply_keyword_search(candidates, self.keywords)
+        for key, field_name in POOL_TEXT_FILTERS.items():
+            value = (self.filters.get(key) or "").strip()
+            if value:
+                candidates = apply_unaccent_filter(candidates, field_name, value)
+        if self.filters.get("ready_only"):
+            candidates = candidates.exclude(ready_at__isnull=True)
+        candidates = apply_tag_filters(candidates, self.filters)
+        candidates = apply_experience_filters(candidates, self.filters)
+        candidates = apply_seniority_filters(candidates, self.filters)
+        if self.uses_boolean_search:
+            candidates = apply_boolean_search(candidates, self.boolean_search)
+        if self.ranked_ids is not None:
+            candidates = candidates.filter(id__in=self.ranked_ids).annotate(
+                pool_rank=Case(
+                    *(When(id=candidate_id, then=Value(position)) for position, candidate_id in enumerate(self.ranked_ids)),
+                    output_field=IntegerField(),
+                )
+            )
+        return candidates
+
+    def ranking_queryset(self):
+        """Mesma consulta na ordem do rankeamento: mais próximos da vaga ou mais relevantes primeiro."""
+        candidates = self.queryset()
+        if self.ranked_ids is not None:
+            return candidates.order_by("pool_rank")
+        if self.keywords:
+            return candidates.order_by("-search_rank", "-updated_at")
+        return candidates
+
+    @property
+    def cache_key(self) -> str:
+        """Chave dos ids filtrados: versão do banco, vaga e filtros normalizados (com a expressão booleana e o texto/termos da vaga)."""
+        key_filters = {
+            **normalize_filters(self.filters),
+            "boolean_search": self.boolean_search if self.uses_boolean_search else "",
+            "semantic_query": self.semantic_query if self.semantic_ids is not None else "",
+            "keyword_terms": self.keyword_terms if self.keyword_matches is not None else (),
+        }
+        return result_ids_cache_key(pool_scope(self.user_id, self.shared_pool), self.job_id, key_filters)
@@ -0,0 +1,250 @@
+"""
+Índices em memória por banco de talentos (busca semântica, BM25), persistidos em disco.
+
+Cada escopo de banco (user_{id} e shared, como em core.pool_cache) tem um arquivo
+CACHE_DIR/{nome}/{escopo}.npz. Os workers carregam o arquivo na primeira busca e o recarregam
+quando outro processo o regrava (mtime). Um índice que ainda não existe é construído em
+segundo plano e, até lá, a busca segue sem ele. Os índices são imutáveis: cada atualização
+gera um novo objeto, então buscas em andamento nunca veem um índice pela metade.
+
+Atualizações incrementais não regravam o arquivo a cada lote: os ids alterados (gravados,
+apagados ou fundidos) vão para um diário {escopo}.pending (só de escopos com índice ou em
+construção), e o diário é aplicado ao índice de
+uma vez (flush) quando acumula FLUSH_BATCH_SIZE ids, quando o arquivo tem mais de
+FLUSH_INTERVAL segundos, no fim de uma importação ou na próxima busca. O flush relê esses
+candidatos no banco do escopo: quem não está mais lá (apagado, ou duplicata de outro usuário
+no banco compartilhado) sai do índice. Diário e arquivo só são escritos com o lock de arquivo
+do escopo ({escopo}.lock, fcntl.flock), então processos diferentes (workers do gunicorn) não
+perdem as atualizações uns dos outros.
+
+A classe do índice implementa from_candidates(queryset), with_candidates(candidatos),
+without_candidates(ids), needs_rebuild, save(path) e load(path).
+"""
+import fcntl
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+
+from .models import Candidate
+from .pool_cache import SHARED_SCOPE
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL = 60
+# Marcador de construção mais antigo que isso é de um processo que morreu no meio
+BUILD_STALE_AFTER = 60 * 30
+
+
+def save_arrays(path, **arrays) -> None:
+    """np.savez atômico: grava num arquivo temporário e substitui o anterior."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp.npz")
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, path)
+
+
+class PoolIndexStore:
+    def __init__(self, name: str, index_class, fields: tuple[str, ...]):
+        self.name = name
+        self.index_class = index_class
+        self.fields = fields
+        self._directory = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._indexes: dict[str, tuple[float, object]] = {}
+        self._background: set[tuple[str, str]] = set()
+
+    @property
+    def directory(self):
+        """CACHE_DIR/{nome}, lido a cada uso (os testes trocam CACHE_DIR), ou o diretório atribuído."""
+        return self._directory or settings.CACHE_DIR / self.name
+
+    @directory.setter
+    def directory(self, value):
+        self._directory = value
+
+    def path(self, scope: str):
+        return self.directory / f"{scope}.npz"
+
+    def pending_path(self, scope: str):
+        return self.directory / f"{scope}.pending"
+
+    @contextmanager
+    def _locked(self, scope: str):
+        """Exclusão entre threads (lock do processo) e entre processos (flock no arquivo do escopo)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._write_lock, open(self.directory / f"{scope}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def candidates(self, scope: str):
+        """Candidatos do escopo, só com os campos que o índice usa."""
+        if scope == SHARED_SCOPE:
+            candidates = Candidate.objects.pool(None, shared_pool=True)
+        else:
+            candidates = Candidate.objects.pool(int(scope.removeprefix("user_")))
+        return candidates.only("id", *self.fields)
+
+    def _put(self, scope: str, index) -> None:
+        path = self.path(scope)
+        index.save(path)
+        with self._lock:
+            self._indexes[scope] = (path.stat().st_mtime, index)
+
+    def _pending_ids(self, scope: str) -> np.ndarray:
+        try:
+            return np.fromfile(self.pending_path(scope), dtype=np.int64)
+        except FileNotFoundError:
+            return np.zeros(0, np.int64)
+
+    def _pending_count(self, scope: str) -> int:
+        try:
+            return self.pending_path(scope).stat().st_size // 8
+        except FileNotFoundError:
+            return 0
+
+    def _journal(self, scope: str, candidate_ids) -> None:
+        # Sem índice e sem construção em andamento, a próxima construção já lê o banco atualizado
+        if not self.path(scope).exists() and not self._is_building(scope):
+            return
+        with self._locked(scope), open(self.pending_path(scope), "ab") as journal:
+            journal.write(np.asarray(sorted(candidate_ids), dtype=np.int64).tobytes())
+
+    def _should_flush(self, scope: str) -> bool:
+        pending = self._pending_count(scope)
+        if not pending:
+            return False
+        try:
+            age = time.time() - self.path(scope).stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return pending >= FLUSH_BATCH_SIZE or age >= FLUSH_INTERVAL
+
+    def _building_path(self, scope: str):
+        return self.directory / f"{scope}.building"
+
+    def _is_building(self, scope: str) -> bool:
+        try:
+            return time.time() - self._building_path(scope).stat().st_mtime < BUILD_STALE_AFTER
+        except FileNotFoundError:
+            return False
+
+    def build(self, scope: str):
+        """Constrói o índice do escopo a partir de todos os seus candidatos e grava em disco."""
+        # Enquanto a construção lê o banco, nenhum flush regrava o arquivo (ele seria
+        # sobrescrito pelo índice novo): o diário só cresce e é aplicado no fim
+        with self._locked(scope):
+            self._building_path(scope).touch()
+        try:
+            index = self.index_class.from_candidates(self.candidates(scope))
+            with self._locked(scope):
+                self._put(scope, index)
+        finally:
+            self._building_path(scope).unlink(missing_ok=True)
+        return self.flush(scope) or index
+
+    def flush(self, scope: str):
+        """Aplica o diário de ids alterados ao índice do escopo. Sem índice, o diário fica para depois."""
+        with self._locked(scope):
+            ids = {int(candidate_id) for candidate_id in self._pending_ids(scope)}
+            index = self.get(scope)
+            if not ids or index is None or self._is_building(scope):
+                return index
+            present = list(self.candidates(scope).filter(id__in=ids))
+            gone = ids - {candidate.id for candidate in present}
+            if gone:
+                index = index.without_candidates(gone)
+            if present:
+                index = index.with_candidates(present)
+            self._put(scope, index)
+            self.pending_path(scope).unlink(missing_ok=True)
+        if index.needs_rebuild:
+            self.build_in_background(scope)
+        return index
+
+    def _in_background(self, task: str, scope: str, target) -> None:
+        with self._lock:
+            if (task, scope) in self._background:
+                return
+            self._background.add((task, scope))
+
+        def run():
+            try:
+                target(scope)
+            except Exception:
+                logger.exception("Falha ao atualizar o índice %s de %s (%s)", self.name, scope, task)
+            finally:
+                with self._lock:
+                    self._background.discard((task, scope))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def build_in_background(self, scope: str) -> None:
+        self._in_background("build", scope, self.build)
+
+    def get(self, scope: str):
+        """Índice do escopo em memória, recarregado do disco quando outro processo o regravou."""
+        path = self.path(scope)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._indexes.get(scope)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        index = self.index_class.load(path)
+        with self._lock:
+            self._indexes[scope] = (mtime, index)
+        return index
+
+    def get_or_build(self, scope: str):
+        """
+        Índice do escopo; None (com a construção iniciada em segundo plano) se ainda não existe.
+        Um diário pendente é aplicado em segundo plano: a busca usa o índice atual.
+        """
+        index = self.get(scope)
+        if index is None:
+            self.build_in_background(scope)
+        elif self._should_flush(scope):
+            self._in_background("flush", scope, self.flush)
+        return index
+
+    def _changed(self, scopes_by_id: dict[int, int], flush: bool) -> None:
+        by_scope = {SHARED_SCOPE: set(scopes_by_id)}
+        for candidate_id, user_id in scopes_by_id.items():
+            by_scope.setdefault(f"user_{user_id}", set()).add(candidate_id)
+        for scope, ids in by_scope.items():
+            self._journal(scope, ids)
+            if flush or self._should_flush(scope):
+                self.flush(scope)
+
+    def add_candidates(self, candidate_ids: list[int], flush: bool = False) -> int:
+        """
+        Registra esses candidatos (gravados, ou fundidos/marcados como duplicata) nos diários dos
+        seus bancos; com flush, aplica na hora (edição manual).
+        """
+        rows = dict(Candidate.objects.filter(id__in=set(candidate_ids)).values_list("id", "user_id"))
+        if rows:
+            self._changed(rows, flush)
+        return len(rows)
+
+    def remove_candidates(self, user_ids_by_id: dict[int, int]) -> None:
+        """Candidatos apagados ({id: user_id}): saem dos índices no próximo flush."""
+        if user_ids_by_id:
+            self._changed(user_ids_by_id, flush=False)
+
+    def flush_pending(self, user_id=None) -> None:
+        """Aplica os diários do banco do usuário e do compartilhado (fim de uma importação)."""
+        for scope in [SHARED_SCOPE] + ([f"user_{user_id}"] if user_id else []):
+            self.flush(scope)
+
@@ -0,0 +1,112 @@
+"""
+Senioridade e idiomas codificados em inteiros, para filtros por comparação indexada.
+
+Candidate.save() deriva do texto livre:
+
+- seniority_level: ordinal de SENIORITY_LEVELS (Trainee 1 ... Especialista 5, 0 se não
+  reconhecida), então "Pleno ou acima" é seniority_level >= 3;
+- language_mask: um bit por idioma de LANGUAGE_BITS, a partir das tags de idioma já
+  canônicas, então "Inglês E Espanhol" é language_mask IN (máscaras que contêm os dois bits).
+  A lista não é curta: com os 8 bits há 256 máscaras possíveis, e um único idioma exige 128
+  delas (metade). Mesmo assim o IN é servido pelo índice B-tree de language_mask, o que uma
+  expressão bit a bit (language_mask & n = n) não seria; cada bit novo dobra a lista.
+"""
+import re
+
+from .tags import tag_key
+
+SENIORITY_TRAINEE = 1
+SENIORITY_JUNIOR = 2
+SENIORITY_MID = 3
+SENIORITY_SENIOR = 4
+SENIORITY_SPECIALIST = 5
+
+# Nível -> rótulo (como em _infer_seniority_from_years e no prompt de extração)
+SENIORITY_CHOICES = (
+    (SENIORITY_TRAINEE, "Trainee"),
+    (SENIORITY_JUNIOR, "Junior"),
+    (SENIORITY_MID, "Pleno"),
+    (SENIORITY_SENIOR, "Senior"),
+    (SENIORITY_SPECIALIST, "Especialista"),
+)
+
+# Palavra normalizada -> nível
+SENIORITY_LEVELS = {
+    "trainee": SENIORITY_TRAINEE,
+    "estagiario": SENIORITY_TRAINEE,
+    "estagio": SENIORITY_TRAINEE,
+    "intern": SENIORITY_TRAINEE,
+    "junior": SENIORITY_JUNIOR,
+    "jr": SENIORITY_JUNIOR,
+    "pleno": SENIORITY_MID,
+    "mid": SENIORITY_MID,
+    "intermediate": SENIORITY_MID,
+    "senior": SENIORITY_SENIOR,
+    "sr": SENIORITY_SENIOR,
+    "especialista": SENIORITY_SPECIALIST,
+    "specialist": SENIORITY_SPECIALIST,
+    "staff": SENIORITY_SPECIALIST,
+    "principal": SENIORITY_SPECIALIST,
+}
+
+# Tag canônica de idioma (core.tags.LANGUAGE_ALIASES) -> bit. Só acrescentar no fim: os bits ficam gravados.
+LANGUAGE_BITS = {
+    "portugues": 1 << 0,
+    "ingles": 1 << 1,
+    "espanhol": 1 << 2,
+    "frances": 1 << 3,
+    "alemao": 1 << 4,
+    "italiano": 1 << 5,
+    "japones": 1 << 6,
+    "mandarim": 1 << 7,
+}
+ALL_LANGUAGES_MASK = sum(LANGUAGE_BITS.values())
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def seniority_level(text: str) -> int:
+    """Nível da senioridade em texto livre ("Sênior", "Pleno II", "Sr."); o mais alto citado, 0 se nenhum."""
+    levels = [SENIORITY_LEVELS.get(word, 0) for word in _WORD_RE.findall(tag_key(text or ""))]
+    return max(levels, default=0)
+
+
+def language_mask(language_tags) -> int:
+    """Bits dos idiomas conhecidos entre as tags canônicas de idioma."""
+    mask = 0
+    for tag in language_tags or []:
+        mask |= LANGUAGE_BITS.get(tag, 0)
+    return mask
+
+
+def known_language_mask(language_tags) -> int | None:
+    """Máscara das tags de um filtro; None se alguma não tem bit (o filtro segue pelas tags)."""
+    if not language_tags or any(tag not in LANGUAGE_BITS for tag in language_tags):
+        return None
+    return language_mask(language_tags)
+
+
+def masks_with_all(mask: int) -> list[int]:
+    """Todas as máscaras possíveis que contêm os bits de `mask`."""
+    return [value for value in range(ALL_LANGUAGES_MASK + 1) if value & mask == mask]
+
+
+def masks_with_any(mask: int) -> list[int]:
+    """Todas as máscaras possíveis com ao menos um bit de `mask`."""
+    return [value for value in range(ALL_LANGUAGES_MASK + 1) if value & mask]
+
+
+def seniority_filters_from(data) -> dict:
+    """Filtro "senioridade mínima" presente em request.GET/POST (ou num dict de filtros salvo)."""
+    value = str(data.get("seniority_min") or "").strip()
+    if value.isdigit() and int(value) in dict(SENIORITY_CHOICES):
+        return {"seniority_min": value}
+    return {}
+
+
+def apply_seniority_filters(qs, filters: dict, prefix: str = ""):
+    """Senioridade mínima: seniority_level >= nível (candidatos sem senioridade reconhecida ficam de fora)."""
+    value = str(filters.get("seniority_min") or "")
+    if value.isdigit():
+        qs = qs.filter(**{f"{prefix}seniority_level__gte": int(value)})
+    return qs
@@ -0,0 +1,204 @@
+"""
+Progresso de importações e buscas em background.
+
+O ProgressReporter mantém o estado atual em memória no worker que executa a tarefa e só
+publica no cache compartilhado (FileBasedCache) no máximo PROGRESS_MAX_WRITES_PER_SECOND
+vezes por segundo. Atualizações parciais são mescladas ao estado; atualizações que não
+mudam nada não geram escrita. Status finais (completed/error) são publicados na hora, e
+uma atualização retida pelo limite é publicada ao fim do intervalo (trailing flush).
+
+Cada chave tem um único reporter por worker (progress_reporter): inclusive as escritas
+finais de publish_progress passam por ele, que cancela o flush pendente. Assim um snapshot
+"running" atrasado nunca sobrescreve o completed/error no cache, e depois de um status
+final o reporter ignora atualizações "running".
+
+Cada publicação recebe uma "version" (execução + contador), usada como ETag pelos
+endpoints de status: polls sem mudança respondem 304 sem corpo. Sob ASGI, o mesmo
+estado é enviado por Server-Sent Events (progress_event_stream). As importações rodam nos
+workers WSGI e os streams no serviço Uvicorn, outro processo: o stream confere o cache no
+máximo a cada SSE_CACHE_CHECK_INTERVAL e só envia quando a versão muda.
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseNotModified, JsonResponse
+
+PROGRESS_TIMEOUT = 60 * 60
+PROGRESS_MAX_WRITES_PER_SECOND = 2
+TERMINAL_STATUSES = ("completed", "error")
+
+# Server-Sent Events: intervalo entre leituras do cache, heartbeat e duração máxima de cada conexão
+SSE_CACHE_CHECK_INTERVAL = 1.0
+SSE_HEARTBEAT_SECONDS = 15
+SSE_MAX_STREAM_SECONDS = 60 * 10
+
+# Estado quente das execuções deste worker: chave do cache -> payload publicado ou pendente
+_local_state: dict[str, dict] = {}
+# Reporter de cada execução em andamento neste worker
+_reporters: dict[str, "ProgressReporter"] = {}
+_local_lock = threading.Lock()
+
+
+class ProgressReporter:
+    """Callback de progresso com escrita limitada e coalescida no cache compartilhado."""
+
+    def __init__(self, key: str, max_writes_per_second: float = PROGRESS_MAX_WRITES_PER_SECOND, extra: dict | None = None):
+        self.key = key
+        self.min_interval = 1.0 / max_writes_per_second if max_writes_per_second else 0.0
+        self.extra = extra or {}
+        self._run = uuid.uuid4().hex[:8]
+        self._counter = 0
+        self._state: dict = {}
+        self._last_flush = 0.0
+        self._dirty = False
+        self._finished = False
+        self._timer = None
+        self._lock = threading.Lock()
+        # Opcional: persist(estado) chamado na thread de quem atualiza (ex.: contadores no banco)
+        self.persist = None
+
+    def __call__(self, **kwargs) -> None:
+        self.update(kwargs)
+
+    def update(self, changes: dict) -> None:
+        """Mescla uma atualização parcial ao estado e publica se o limite permitir."""
+        with self._lock:
+            merged = {**self._state, **self.extra, **changes}
+            merged.pop("version", None)
+            if merged == self._state:
+                return
+            self._set_state(merged)
+            state = self._state
+        self._persist(state)
+
+    def replace(self, payload: dict) -> None:
+        """Substitui o estado inteiro (ex.: início, conclusão ou erro)."""
+        with self._lock:
+            state = {**payload, **self.extra}
+            state.pop("version", None)
+            self._set_state(state)
+            state = self._state
+        self._persist(state)
+
+    def _persist(self, state: dict) -> None:
+        # Fora do lock; status finais são gravados por quem encerra a execução
+        if self.persist is not None and state.get("status") not in TERMINAL_STATUSES:
+            self.persist(state)
+
+    def _set_state(self, state: dict) -> None:
+        terminal = state.get("status") in TERMINAL_STATUSES
+        if self._finished and not terminal:
+            return
+        self._finished = self._finished or terminal
+        self._state = state
+        self._counter += 1
+        self._dirty = True
+        snapshot = {**state, "version": f"{self._run}-{self._counter}"}
+        with _local_lock:
+            if terminal:
+                _local_state.pop(self.key, None)
+                if _reporters.get(self.key) is self:
+                    del _reporters[self.key]
+            else:
+                _local_state[self.key] = snapshot
+        elapsed = time.monotonic() - self._last_flush
+        if terminal or elapsed >= self.min_interval:
+            self._flush(snapshot)
+        elif self._timer is None:
+            self._timer = threading.Timer(self.min_interval - elapsed, self._flush_pending)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_pending(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._dirty:
+                self._flush({**self._state, "version": f"{self._run}-{self._counter}"})
+
+    def _flush(self, snapshot: dict) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        cache.set(self.key, snapshot, timeout=PROGRESS_TIMEOUT)
+        self._last_flush = time.monotonic()
+        self._dirty = False
+
+
+def progress_reporter(key: str, extra: dict | None = None, persist=None) -> ProgressReporter:
+    """Reporter da chave neste worker (o mesmo enquanto a execução não termina)."""
+    with _local_lock:
+        reporter = _reporters.get(key)
+        if reporter is None:
+            reporter = _reporters[key] = ProgressReporter(key)
+    if extra or persist:
+        with reporter._lock:
+            reporter.extra = {**reporter.extra, **(extra or {})}
+            reporter.persist = persist or reporter.persist
+    return reporter
+
+
+def publish_progress(key: str, payload: dict) -> None:
+    """Publica um payload de progresso imediatamente, pelo reporter da chave."""
+    progress_reporter(key).replace(payload)
+
+
+def _local_progress(key: str) -> dict | None:
+    with _local_lock:
+        return _local_state.get(key)
+
+
+def read_progress(key: str) -> dict | None:
+    """Lê o progresso: do estado em memória se a execução roda neste worker, senão do cache."""
+    snapshot = _local_progress(key)
+    if snapshot is not None:
+        return snapshot
+    return cache.get(key)
+
+
+def progress_response(request, key: str, default: dict | None = None) -> JsonResponse | HttpResponseNotModified:
+    """Resposta JSON do progresso com ETag; devolve 304 quando nada mudou desde o último poll."""
+    payload = read_progress(key) or default or {"status": "idle"}
+    etag = f'"{payload.get("version", "idle")}"'
+    if request.META.get("HTTP_IF_NONE_MATCH") == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(payload)
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+async def progress_event_stream(key: str, default: dict | None = None):
+    """
+    Gera eventos SSE ("event: progress") a cada nova versão do progresso, conferida a cada
+    SSE_CACHE_CHECK_INTERVAL (da memória se a execução roda neste processo, senão do cache).
+    Encerra após enviar um status diferente de "running" ou após SSE_MAX_STREAM_SECONDS (o
+    navegador reconecta sozinho). Comentários periódicos mantêm a conexão aberta em proxies.
+    """
+    read_cache = sync_to_async(cache.get, thread_sensitive=False)
+    started = time.monotonic()
+    last_sent = started
+    last_version = None
+    yield "retry: 3000\n\n"
+    while True:
+        payload = _local_progress(key) or await read_cache(key) or default or {"status": "idle"}
+        version = payload.get("version", "idle")
+        now = time.monotonic()
+        if version != last_version:
+            last_version = version
+            last_sent = now
+            yield f"event: progress\ndata: {json.dumps(payload, cls=DjangoJSONEncoder)}\n\n"
+            if payload.get("status") != "running":
+                return
+        elif now - last_sent >= SSE_HEARTBEAT_SECONDS:
+            last_sent = now
+            yield ": ping\n\n"
+        if now - started >= SSE_MAX_STREAM_SECONDS:
+            return
+        await asyncio.sleep(SSE_CACHE_CHECK_INTERVAL)
@@ -0,0 +1,138 @@
+"""
+Armazenamento de currículos endereçado por conteúdo.
+
+Cada PDF é gravado uma única vez em resumes/blobs/{hash[:2]}/{sha256}.pdf. Candidatos
+com o mesmo currículo (inclusive de usuários diferentes no pool compartilhado) apontam
+para o mesmo arquivo. Arquivos que não são mais referenciados por nenhum candidato são
+removidos por collect_unreferenced_resumes (comando gc_resumes). Um arquivo reaproveitado
+por uma nova importação tem a data de modificação renovada, para a coleta não apagá-lo antes
+de o candidato passar a apontar para ele. Candidatos gravados antes do armazenamento por hash
+são migrados por backfill_resume_hashes (comando backfill_resume_hashes).
+"""
+import hashlib
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+RESUMES_ROOT = "resumes"
+BLOBS_ROOT = f"{RESUMES_ROOT}/blobs"
+
+
+def _sha256_of(f) -> str:
+    digest = hashlib.sha256()
+    for block in iter(lambda: f.read(1024 * 1024), b""):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def file_sha256(path: str | Path) -> str:
+    with open(path, "rb") as f:
+        return _sha256_of(f)
+
+
+def blob_name(content_hash: str) -> str:
+    return f"{BLOBS_ROOT}/{content_hash[:2]}/{content_hash}.pdf"
+
+
+def _touch(name: str) -> None:
+    """Renova a data de modificação do arquivo (protege da coleta pelo período de carência)."""
+    try:
+        os.utime(default_storage.path(name))
+    except (NotImplementedError, OSError):
+        pass
+
+
+def _store_blob(f, content_hash: str) -> str:
+    name = blob_name(content_hash)
+    if default_storage.exists(name):
+        _touch(name)
+        return name
+    saved_name = default_storage.save(name, File(f))
+    if saved_name != name:
+        # Outra importação gravou o mesmo conteúdo ao mesmo tempo: mantém o original
+        default_storage.delete(saved_name)
+        _touch(name)
+    return name
+
+
+def store_resume_blob(pdf_path: str | Path, content_hash: str) -> str:
+    """Grava o PDF no caminho do hash, se ainda não existir. Retorna o nome no storage."""
+    with open(pdf_path, "rb") as f:
+        return _store_blob(f, content_hash)
+
+
+def _walk(path: str):
+    try:
+        dirs, files = default_storage.listdir(path)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield f"{path}/{name}"
+    for directory in dirs:
+        yield from _walk(f"{path}/{directory}")
+
+
+def collect_unreferenced_resumes(dry_run: bool = False, min_age: timedelta = timedelta(hours=1)) -> dict:
+    """
+    Remove de resumes/ os arquivos que nenhum candidato referencia.
+    Arquivos mais novos que min_age são mantidos (podem pertencer a uma importação em andamento).
+    """
+    from .models import Candidate
+
+    referenced = set(
+        Candidate.objects.exclude(resume_pdf="")
+        .exclude(resume_pdf__isnull=True)
+        .values_list("resume_pdf", flat=True)
+    )
+    cutoff = timezone.now() - min_age
+    scanned = 0
+    removed = []
+    for name in _walk(RESUMES_ROOT):
+        scanned += 1
+        if name in referenced:
+            continue
+        try:
+            if default_storage.get_modified_time(name) > cutoff:
+                continue
+        except (NotImplementedError, OSError):
+            continue
+        # Confere de novo: um candidato pode ter passado a apontar para o arquivo durante a varredura
+        if Candidate.objects.filter(resume_pdf=name).exists():
+            continue
+        if not dry_run:
+            default_storage.delete(name)
+        removed.append(name)
+    return {"scanned": scanned, "removed": len(removed), "removed_names": removed[:50]}
+
+
+def backfill_resume_hashes(dry_run: bool = False) -> dict:
+    """
+    Candidatos gravados antes do armazenamento por hash (resume_sha256 vazio): calcula o hash do
+    PDF, aponta o candidato para o blob (gravado uma vez por conteúdo) e deixa o arquivo antigo
+    para a coleta. Retorna {"updated", "missing"} (missing: PDF não encontrado no storage).
+    """
+    from .models import Candidate
+
+    updated = missing = 0
+    candidates = (
+        Candidate.objects.filter(resume_sha256="").exclude(resume_pdf="").exclude(resume_pdf__isnull=True)
+        .only("id", "resume_pdf", "resume_sha256")
+    )
+    for candidate in candidates.iterator(chunk_size=500):
+        try:
+            with default_storage.open(candidate.resume_pdf.name, "rb") as f:
+                content_hash = _sha256_of(f)
+                if not dry_run:
+                    f.seek(0)
+                    name = _store_blob(f, content_hash)
+        except FileNotFoundError:
+            missing += 1
+            continue
+        if not dry_run:
+            Candidate.objects.filter(id=candidate.id).update(resume_pdf=name, resume_sha256=content_hash)
+        updated += 1
+    return {"updated": updated, "missing": missing}
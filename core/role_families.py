@@ -0,0 +1,70 @@
+"""
+Famílias de cargo (engenharia de dados, backend, produto...) e anos de cada candidato em cada uma.
+
+O título de cada experiência (CandidateExperience.title_key) é classificado nas famílias de
+ROLE_FAMILIES cujas expressões ele contém, palavra por palavra ("engenheiro de dados sênior"
+-> data_engineer; "desenvolvedor backend" -> backend_developer e software_engineer). A soma
+dos meses por família fica em CandidateRoleYears, recalculada junto com as experiências a
+cada importação. Assim o tempo no cargo de qualquer vaga sai de uma consulta indexada
+(família, meses), sem reler PDFs.
+"""
+from .search import text_tokens
+
+# Família -> expressões (PT/EN) que identificam o cargo no título
+ROLE_FAMILIES = {
+    "data_engineer": ("engenheiro de dados", "engenheira de dados", "engenharia de dados", "data engineer", "analytics engineer", "big data"),
+    "data_scientist": ("cientista de dados", "ciência de dados", "data scientist", "data science"),
+    "data_analyst": ("analista de dados", "data analyst", "analista de bi", "bi analyst", "business intelligence", "analista de business intelligence"),
+    "ml_engineer": ("machine learning", "ml engineer", "mlops", "ai engineer", "engenheiro de ia", "engenheira de ia", "engenheiro de inteligência artificial"),
+    "backend_developer": ("backend", "back end", "back-end"),
+    "frontend_developer": ("frontend", "front end", "front-end"),
+    "fullstack_developer": ("fullstack", "full stack", "full-stack"),
+    "mobile_developer": ("mobile", "android", "ios", "react native", "flutter"),
+    "software_engineer": (
+        "software engineer", "engenheiro de software", "engenheira de software", "desenvolvedor", "desenvolvedora",
+        "developer", "programador", "programadora", "analista de sistemas", "analista desenvolvedor", "software developer",
+    ),
+    "devops_engineer": ("devops", "sre", "site reliability", "platform engineer", "engenheiro de plataforma", "cloud engineer", "engenheiro cloud", "engenheiro de cloud", "infraestrutura", "infrastructure"),
+    "qa_engineer": ("qa", "quality assurance", "analista de testes", "analista de qualidade", "tester", "test engineer", "sdet"),
+    "security_engineer": ("segurança da informação", "cybersecurity", "cibersegurança", "security engineer", "analista de segurança"),
+    "database_administrator": ("dba", "database administrator", "administrador de banco de dados"),
+    "product_manager": ("product manager", "gerente de produto", "product owner", "po", "head de produto", "head of product"),
+    "project_manager": ("project manager", "gerente de projetos", "gerente de projeto", "scrum master", "agile coach"),
+    "designer": ("ux", "ui", "product designer", "designer"),
+    "engineering_manager": (
+        "tech lead", "líder técnico", "lider tecnico", "technical lead", "engineering manager", "gerente de engenharia",
+        "head de engenharia", "head of engineering", "cto", "coordenador de desenvolvimento", "coordenador de ti",
+    ),
+    "support_analyst": ("suporte", "support", "help desk", "service desk"),
+}
+
+# Expressões já normalizadas como os títulos (tuplas de palavras)
+_FAMILY_PATTERNS = {
+    family: tuple(tuple(text_tokens(pattern)) for pattern in patterns)
+    for family, patterns in ROLE_FAMILIES.items()
+}
+
+
+def _contains(tokens: tuple[str, ...], pattern: tuple[str, ...]) -> bool:
+    size = len(pattern)
+    return any(tokens[start:start + size] == pattern for start in range(len(tokens) - size + 1))
+
+
+def role_families(title: str) -> list[str]:
+    """Famílias do título (texto livre ou já normalizado), na ordem de ROLE_FAMILIES."""
+    tokens = tuple(text_tokens(title))
+    if not tokens:
+        return []
+    return [
+        family for family, patterns in _FAMILY_PATTERNS.items()
+        if any(pattern and _contains(tokens, pattern) for pattern in patterns)
+    ]
+
+
+def role_family_months(experiences) -> dict[str, int]:
+    """Meses por família a partir de pares (título, meses) das experiências (0 se a duração não foi lida)."""
+    months: dict[str, int] = {}
+    for title, duration in experiences:
+        for family in role_families(title):
+            months[family] = months.get(family, 0) + (duration or 0)
+    return months
@@ -0,0 +1,169 @@
+"""
+Busca textual de candidatos no PostgreSQL.
+
+Candidate.search_document é um tsvector gerado pelo próprio banco (coluna GENERATED, então
+fica atualizado em todo INSERT/UPDATE) e indexado com GIN. O documento combina duas
+configurações sem acento, talent_pt (stemming em português) e talent_en (inglês), com pesos:
+A = nome e cargo, B = skills e tecnologias, C = empresa, local, senioridade, idiomas e
+certificações, D = resumo. As configurações são criadas na migração 0023.
+
+Filtros por substring (nome, local, skills...) usam lower(immutable_unaccent(campo)) LIKE
+'%termo%'. immutable_unaccent é um wrapper IMMUTABLE de unaccent (migração 0024), o que
+permite os índices GIN pg_trgm de Candidate.Meta.indexes sobre exatamente essa expressão.
+
+Filtros exatos por tag ({campo}_all, {campo}_any, {campo}_none, ex.: technologies_all=
+"python, kubernetes") usam os arrays de tags canônicas (core.tags) com índice GIN.
+"""
+import re
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, Func, TextField
+from django.db.models.functions import Lower
+from django.db.models.lookups import Contains
+
+from .profile_codes import known_language_mask, masks_with_all, masks_with_any
+from .tags import TAG_FIELDS, parse_tag_list
+
+SEARCH_CONFIG_PT = "talent_pt"
+SEARCH_CONFIG_EN = "talent_en"
+
+# Colunas de Candidate com índice trigram sobre lower(immutable_unaccent(coluna))
+TRIGRAM_FIELDS = (
+    "name",
+    "current_title",
+    "current_company",
+    "location",
+    "seniority",
+    "skills",
+    "technologies",
+    "languages",
+    "certifications",
+)
+
+TAG_FILTER_MODES = ("all", "any", "none")
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = frozenset("""
+a ao aos as com da das de do dos e em na nas no nos o os ou para por que se um uma
+an and at by for from in is of on or the to with
+""".split())
+
+_WEIGHTED_FIELDS = (
+    ("A", ("name", "current_title")),
+    ("B", ("skills", "technologies")),
+    ("C", ("current_company", "location", "seniority", "languages", "certifications")),
+    ("D", ("summary",)),
+)
+# Campos também indexados com o stemming em inglês (texto livre, frequentemente em inglês)
+_ENGLISH_FIELDS = (
+    ("B", ("skills", "technologies")),
+    ("D", ("summary",)),
+)
+
+
+def search_document_expression():
+    """Expressão do tsvector ponderado usada pela coluna gerada Candidate.search_document."""
+    vectors = [
+        SearchVector(*fields, config=SEARCH_CONFIG_PT, weight=weight)
+        for weight, fields in _WEIGHTED_FIELDS
+    ] + [
+        SearchVector(*fields, config=SEARCH_CONFIG_EN, weight=weight)
+        for weight, fields in _ENGLISH_FIELDS
+    ]
+    document = vectors[0]
+    for vector in vectors[1:]:
+        document = document + vector
+    return document
+
+
+def keyword_query(text: str) -> SearchQuery:
+    """Consulta no formato de busca web ("python django", "aws -azure", "\"data engineer\"")."""
+    return (
+        SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG_PT)
+        | SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG_EN)
+    )
+
+
+def apply_keyword_search(qs, text: str, prefix: str = ""):
+    """
+    Filtra por palavras-chave no documento de busca e anota search_rank (ts_rank ponderado).
+    prefix permite aplicar a partir de outro model (ex.: "candidate__" em CandidateJob).
+    """
+    text = (text or "").strip()
+    if not text:
+        return qs
+    query = keyword_query(text)
+    document = F(f"{prefix}search_document")
+    return qs.filter(**{f"{prefix}search_document": query}).annotate(search_rank=SearchRank(document, query))
+
+
+class ImmutableUnaccent(Func):
+    """unaccent() marcado como IMMUTABLE, utilizável em índices de expressão."""
+    function = "immutable_unaccent"
+    output_field = TextField()
+
+
+def unaccent_lower(field: str):
+    """Expressão indexada: lower(immutable_unaccent(campo))."""
+    return Lower(ImmutableUnaccent(F(field)))
+
+
+def normalize_term(value: str) -> str:
+    """Remove acentos e passa para minúsculas, como a expressão indexada faz no banco."""
+    normalized = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in normalized if not unicodedata.combining(char)).lower()
+
+
+def text_tokens(text: str) -> list[str]:
+    """Palavras normalizadas do texto, sem stopwords ("C++", "node.js" e "C#" ficam inteiros)."""
+    return [token for token in _TOKEN_RE.findall(normalize_term(text or "")) if token not in _STOPWORDS]
+
+
+def apply_unaccent_filter(qs, field: str, term: str):
+    """
+    Filtro por substring sem acento e sem diferenciar maiúsculas. Emite exatamente a
+    expressão dos índices trigram, então o planner usa o índice em vez de varrer a tabela.
+    field pode atravessar relações (ex.: "candidate__skills").
+    """
+    term = (term or "").strip()
+    if not term:
+        return qs
+    return qs.filter(Contains(unaccent_lower(field), normalize_term(term)))
+
+
+def tag_filters_from(data) -> dict:
+    """Filtros de tags presentes em request.GET/POST (ou num dict de filtros salvo)."""
+    filters = {}
+    for field in TAG_FIELDS:
+        for mode in TAG_FILTER_MODES:
+            value = (data.get(f"{field}_{mode}") or "").strip()
+            if value:
+                filters[f"{field}_{mode}"] = value
+    return filters
+
+
+def apply_tag_filters(qs, filters: dict, prefix: str = ""):
+    """
+    Aplica filtros exatos por tag: _all exige todas (@>), _any ao menos uma (&&) e _none
+    exclui quem tem qualquer uma. Os termos passam pela mesma normalização das tags salvas.
+    """
+    for field, tags_field in TAG_FIELDS.items():
+        lookup = f"{prefix}{tags_field}"
+        all_tags = parse_tag_list(filters.get(f"{field}_all", ""), field)
+        any_tags = parse_tag_list(filters.get(f"{field}_any", ""), field)
+        none_tags = parse_tag_list(filters.get(f"{field}_none", ""), field)
+        if field == "languages":
+            # Idiomas conhecidos: comparação na máscara de bits indexada em vez do array
+            all_mask, any_mask = known_language_mask(all_tags), known_language_mask(any_tags)
+            if all_mask is not None:
+                qs, all_tags = qs.filter(**{f"{prefix}language_mask__in": masks_with_all(all_mask)}), []
+            if any_mask is not None:
+                qs, any_tags = qs.filter(**{f"{prefix}language_mask__in": masks_with_any(any_mask)}), []
+        if all_tags:
+            qs = qs.filter(**{f"{lookup}__contains": all_tags})
+        if any_tags:
+            qs = qs.filter(**{f"{lookup}__overlap": any_tags})
+        if none_tags:
+            qs = qs.exclude(**{f"{lookup}__overlap": none_tags})
+    return qs
@@ -0,0 +1,269 @@
+"""
+Busca semântica local (só CPU) de candidatos por vaga.
+
+Cada candidato vira um vetor denso a partir de current_title, skills, technologies e summary:
+termos e bigramas normalizados (mais as tags canônicas de core.tags) entram num espaço de
+HASH_DIMENSIONS posições por feature hashing, com peso TF-IDF, e são projetados em
+COMPONENTS dimensões por LSA (SVD aleatorizado sobre uma amostra do banco). Como o LSA
+aprende as co-ocorrências do próprio banco, "pipelines de dados com Spark" fica perto de
+"Databricks" mesmo sem o termo literal.
+
+Os vetores de cada banco (user_{id} e shared, como em core.pool_cache) ficam num índice IVF
+em memória (k-means esférico; a busca só visita as NPROBE listas mais próximas da consulta),
+persistido em CACHE_DIR/semantic/{escopo}.npz (core.pool_index_store). A importação só
+projeta e insere os candidatos do lote; o modelo é reajustado em segundo plano quando o banco
+cresce REFIT_GROWTH vezes desde o último ajuste. Requer numpy.
+
+A busca semântica é um corte: só os SEMANTIC_TOP_N candidatos mais próximos da vaga entram no
+preview e no rankeamento (a tela avisa o limite).
+"""
+import math
+import zlib
+from dataclasses import dataclass, replace
+
+import numpy as np
+from django.db.models import Max, Min
+
+from .models import Candidate
+from .pool_index_store import PoolIndexStore, save_arrays
+from .search import text_tokens
+
+HASH_DIMENSIONS = 2 ** 12
+COMPONENTS = 128
+FIT_SAMPLE_SIZE = 2000
+SAMPLE_RANGES = 20
+EMBED_CHUNK_SIZE = 1000
+# Abaixo disso a busca é exata (produto com todos os vetores); acima, IVF
+IVF_MIN_SIZE = 5000
+MAX_LISTS = 256
+NPROBE = 8
+KMEANS_ITERATIONS = 10
+REFIT_GROWTH = 2
+SEMANTIC_TOP_N = 200
+
+# Campo de Candidate -> peso das suas features
+SOURCE_FIELDS = {"current_title": 2.0, "technologies": 1.5, "skills": 1.5, "summary": 1.0}
+TAG_WEIGHT = 2.0
+
+# Rótulos do texto de _build_job_description, que não dizem nada sobre a vaga
+_LABEL_WORDS = frozenset(
+    "titulo resumo senioridade localizacao stack tipo contratacao idioma skills obrigatorias desejaveis nao observacoes".split()
+)
+
+
+def _hash(feature: str) -> tuple[int, float]:
+    """Posição e sinal da feature (o sinal compensa colisões no produto interno)."""
+    value = zlib.crc32(feature.encode())
+    return value % HASH_DIMENSIONS, 1.0 if value & 0x80000000 else -1.0
+
+
+def text_features(text: str, weight: float = 1.0) -> dict[int, float]:
+    """Termos e bigramas do texto no espaço de hash, com tf sublinear."""
+    tokens = [token for token in text_tokens(text) if token not in _LABEL_WORDS]
+    counts: dict[str, int] = {}
+    for index, token in enumerate(tokens):
+        counts[token] = counts.get(token, 0) + 1
+        if index:
+            bigram = f"{tokens[index - 1]} {token}"
+            counts[bigram] = counts.get(bigram, 0) + 1
+    features: dict[int, float] = {}
+    for feature, count in counts.items():
+        position, sign = _hash(feature)
+        features[position] = features.get(position, 0.0) + sign * weight * (1 + math.log(count))
+    return features
+
+
+def candidate_features(candidate: Candidate) -> dict[int, float]:
+    features: dict[int, float] = {}
+    for field, weight in SOURCE_FIELDS.items():
+        for position, value in text_features(getattr(candidate, field), weight).items():
+            features[position] = features.get(position, 0.0) + value
+    for tag in (candidate.technology_tags or []) + (candidate.skill_tags or []):
+        position, sign = _hash(f"tag:{tag}")
+        features[position] = features.get(position, 0.0) + sign * TAG_WEIGHT
+    return features
+
+
+def _dense(rows: list[dict[int, float]]) -> np.ndarray:
+    matrix = np.zeros((len(rows), HASH_DIMENSIONS), dtype=np.float32)
+    for index, features in enumerate(rows):
+        if features:
+            matrix[index, list(features)] = list(features.values())
+    return matrix
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@dataclass
+class SemanticModel:
+    """Pesos IDF por posição de hash e base LSA (HASH_DIMENSIONS x k)."""
+    idf: np.ndarray
+    components: np.ndarray
+
+    def embed(self, rows: list[dict[int, float]]) -> np.ndarray:
+        vectors = np.empty((len(rows), self.components.shape[1]), dtype=np.float32)
+        for start in range(0, len(rows), EMBED_CHUNK_SIZE):
+            chunk = _dense(rows[start:start + EMBED_CHUNK_SIZE]) * self.idf
+            vectors[start:start + EMBED_CHUNK_SIZE] = _normalize(chunk) @ self.components
+        return _normalize(vectors)
+
+
+def fit_model(rows: list[dict[int, float]], components: int = COMPONENTS, seed: int = 0) -> SemanticModel:
+    """IDF e LSA (SVD aleatorizado) sobre uma amostra de documentos."""
+    matrix = _dense(rows)
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = (np.log((1 + len(rows)) / (1 + document_frequency)) + 1).astype(np.float32)
+    matrix = _normalize(matrix * idf)
+    k = max(1, min(components, len(rows), HASH_DIMENSIONS))
+    rng = np.random.default_rng(seed)
+    sketch = matrix.T @ (matrix @ rng.standard_normal((HASH_DIMENSIONS, k + 10), dtype=np.float32))
+    basis, _ = np.linalg.qr(sketch)
+    _, _, right = np.linalg.svd(matrix @ basis, full_matrices=False)
+    return SemanticModel(idf=idf, components=(basis @ right.T[:, :k]).astype(np.float32))
+
+
+def _kmeans(vectors: np.ndarray, lists: int, seed: int = 0) -> np.ndarray:
+    """k-means esférico (similaridade de cosseno): centróides normalizados."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for index in range(lists):
+            members = vectors[assignments == index]
+            if len(members):
+                centroids[index] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+
+def sample_candidates(candidates, size: int = FIT_SAMPLE_SIZE) -> list[Candidate]:
+    """
+    Amostra para o ajuste do modelo: SAMPLE_RANGES faixas de ids consecutivos a partir de
+    pontos aleatórios entre o menor e o maior id. Cada faixa é uma leitura pelo índice da
+    chave primária; order_by("?") ordenaria o banco inteiro. A primeira faixa começa no menor
+    id, então um banco menor que uma faixa entra inteiro.
+    """
+    bounds = candidates.aggregate(low=Min("id"), high=Max("id"))
+    if bounds["low"] is None:
+        return []
+    per_range = max(size // SAMPLE_RANGES, 1)
+    starts = np.random.default_rng(0).integers(bounds["low"], bounds["high"] + 1, size=SAMPLE_RANGES - 1)
+    sample = {}
+    for start in [bounds["low"], *sorted(starts.tolist())]:
+        for candidate in candidates.filter(id__gte=start).order_by("id")[:per_range]:
+            sample[candidate.id] = candidate
+    return list(sample.values())[:size]
+
+
+@dataclass
+class SemanticIndex:
+    model: SemanticModel
+    ids: np.ndarray
+    vectors: np.ndarray
+    centroids: np.ndarray
+    assignments: np.ndarray
+    # Tamanho do banco quando o modelo foi ajustado (base de REFIT_GROWTH)
+    fitted_on: int
+
+    @classmethod
+    def build(cls, model: SemanticModel, ids: np.ndarray, vectors: np.ndarray, fitted_on: int) -> "SemanticIndex":
+        centroids = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        if len(ids) >= IVF_MIN_SIZE:
+            sample = vectors[np.random.default_rng(0).permutation(len(vectors))[:50 * MAX_LISTS]]
+            centroids = _kmeans(sample, min(MAX_LISTS, int(math.sqrt(len(ids)))))
+        index = cls(model, ids, vectors, centroids, np.zeros(len(ids), dtype=np.int32), fitted_on)
+        index.assignments = index._assign(vectors)
+        return index
+
+    @classmethod
+    def from_candidates(cls, candidates) -> "SemanticIndex":
+        """Ajusta o modelo numa amostra do banco e projeta todos os candidatos."""
+        model = fit_model([candidate_features(c) for c in sample_candidates(candidates)] or [{}])
+        ids, rows = [], []
+        for candidate in candidates.order_by("id").iterator(chunk_size=EMBED_CHUNK_SIZE):
+            ids.append(candidate.id)
+            rows.append(candidate_features(candidate))
+        vectors = model.embed(rows) if rows else np.zeros((0, model.components.shape[1]), dtype=np.float32)
+        return cls.build(model, np.asarray(ids, dtype=np.int64), vectors, fitted_on=len(ids))
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if not len(self.centroids) or not len(vectors):
+            return np.zeros(len(vectors), dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def upsert(self, ids: list[int], vectors: np.ndarray) -> "SemanticIndex":
+        """Novo índice com os vetores desses candidatos inseridos ou substituídos (cada um na lista do centróide mais próximo)."""
+        new_ids = np.asarray(ids, dtype=np.int64)
+        keep = ~np.isin(self.ids, new_ids)
+        return replace(
+            self,
+            ids=np.concatenate([self.ids[keep], new_ids]),
+            vectors=np.concatenate([self.vectors[keep], vectors.astype(np.float32)]),
+            assignments=np.concatenate([self.assignments[keep], self._assign(vectors)]),
+        )
+
+    def with_candidates(self, candidates: list[Candidate]) -> "SemanticIndex":
+        return self.upsert([c.id for c in candidates], self.model.embed([candidate_features(c) for c in candidates]))
+
+    def without_candidates(self, ids) -> "SemanticIndex":
+        """Novo índice sem esses candidatos (apagados ou fora do banco)."""
+        keep = ~np.isin(self.ids, np.fromiter(ids, dtype=np.int64))
+        return replace(self, ids=self.ids[keep], vectors=self.vectors[keep], assignments=self.assignments[keep])
+
+    def search(self, query: np.ndarray, top_n: int = SEMANTIC_TOP_N, nprobe: int = NPROBE) -> list[tuple[int, float]]:
+        """(id, similaridade de cosseno) dos top_n vetores mais próximos, do mais similar ao menos."""
+        rows = np.arange(len(self.ids))
+        if len(self.centroids) > nprobe:
+            probe = np.argpartition(-(self.centroids @ query), nprobe)[:nprobe]
+            rows = np.flatnonzero(np.isin(self.assignments, probe))
+        if not len(rows):
+            return []
+        scores = self.vectors[rows] @ query
+        top = np.argpartition(-scores, min(top_n, len(scores)) - 1)[:top_n]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.ids[rows[i]]), float(scores[i])) for i in top]
+
+    @property
+    def needs_rebuild(self) -> bool:
+        """O banco cresceu REFIT_GROWTH vezes desde o ajuste do modelo."""
+        return len(self.ids) > REFIT_GROWTH * max(self.fitted_on, FIT_SAMPLE_SIZE // REFIT_GROWTH)
+
+    def save(self, path) -> None:
+        save_arrays(
+            path,
+            idf=self.model.idf,
+            components=self.model.components,
+            ids=self.ids,
+            vectors=self.vectors,
+            centroids=self.centroids,
+            assignments=self.assignments,
+            fitted_on=np.int64(self.fitted_on),
+        )
+
+    @classmethod
+    def load(cls, path) -> "SemanticIndex":
+        with np.load(path) as data:
+            return cls(
+                SemanticModel(data["idf"], data["components"]),
+                data["ids"], data["vectors"], data["centroids"], data["assignments"], int(data["fitted_on"]),
+            )
+
+
+semantic_indexes = PoolIndexStore("semantic", SemanticIndex, (*SOURCE_FIELDS, "technology_tags", "skill_tags"))
+
+
+def semantic_candidate_ids(scope: str, text: str, top_n: int = SEMANTIC_TOP_N) -> list[int] | None:
+    """
+    Ids dos top_n candidatos do banco mais próximos do texto (ex.: _build_job_description), do
+    mais similar ao menos. None se o índice do banco ainda não existe: a construção começa em
+    segundo plano e a busca segue sem o filtro semântico.
+    """
+    index = semantic_indexes.get_or_build(scope)
+    if index is None:
+        return None
+    query = index.model.embed([text_features(text)])[0]
+    return [candidate_id for candidate_id, _ in index.search(query, top_n)]
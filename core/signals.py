@@ -1,10 +1,17 @@
+from functools import lru_cache
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.contrib.sessions.models import Session
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
-from .models import Profile
+from .autocomplete import STATE_COLUMNS, record_term_changes
+from .keyword_index import keyword_indexes
+from .models import Candidate, CandidateJob, Job, Profile
+from .pool_cache import bump_pool_version
+from .semantic_index import semantic_indexes
 
 User = get_user_model()
 
@@ -33,3 +40,86 @@ def clear_single_session(sender, request, user, **kwargs):
     if not user:
         return
     Profile.objects.filter(user=user).update(last_session_key="")
+
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def invalidate_pool_cache(sender, instance, **kwargs):
+    bump_pool_version(instance.user_id)
+
+
+@lru_cache(maxsize=4096)
+def _job_owner_id(job_id: int) -> int | None:
+    # O dono de uma vaga nunca muda e ids não são reaproveitados: pode ficar em memória
+    return Job.objects.filter(id=job_id).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=CandidateJob)
+@receiver(post_delete, sender=CandidateJob)
+def invalidate_pool_cache_for_job(sender, instance, **kwargs):
+    # Vínculos mudam o conjunto "candidatos ainda não vinculados à vaga" do preview/rankeamento
+    if CandidateJob.job.is_cached(instance):
+        bump_pool_version(instance.job.user_id)
+    else:
+        bump_pool_version(_job_owner_id(instance.job_id))
+
+
+_STATE_FIELDS = {*STATE_COLUMNS, 'user', 'duplicate_of'}
+
+
+def _term_state(instance) -> dict:
+    return {column: getattr(instance, column) for column in STATE_COLUMNS}
+
+
+def _touches_terms(kwargs) -> bool:
+    update_fields = kwargs.get('update_fields')
+    return update_fields is None or bool(set(update_fields) & _STATE_FIELDS)
+
+
+@receiver(post_init, sender=Candidate)
+def remember_candidate_terms(sender, instance, **kwargs):
+    # Estado carregado do banco: serve de "antes" no save/delete sem um SELECT a mais.
+    # Instâncias com colunas adiadas (only/defer) ficam sem estado e consultam o banco.
+    loaded = all(column in instance.__dict__ for column in STATE_COLUMNS)
+    instance._terms_state = _term_state(instance) if loaded else None
+
+
+def _stored_state(instance) -> dict:
+    if instance._terms_state is None:
+        instance._terms_state = Candidate.objects.filter(pk=instance.pk).values(*STATE_COLUMNS).first() or {}
+    return instance._terms_state
+
+
+@receiver(pre_save, sender=Candidate)
+def snapshot_candidate_terms(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or not instance.pk or not _touches_terms(kwargs):
+        return
+    _stored_state(instance)
+
+
+@receiver(post_save, sender=Candidate)
+def update_pool_terms(sender, instance, created, raw=False, **kwargs):
+    if raw or not _touches_terms(kwargs):
+        return
+    before = {} if created else instance._terms_state or {}
+    after = _term_state(instance)
+    record_term_changes(before, after)
+    instance._terms_state = after
+
+
+@receiver(pre_delete, sender=Candidate)
+def remove_pool_terms(sender, instance, **kwargs):
+    record_term_changes(_stored_state(instance), {})
+
+
+@receiver(post_delete, sender=Candidate)
+def remove_from_pool_indexes(sender, instance, **kwargs):
+    # Apagados (inclusive os duplicados de uma fusão) saem dos índices no próximo flush. Só
+    # depois do commit: um flush antes dele ainda leria o candidato no banco
+    removed = {instance.id: instance.user_id}
+
+    def journal():
+        for store in (semantic_indexes, keyword_indexes):
+            store.remove_candidates(removed)
+
+    transaction.on_commit(journal)
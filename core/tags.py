@@ -0,0 +1,292 @@
+"""
+Tags canônicas de candidatos (skills, tecnologias, idiomas e certificações).
+
+Os campos de texto do Candidate continuam como vieram da extração ("Python, Kubernetes").
+A partir deles o Candidate.save() preenche arrays de tags normalizadas (minúsculas, sem
+acento, aliases resolvidos: "k8s" -> "kubernetes", "Inglês (Fluente)" -> "ingles"), com
+índice GIN. Isso permite filtros exatos: "java" não casa com "javascript".
+"""
+import re
+import unicodedata
+
+# Aliases de tecnologias (chave normalizada -> rótulo canônico), usados também por
+# _normalize_technologies na extração dos PDFs.
+TECHNOLOGY_ALIASES = {
+    "ai": "AI",
+    "ia": "AI",
+    "ml": "Machine Learning",
+    "machine learning": "Machine Learning",
+    "deep learning": "Deep Learning",
+    "data science": "Data Science",
+    "data engineering": "Data Engineering",
+    "data analytics": "Data Analytics",
+    "nlp": "NLP",
+    "llm": "LLM",
+    "generative ai": "Generative AI",
+    "genai": "Generative AI",
+    "rag": "RAG",
+    "vector db": "Vector Database",
+    "vector database": "Vector Database",
+    "vector search": "Vector Search",
+    "prompt engineering": "Prompt Engineering",
+    "computer vision": "Computer Vision",
+    "cv": "Computer Vision",
+    "pytorch": "PyTorch",
+    "tensorflow": "TensorFlow",
+    "scikit learn": "scikit-learn",
+    "sklearn": "scikit-learn",
+    "keras": "Keras",
+    "xgboost": "XGBoost",
+    "lightgbm": "LightGBM",
+    "catboost": "CatBoost",
+    "hugging face": "Hugging Face",
+    "langchain": "LangChain",
+    "llamaindex": "LlamaIndex",
+    "openai": "OpenAI",
+    "azure openai": "Azure OpenAI",
+    "bedrock": "Amazon Bedrock",
+    "vertex ai": "Vertex AI",
+    "databricks": "Databricks",
+    "mlflow": "MLflow",
+    "kubeflow": "Kubeflow",
+    "airflow": "Apache Airflow",
+    "prefect": "Prefect",
+    "dbt": "dbt",
+    "snowflake": "Snowflake",
+    "bigquery": "BigQuery",
+    "redshift": "Redshift",
+    "synapse": "Azure Synapse",
+    "spark": "Apache Spark",
+    "hadoop": "Hadoop",
+    "kafka": "Kafka",
+    "flink": "Apache Flink",
+    "beam": "Apache Beam",
+    "hive": "Hive",
+    "trino": "Trino",
+    "presto": "Presto",
+    "lakehouse": "Lakehouse",
+    "delta lake": "Delta Lake",
+    "iceberg": "Apache Iceberg",
+    "hudi": "Apache Hudi",
+    "aws": "AWS",
+    "amazon web services": "AWS",
+    "azure": "Azure",
+    "gcp": "GCP",
+    "google cloud": "GCP",
+    "oracle cloud": "OCI",
+    "oci": "OCI",
+    "digitalocean": "DigitalOcean",
+    "docker": "Docker",
+    "kubernetes": "Kubernetes",
+    "k8s": "Kubernetes",
+    "openshift": "OpenShift",
+    "helm": "Helm",
+    "argo cd": "ArgoCD",
+    "argocd": "ArgoCD",
+    "istio": "Istio",
+    "linkerd": "Linkerd",
+    "terraform": "Terraform",
+    "pulumi": "Pulumi",
+    "cloudformation": "CloudFormation",
+    "ansible": "Ansible",
+    "chef": "Chef",
+    "puppet": "Puppet",
+    "packer": "Packer",
+    "redis": "Redis",
+    "memcached": "Memcached",
+    "elasticsearch": "Elasticsearch",
+    "opensearch": "OpenSearch",
+    "logstash": "Logstash",
+    "kibana": "Kibana",
+    "grafana": "Grafana",
+    "prometheus": "Prometheus",
+    "loki": "Loki",
+    "datadog": "Datadog",
+    "new relic": "New Relic",
+    "splunk": "Splunk",
+    "sentry": "Sentry",
+    "opentelemetry": "OpenTelemetry",
+    "postgresql": "PostgreSQL",
+    "postgres": "PostgreSQL",
+    "sql server": "SQL Server",
+    "mysql": "MySQL",
+    "mariadb": "MariaDB",
+    "oracle": "Oracle",
+    "sqlite": "SQLite",
+    "cassandra": "Cassandra",
+    "couchbase": "Couchbase",
+    "couchdb": "CouchDB",
+    "neo4j": "Neo4j",
+    "arango": "ArangoDB",
+    "mongodb": "MongoDB",
+    "dynamodb": "DynamoDB",
+    "rabbitmq": "RabbitMQ",
+    "activemq": "ActiveMQ",
+    "sqs": "SQS",
+    "sns": "SNS",
+    "eventbridge": "EventBridge",
+    "kinesis": "Kinesis",
+    "java": "Java",
+    "python": "Python",
+    "go": "Go",
+    "golang": "Go",
+    "ruby": "Ruby",
+    "php": "PHP",
+    "c": "C",
+    "c++": "C++",
+    "rust": "Rust",
+    "scala": "Scala",
+    "kotlin": "Kotlin",
+    "swift": "Swift",
+    "objective-c": "Objective-C",
+    "javascript": "JavaScript",
+    "js": "JavaScript",
+    "typescript": "TypeScript",
+    "ts": "TypeScript",
+    "angular": "Angular",
+    "react": "React",
+    "vue": "Vue.js",
+    "svelte": "Svelte",
+    "node.js": "Node.js",
+    "nodejs": "Node.js",
+    "spring boot": "Spring Boot",
+    "spring": "Spring",
+    "django": "Django",
+    "flask": "Flask",
+    "fastapi": "FastAPI",
+    "express": "Express",
+    "nest": "NestJS",
+    "nestjs": "NestJS",
+    "laravel": "Laravel",
+    "rails": "Ruby on Rails",
+    "ruby on rails": "Ruby on Rails",
+    "dotnet": ".NET",
+    "azure devops": "Azure DevOps",
+    "jenkins": "Jenkins",
+    "github actions": "GitHub Actions",
+    "gitlab ci": "GitLab CI",
+    "circleci": "CircleCI",
+    "travis": "Travis CI",
+    "bamboo": "Bamboo",
+    "sonarqube": "SonarQube",
+    "github": "GitHub",
+    "gitlab": "GitLab",
+    "bitbucket": "Bitbucket",
+    "git": "Git",
+    "jira": "Jira",
+    "confluence": "Confluence",
+    "trello": "Trello",
+    "asana": "Asana",
+    "monday": "Monday.com",
+    ".net": ".NET",
+    ".net core": ".NET Core",
+    ".net framework": ".NET Framework",
+    "c#": "C#",
+    "graphql": "GraphQL",
+    "rest": "REST",
+    "grpc": "gRPC",
+    "soap": "SOAP",
+    "microservices": "Microservices",
+    "event-driven": "Event-Driven",
+    "eda": "Event-Driven",
+    "ddd": "DDD",
+    "cqrs": "CQRS",
+    "tdd": "TDD",
+    "ci/cd": "CI/CD",
+    "oauth": "OAuth",
+    "oauth2": "OAuth2",
+    "oidc": "OpenID Connect",
+    "jwt": "JWT",
+    "saml": "SAML",
+    "keycloak": "Keycloak",
+    "okta": "Okta",
+    "linux": "Linux",
+    "windows": "Windows",
+    "macos": "macOS",
+}
+
+LANGUAGE_ALIASES = {
+    "ingles": "Inglês",
+    "english": "Inglês",
+    "portugues": "Português",
+    "portuguese": "Português",
+    "espanhol": "Espanhol",
+    "spanish": "Espanhol",
+    "frances": "Francês",
+    "french": "Francês",
+    "alemao": "Alemão",
+    "german": "Alemão",
+    "italiano": "Italiano",
+    "italian": "Italiano",
+    "japones": "Japonês",
+    "japanese": "Japonês",
+    "mandarim": "Mandarim",
+    "mandarin": "Mandarim",
+    "chines": "Mandarim",
+    "chinese": "Mandarim",
+}
+
+# Campo de texto -> campo de tags no Candidate
+TAG_FIELDS = {
+    "skills": "skill_tags",
+    "technologies": "technology_tags",
+    "languages": "language_tags",
+    "certifications": "certification_tags",
+}
+
+MAX_TAG_LENGTH = 80
+
+_SPLIT_RE = re.compile(r"[,;|\n•]+")
+_LEVEL_RE = re.compile(r"\(.*?\)|\s*[-–:]\s.*$")
+
+
+def _strip_accents(value: str) -> str:
+    normalized = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+def _alias_key(value: str) -> str:
+    """Mesma normalização de _normalize_text (pdf_extractor): sem pontuação, minúsculas."""
+    value = re.sub(r"[^\w\s]", " ", _strip_accents(value))
+    return re.sub(r"\s+", " ", value).strip().lower()
+
+
+def tag_key(value: str) -> str:
+    """Forma canônica de uma tag: sem acento, minúsculas, espaços colapsados. Mantém + # . /"""
+    value = re.sub(r"\s+", " ", _strip_accents(value)).strip().lower()
+    return value.strip(" -*·")[:MAX_TAG_LENGTH]
+
+
+def _canonical_label(item: str, aliases: dict) -> str:
+    raw = tag_key(item)
+    if raw in aliases:
+        return aliases[raw]
+    # "C++"/"C#" não podem cair no alias de "c" ao remover a pontuação
+    if "+" not in raw and "#" not in raw:
+        key = _alias_key(item)
+        if key in aliases:
+            return aliases[key]
+    return item
+
+
+def canonical_tags(text: str, field: str = "technologies") -> list[str]:
+    """Tags canônicas (ordenadas, sem repetição) de um campo de texto do candidato."""
+    if not text:
+        return []
+    tags = set()
+    for item in _SPLIT_RE.split(text):
+        item = item.strip()
+        if field == "languages":
+            item = _LEVEL_RE.sub("", item).strip()
+            item = _canonical_label(item, LANGUAGE_ALIASES)
+        elif field in ("skills", "technologies"):
+            item = _canonical_label(item, TECHNOLOGY_ALIASES)
+        key = tag_key(item)
+        if key:
+            tags.add(key)
+    return sorted(tags)
+
+
+def parse_tag_list(value: str, field: str) -> list[str]:
+    """Lista de tags digitada num filtro ("python, k8s") na mesma forma canônica do banco."""
+    return canonical_tags(value, field)
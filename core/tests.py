@@ -1,3 +1,986 @@
-from django.test import TestCase
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import job_matching
+from .autocomplete import candidate_terms, record_shared_pool_changes, rebuild_pool_terms, suggest_terms
+from .boolean_search import And, BooleanSearchError, Not, Or, Term, parse_boolean_search
+from .dedup import canonical_linkedin_url, dedup_keys, duplicate_groups, merge_duplicates
+from .experience import apply_experience_filters, experience_filters_from, experience_rows
+from .job_matching import job_matcher
+from .keyword_index import KeywordIndex
+from .minhash import candidate_minhash, estimated_similarity
+from .import_runs import expire_stale_runs, finish_run, run_heartbeat, run_progress_key, run_reporter, run_status, start_run
+from .models import Candidate, CandidateJob, ImportRun, Job, PoolTerm, Profile
+from .pagination import ADHERENCE_KEYS, InvalidCursor, _after, decode_cursor, encode_cursor
+from .pdf_extractor import _after_import_batch, _candidates_by_linkedin_url, _prescan_resumes, adherence_key
+from .pool_cache import SHARED_SCOPE, bump_pool_version, filtered_candidate_ids, normalize_filters, pool_version
+from .pool_filter import CandidateFilter
+from .profile_codes import apply_seniority_filters, language_mask, masks_with_all, masks_with_any, seniority_level
+from .pool_index_store import PoolIndexStore
+from .progress import progress_event_stream, progress_reporter, publish_progress
+from .resume_storage import blob_name, file_sha256, store_resume_blob
+from .role_families import role_families, role_family_months
+from .search import TRIGRAM_FIELDS, apply_keyword_search, apply_tag_filters, apply_unaccent_filter
+from .semantic_index import SEMANTIC_TOP_N, SOURCE_FIELDS, SemanticIndex, candidate_features, fit_model, sample_candidates, text_features
+from .signals import _job_owner_id
+from .tags import canonical_tags
+from .uploads import (
+    UploadSessionError,
+    assemble_uploads,
+    close_upload_session,
+    create_upload_session,
+    get_upload_session,
+    save_chunk,
+    stage_pdf_members,
+    sweep_expired_upload_sessions,
+)
+from .views import _filter_talent_pool, boolean_search_count, upload_session_finish
+
+
+# Cache isolado por teste: o FileBasedCache e os índices em CACHE_DIR do projeto sobrevivem entre execuções
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+TEST_CACHE_DIR = Path(tempfile.mkdtemp(prefix='talent-query-tests-'))
+atexit.register(shutil.rmtree, TEST_CACHE_DIR, ignore_errors=True)
+ISOLATED_CACHE = {'CACHES': LOCMEM_CACHE, 'CACHE_DIR': TEST_CACHE_DIR}
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Índices trigram exigem PostgreSQL')
+@override_settings(**ISOLATED_CACHE)
+class UnaccentFilterIndexTests(TestCase):
+    """Os filtros sem acento devem emitir a mesma expressão dos índices trigram."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user('recrutador', password='senha-teste')
+        cls.job = Job.objects.create(user=user, title='Engenheiro de Dados')
+        Candidate.objects.bulk_create([
+            Candidate(
+                user=user,
+                name=f'Candidato {i}',
+                linkedin_url=f'https://www.linkedin.com/in/candidato-{i}',
+                skills='Python, Análise de Dados' if i % 100 == 0 else f'Java, Kotlin {i}',
+                location='São Paulo' if i % 100 == 0 else f'Recife {i}',
+            )
+            for i in range(2000)
+        ])
+        CandidateJob.objects.bulk_create([CandidateJob(job=cls.job, candidate=c) for c in Candidate.objects.all()])
+
+    def _explain(self, qs) -> str:
+        # Tabela de teste ainda pequena: sem desabilitar o seq scan o planner nunca escolheria o
+        # índice; o ANALYZE evita que estimativas vazias favoreçam o nested loop pela chave primária
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_candidate, core_candidatejob')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return qs.explain()
+
+    def test_filter_sql_uses_indexed_expression(self):
+        qs = apply_unaccent_filter(Candidate.objects.all(), 'skills', 'Análise')
+        self.assertIn('LOWER(immutable_unaccent("core_candidate"."skills"))', str(qs.query))
+        self.assertEqual(qs.count(), 20)
+
+    def test_candidate_filters_use_trigram_indexes(self):
+        for field in TRIGRAM_FIELDS:
+            with self.subTest(field=field):
+                plan = self._explain(apply_unaccent_filter(Candidate.objects.all(), field, 'Ação'))
+                self.assertIn(f'cand_{field}_trgm', plan)
+
+    def test_job_candidate_filter_uses_trigram_index(self):
+        qs = apply_unaccent_filter(CandidateJob.objects.filter(job=self.job), 'candidate__location', 'sao paulo')
+        self.assertIn('cand_location_trgm', self._explain(qs))
+        self.assertEqual(qs.count(), 20)
+
+    def test_talent_pool_filters_use_trigram_indexes(self):
+        qs = _filter_talent_pool(Candidate.objects.all(), {'location': 'sao paulo', 'skills': 'analise'})
+        self.assertRegex(self._explain(qs), 'cand_(location|skills)_trgm')
+        self.assertNotIn('UPPER', str(qs.query))
+        self.assertEqual(qs.count(), 20)
+
+
+class BooleanSearchParserTests(SimpleTestCase):
+    def test_parses_generated_job_search(self):
+        node = parse_boolean_search('"Engenheiro de Dados" AND ("Spark" OR "Airflow") AND NOT ("Estágio")')
+        self.assertEqual(node, And((
+            Term('Engenheiro de Dados'),
+            Or((Term('Spark'), Term('Airflow'))),
+            Not(Term('Estágio')),
+        )))
+
+    def test_adjacent_terms_are_and_and_or_binds_looser(self):
+        self.assertEqual(
+            parse_boolean_search('python django OR flask'),
+            Or((And((Term('python'), Term('django'))), Term('flask'))),
+        )
+
+    def test_invalid_expressions(self):
+        for expression in ('', '("python"', 'python)', 'python AND', '"python'):
+            with self.subTest(expression=expression):
+                with self.assertRaises(BooleanSearchError):
+                    parse_boolean_search(expression)
+
+
+class CursorPaginationTests(SimpleTestCase):
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor('n', ['2024-05-01T10:00:00+00:00', 42])
+        self.assertEqual(decode_cursor(cursor), ('n', ['2024-05-01T10:00:00+00:00', 42]))
+        for invalid in ('não-é-cursor', encode_cursor('x', None)):
+            with self.subTest(cursor=invalid):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(invalid)
+
+    def test_nullable_key_keeps_nulls_after_scored_rows(self):
+        qs = CandidateJob.objects.filter(job_id=1)
+        sql = str(qs.filter(_after(ADHERENCE_KEYS, [70, 5], reverse=False)).query)
+        self.assertIn('"adherence_score" < 70', sql)
+        self.assertIn('"adherence_score" IS NULL', sql)
+        sql = str(qs.filter(_after(ADHERENCE_KEYS, [None, 5], reverse=False)).query)
+        self.assertNotIn('IS NOT NULL', sql)
+        self.assertIn('"id" < 5', sql)
+
+
+class PoolCacheKeyTests(SimpleTestCase):
+    def test_equivalent_filters_normalize_equal(self):
+        self.assertEqual(
+            normalize_filters({'q': ' python ', 'name': '', 'ready_only': False, 'boolean_search': ''}),
+            normalize_filters({'q': 'python'}),
+        )
+
+
+class CandidateFilterTests(SimpleTestCase):
+    def test_unlinked_candidates_use_not_exists(self):
+        sql = str(CandidateFilter(job_id=7, user_id=1, filters={'name': 'Ana'}).queryset().query)
+        self.assertIn('NOT EXISTS', sql)
+        self.assertNotIn('NOT IN', sql)
+
+    def test_preview_and_ranking_share_query_and_cache_key(self):
+        filters = {'q': 'python', 'skills': 'Django', 'ready_only': True}
+        preview = CandidateFilter(job_id=7, user_id=1, shared_pool=True, filters=filters)
+        ranking = CandidateFilter(job_id=7, user_id=None, shared_pool=True, filters=dict(filters))
+        self.assertEqual(str(preview.ranking_queryset().query), str(ranking.ranking_queryset().query))
+        self.assertEqual(preview.cache_key, ranking.cache_key)
+
+    def test_ranking_limit_reports_the_applied_cut(self):
+        self.assertIsNone(CandidateFilter(job_id=7, user_id=1).ranking_limit)
+        semantic = CandidateFilter(job_id=7, user_id=1, filters={'semantic_search': True}, semantic_query='Engenheiro de Dados')
+        with mock.patch('core.pool_filter.semantic_candidate_ids', return_value=[3, 1]):
+            self.assertEqual(semantic.ranking_limit, SEMANTIC_TOP_N)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Plano de anti-join exige PostgreSQL')
+@override_settings(**ISOLATED_CACHE)
+class CandidateFilterPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('recrutador-pool', password='senha-teste')
+        cls.job = Job.objects.create(user=cls.user, title='Engenheiro de Dados')
+        candidates = Candidate.objects.bulk_create([
+            Candidate(user=cls.user, name=f'Candidato {i}', linkedin_url=f'https://www.linkedin.com/in/pool-{i}')
+            for i in range(20)
+        ])
+        CandidateJob.objects.bulk_create([CandidateJob(job=cls.job, candidate=c) for c in candidates[:5]])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ids_materialized_once_with_anti_join(self):
+        candidate_filter = CandidateFilter(job_id=self.job.id, user_id=self.user.id)
+        self.assertIn('Anti Join', candidate_filter.ranking_queryset().explain())
+        with self.assertNumQueries(1):
+            ids = filtered_candidate_ids(candidate_filter.ranking_queryset(), candidate_filter.cache_key)
+        with self.assertNumQueries(0):
+            self.assertEqual(filtered_candidate_ids(candidate_filter.ranking_queryset(), candidate_filter.cache_key), ids)
+        self.assertEqual(len(ids), 15)
+
+    def test_boolean_search_count_shares_the_anti_join(self):
+        self.user.profile.plan = Profile.Plan.BASIC
+        self.user.profile.save()
+        request = RequestFactory().get(reverse('boolean_search_count', args=[self.job.id]), {'expression': '"Candidato"'})
+        request.user = self.user
+        with CaptureQueriesContext(connection) as queries:
+            response = boolean_search_count(request, self.job.id)
+        self.assertEqual(json.loads(response.content)['total'], 15)
+        count_sql = next(q['sql'] for q in queries if 'COUNT(' in q['sql'])
+        self.assertIn('NOT EXISTS', count_sql)
+        self.assertNotIn('NOT IN', count_sql)
+
+
+class PoolTermTests(SimpleTestCase):
+    def test_candidate_terms_keep_raw_values(self):
+        terms = candidate_terms({
+            'technology_tags': ['python', 'c++'],
+            'skill_tags': ['análise de dados'],
+            'current_company': ' Itaú Unibanco ',
+            'location': '',
+        })
+        # A chave normalizada é calculada no banco (TERM_KEY_SQL), igual à reconstrução
+        self.assertEqual(terms, {
+            ('technologies', 'python'): 1,
+            ('technologies', 'c++'): 1,
+            ('skills', 'análise de dados'): 1,
+            ('company', ' Itaú Unibanco '): 1,
+        })
+
+
+class JobMatcherTests(SimpleTestCase):
+    def test_local_score_weights_must_have_stack_and_nice_to_have(self):
+        job = Job(id=1, user_id=1, must_have='Python, Spark', stack='AWS', nice_to_have='Airflow')
+        matcher = job_matcher(job, shared_pool=False)
+        candidate = Candidate(
+            current_title='Engenheiro de Dados',
+            skills='Python, Airflow',
+            technologies='Python, Amazon Web Services',
+            technology_tags=['python', 'aws'],
+            skill_tags=['python', 'airflow'],
+        )
+        score, matched = matcher.score(candidate)
+        # Python (3) + AWS (2) + Airflow (1) de 3 + 3 + 2 + 1
+        self.assertEqual(score, round(100 * 6 / 9))
+        self.assertEqual(matched, ['Python', 'AWS', 'Airflow'])
+
+    def test_compiled_matchers_are_bounded(self):
+        with mock.patch.object(job_matching, 'MAX_CACHED_MATCHERS', 3), mock.patch.object(job_matching, '_MATCHERS', OrderedDict()):
+            first = Job(id=1, user_id=1, must_have='Python')
+            job_matcher(first, shared_pool=False)
+            for job_id in range(2, 5):
+                job_matcher(Job(id=job_id, user_id=1, must_have='Python'), shared_pool=False)
+                job_matcher(first, shared_pool=False)
+            self.assertEqual(list(job_matching._MATCHERS), [3, 4, 1])
+
+
+@override_settings(**ISOLATED_CACHE)
+class OpenJobsForMatchingTests(TestCase):
+    def test_only_owner_jobs_and_opted_in_shared_pool_jobs(self):
+        User = get_user_model()
+        owner, premium, opted_in = (User.objects.create_user(name, password='senha-teste') for name in ('dono', 'premium', 'premium-opt-in'))
+        Profile.objects.filter(user__in=[premium, opted_in]).update(plan=Profile.Plan.PREMIUM)
+        own = Job.objects.create(user=owner, title='Própria')
+        Job.objects.create(user=premium, title='Premium sem opt-in')
+        shared = Job.objects.create(user=opted_in, title='Premium com opt-in', shared_pool_suggestions=True)
+        Job.objects.create(user=owner, title='Fechada', status=Job.Status.CLOSED)
+        jobs = {job.id: job.shared_pool for job in job_matching._open_jobs_for({owner.id})}
+        self.assertEqual(jobs, {own.id: False, shared.id: True})
+
+
+class SemanticIndexTests(SimpleTestCase):
+    def test_co_occurring_terms_are_close_without_literal_match(self):
+        candidates = [
+            Candidate(id=1, current_title='Engenheiro de Dados', summary='Pipelines de dados com Spark', technology_tags=['databricks']),
+            Candidate(id=2, current_title='Engenheiro de Dados', technologies='Databricks, Spark, Delta Lake'),
+            Candidate(id=3, current_title='Desenvolvedor Frontend', technologies='React, TypeScript, CSS'),
+            Candidate(id=4, current_title='Desenvolvedor Frontend', skills='React, HTML'),
+        ] * 5
+        rows = [candidate_features(c) for c in candidates]
+        model = fit_model(rows, components=4)
+        index = SemanticIndex.build(model, np.arange(len(rows)), model.embed(rows), fitted_on=len(rows))
+        query = model.embed([text_features('Stack: Databricks')])[0]
+        nearest = {candidates[i].id for i, _ in index.search(query, top_n=10)}
+        self.assertEqual(nearest, {1, 2})
+
+    def test_upsert_returns_new_index(self):
+        model = fit_model([text_features('python django'), text_features('react css')], components=2)
+        index = SemanticIndex.build(model, np.array([1, 2]), model.embed([text_features('python'), text_features('react')]), 2)
+        updated = index.upsert([2, 3], model.embed([text_features('django'), text_features('css')]))
+        self.assertEqual(sorted(updated.ids.tolist()), [1, 2, 3])
+        self.assertEqual(index.ids.tolist(), [1, 2])
+
+
+class KeywordIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = KeywordIndex.empty().with_candidates([
+            Candidate(id=1, current_title='Engenheiro de Dados', technologies='Spark, Python', technology_tags=['apache spark', 'python']),
+            Candidate(id=2, current_title='Desenvolvedor Frontend', technologies='React', technology_tags=['react']),
+            Candidate(id=3, summary='Modelos de machine learning em Python', technology_tags=['python']),
+        ], merge=True)
+
+    def test_ranking_explains_each_job_term(self):
+        matches = self.index.search([('Spark', 3), ('Python', 2), ('Kubernetes', 1)])
+        self.assertEqual([match.candidate_id for match in matches], [1, 3])
+        self.assertEqual(set(matches[0].matched_terms), {'Spark', 'Python'})
+        self.assertEqual(set(matches[1].matched_terms), {'Python'})
+
+    def test_incremental_update_replaces_previous_version_and_persists(self):
+        updated = self.index.with_candidates([
+            Candidate(id=2, current_title='Engenheiro de Dados', technologies='Spark', technology_tags=['apache spark']),
+        ])
+        self.assertEqual({match.candidate_id for match in updated.search([('React', 1)])}, set())
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'shared.npz'
+            updated.save(path)
+            loaded = KeywordIndex.load(path)
+        self.assertEqual(loaded.search([('Spark', 3)]), updated.merged().search([('Spark', 3)]))
+        self.assertEqual({match.candidate_id for match in loaded.search([('Spark', 3)])}, {1, 2})
+
+    def test_removed_candidates_leave_the_ranking(self):
+        removed = self.index.without_candidates({1})
+        self.assertEqual([match.candidate_id for match in removed.search([('Python', 1)])], [3])
+        self.assertEqual(removed.merged().ids.tolist(), [2, 3])
+
+
+@override_settings(**ISOLATED_CACHE)
+class KeywordIndexStoreTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('recrutador-bm25', password='senha-teste')
+        cls.spark, cls.react = (
+            Candidate.objects.create(user=cls.user, name=name, linkedin_url=f'https://linkedin.com/in/bm25-{name}', technologies=tech)
+            for name, tech in (('ana', 'Spark'), ('bruno', 'React'))
+        )
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.scope = f'user_{self.user.id}'
+        self.workers = []
+        for _ in range(2):
+            store = PoolIndexStore('keywords', KeywordIndex, ('current_title', 'technologies', 'skills', 'summary', 'technology_tags', 'skill_tags'))
+            store.directory = Path(directory)
+            self.workers.append(store)
+
+    def _ranked(self, store, term):
+        return {match.candidate_id for match in store.get(self.scope).search([(term, 1)])}
+
+    def test_workers_share_updates_and_deletes(self):
+        first, second = self.workers
+        first.build(self.scope)
+        second.get(self.scope)
+        spark = Candidate.objects.create(user=self.user, name='carla', linkedin_url='https://linkedin.com/in/bm25-carla', technologies='Spark')
+        first.add_candidates([spark.id], flush=True)
+        second.remove_candidates({self.spark.id: self.user.id})
+        Candidate.objects.filter(id=self.spark.id).delete()
+        second.flush(self.scope)
+        self.assertEqual(self._ranked(first, 'Spark'), {spark.id})
+        self.assertEqual(self._ranked(second, 'React'), {self.react.id})
+
+
+@override_settings(**ISOLATED_CACHE)
+class ImportBatchHooksTests(TestCase):
+    def test_failures_are_logged_not_swallowed(self):
+        with mock.patch('core.pdf_extractor.merge_duplicates', side_effect=RuntimeError('falhou')), \
+                self.assertLogs('core.pdf_extractor', 'ERROR') as logs:
+            _after_import_batch([1], user_id=None)
+        self.assertIn('RuntimeError: falhou', '\n'.join(logs.output))
+
+    def test_only_the_batch_candidates_are_processed(self):
+        User = get_user_model()
+        owner, other = (User.objects.create_user(name, password='senha-teste') for name in ('lote', 'lote-outro'))
+        imported = Candidate.objects.create(user=owner, name='Importado', linkedin_url='https://linkedin.com/in/lote-1')
+        # Gravado por outro usuário durante o lote: não é deste lote
+        Candidate.objects.create(user=other, name='Outro', linkedin_url='https://linkedin.com/in/lote-2')
+        stores = [mock.Mock(name='semantic'), mock.Mock(name='keywords')]
+        with mock.patch('core.pdf_extractor.match_candidates') as match, \
+                mock.patch('core.pdf_extractor.semantic_indexes', stores[0]), \
+                mock.patch('core.pdf_extractor.keyword_indexes', stores[1]):
+            _after_import_batch([imported.id], user_id=owner.id)
+        match.assert_called_once_with([imported.id])
+        for store in stores:
+            store.add_candidates.assert_called_once_with([imported.id])
+
+
+class MinHashTests(SimpleTestCase):
+    def test_similar_profiles_share_lsh_buckets(self):
+        tags = ['python', 'apache spark', 'databricks', 'airflow', 'aws', 'sql', 'dbt']
+        signature, buckets = candidate_minhash('Engenheiro de Dados', tags, ['etl'])
+        close_signature, close_buckets = candidate_minhash('Engenheiro de Dados Sênior', tags, ['etl'])
+        far_signature, far_buckets = candidate_minhash('Desenvolvedor Frontend', ['react', 'typescript', 'css'], [])
+        self.assertEqual(len(signature), 256)
+        self.assertTrue(set(buckets) & set(close_buckets))
+        self.assertFalse(set(buckets) & set(far_buckets))
+        self.assertGreater(estimated_similarity(signature, close_signature), 0.6)
+        self.assertLess(estimated_similarity(signature, far_signature), 0.2)
+
+    def test_empty_profile_has_no_buckets(self):
+        self.assertEqual(candidate_minhash('', [], []), (b'', []))
+
+
+class DuplicateCandidateTests(SimpleTestCase):
+    def test_linkedin_url_variants_share_canonical_form(self):
+        variants = [
+            'https://www.linkedin.com/in/Maria-Silva/',
+            'linkedin.com/in/maria-silva?originalSubdomain=br',
+            'http://br.linkedin.com/in/maria-silva/pt',
+            'https://www.linkedin.com/in/maria-silva#experience',
+        ]
+        self.assertEqual({canonical_linkedin_url(url) for url in variants}, {'linkedin.com/in/maria-silva'})
+        self.assertEqual(canonical_linkedin_url(''), '')
+
+    def test_linkedin_lookup_uses_canonical_key(self):
+        sql = str(_candidates_by_linkedin_url('https://www.linkedin.com/in/Maria-Silva/', user_id=3).query)
+        self.assertIn('"core_candidate"."linkedin_key" = linkedin.com/in/maria-silva', sql)
+        self.assertNotIn('UPPER', sql)
+
+    def test_groups_by_exact_keys_and_fuzzy_name_only_on_request(self):
+        profile = {
+            'name': 'Maria Silva', 'current_title': 'Engenheira de Dados', 'current_company': 'Acme',
+            'location': 'São Paulo', 'skills': 'ETL, modelagem', 'technologies': 'Python, Spark, Airflow, AWS',
+            'summary': 'Pipelines de dados em larga escala com Spark e Airflow na AWS.',
+        }
+        rows = []
+        for candidate_id, values in enumerate([
+            {**profile, 'linkedin_url': 'https://www.linkedin.com/in/maria-silva/'},
+            {**profile, 'name': 'Silva Maria', 'linkedin_url': 'https://www.linkedin.com/in/mariasilva-2'},
+            {**profile, 'linkedin_url': 'linkedin.com/in/maria-silva?trk=x', 'summary': ''},
+            {**profile, 'name': 'Maria Silva', 'current_title': 'Designer', 'current_company': 'Outra',
+             'skills': 'UX', 'technologies': 'Figma', 'summary': 'Design de produto.', 'linkedin_url': ''},
+        ], start=1):
+            linkedin_key, name_key, simhash = dedup_keys(values)
+            rows.append(Candidate(id=candidate_id, linkedin_key=linkedin_key, name_key=name_key, simhash=simhash))
+        rows.append(Candidate(id=5, name_key='outra pessoa', resume_sha256='abc'))
+        rows.append(Candidate(id=6, name_key='mais uma', resume_sha256='abc'))
+        self.assertEqual([[c.id for c in group] for group in duplicate_groups(rows)], [[1, 3], [5, 6]])
+        self.assertEqual([[c.id for c in group] for group in duplicate_groups(rows, fuzzy=True)], [[1, 2, 3], [5, 6]])
+
+
+class ExperienceTimelineTests(SimpleTestCase):
+    def test_rows_keep_order_and_normalized_keys(self):
+        rows = experience_rows(7, [
+            {'company': 'Acme Ltda', 'title': 'Engenheiro de Dados Sênior', 'location': 'São Paulo', 'months': 30},
+            {'company': 'Beta', 'title': 'Analista de BI', 'location': '', 'months': 0},
+        ])
+        self.assertEqual([row.position for row in rows], [0, 1])
+        self.assertEqual(rows[0].title_key, 'engenheiro dados senior')
+        self.assertEqual(rows[0].company_key, 'acme ltda')
+        self.assertEqual(rows[1].months, 0)
+
+    def test_free_text_role_filter_is_a_grouped_exists(self):
+        filters = {'role': 'Analista de Suprimentos', 'role_min_years': '3', 'worked_at': 'Acme'}
+        sql = str(apply_experience_filters(Candidate.objects.all(), filters).query)
+        self.assertEqual(sql.count('EXISTS'), 2)
+        self.assertIn('HAVING SUM(U0."months") >= 36', sql)
+        self.assertIn('"title_key"::text LIKE %analista suprimentos%', sql)
+
+    def test_known_role_filter_uses_role_years(self):
+        sql = str(apply_experience_filters(Candidate.objects.all(), {'role': 'Desenvolvedor Backend', 'role_min_years': '2,5'}).query)
+        self.assertIn('"core_candidateroleyears"', sql)
+        self.assertIn("U0.\"family\" = backend_developer", sql)
+        self.assertIn("U0.\"family\" = software_engineer", sql)
+        self.assertIn('U0."months" >= 30', sql)
+        self.assertNotIn('SUM', sql)
+
+    def test_range_filters_compare_stored_totals(self):
+        filters = experience_filters_from({'experience_min': '3', 'experience_max': 'x', 'tenure_max': '2,5'})
+        self.assertEqual(filters, {'experience_min': '3', 'tenure_max': '2.5'})
+        sql = str(apply_experience_filters(Candidate.objects.all(), filters).query)
+        self.assertIn('"experience_time" >= 3', sql)
+        self.assertIn('"average_tenure" <= 2.5', sql)
+        self.assertNotIn('EXISTS', sql)
+
+    def test_role_family_months(self):
+        self.assertEqual(role_families('Engenheiro de Dados Sênior'), ['data_engineer'])
+        self.assertEqual(role_families('Product Owner'), ['product_manager'])
+        self.assertEqual(role_families('Gerente Comercial'), [])
+        months = role_family_months([
+            ('engenheiro dados senior', 24), ('desenvolvedor backend', 18), ('backend engineer', 6), ('estagiario', 0),
+        ])
+        self.assertEqual(months, {'data_engineer': 24, 'backend_developer': 24, 'software_engineer': 18})
+
+
+class ProfileCodeTests(SimpleTestCase):
+    def test_seniority_level_from_free_text(self):
+        self.assertEqual(seniority_level('Sênior'), 4)
+        self.assertEqual(seniority_level('Pleno II'), 3)
+        self.assertEqual(seniority_level('Jr.'), 2)
+        self.assertEqual(seniority_level('Não informado'), 0)
+
+    def test_language_masks(self):
+        mask = language_mask(['ingles', 'espanhol', 'klingon'])
+        self.assertEqual(mask, 0b110)
+        self.assertIn(0b111, masks_with_all(0b110))
+        self.assertNotIn(0b010, masks_with_all(0b110))
+        self.assertNotIn(0, masks_with_any(0b110))
+
+    def test_filters_compare_codes(self):
+        sql = str(apply_seniority_filters(Candidate.objects.all(), {'seniority_min': '3'}).query)
+        self.assertIn('"seniority_level" >= 3', sql)
+        sql = str(apply_tag_filters(Candidate.objects.all(), {'languages_all': 'Inglês, Espanhol'}).query)
+        self.assertIn('"language_mask" IN', sql)
+
+
+@override_settings(**ISOLATED_CACHE)
+class UploadSessionTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.session = {'id': 'a' * 32, 'user_id': 1, 'job_id': None, 'root': str(self.root), 'status': 'open'}
+
+    def test_assemble_joins_chunks_in_order(self):
+        save_chunk(self.session, 'f1', 1, SimpleUploadedFile('c1', b'world'))
+        save_chunk(self.session, 'f1', 0, SimpleUploadedFile('c0', b'hello '))
+        paths = assemble_uploads(self.session, [{'file_id': 'f1', 'name': '../lote.zip', 'chunks': 2}])
+        self.assertEqual(paths[0].name, '000_lote.zip')
+        self.assertEqual(paths[0].read_bytes(), b'hello world')
+        with self.assertRaises(UploadSessionError):
+            assemble_uploads(self.session, [{'file_id': 'f2', 'name': 'x.pdf', 'chunks': 1}])
+
+    def test_stage_dedups_by_content_and_skips_non_pdf(self):
+        pdf = b'%PDF-1.4 conteudo'
+        loose = self.root / 'avulso.pdf'
+        loose.write_bytes(pdf)
+        fake = self.root / 'falso.pdf'
+        fake.write_bytes(b'nao sou pdf')
+        archive = self.root / 'lote.zip'
+        with zipfile.ZipFile(archive, 'w') as zip_ref:
+            zip_ref.writestr('pasta/mesmo.pdf', pdf)
+            zip_ref.writestr('outro.pdf', b'%PDF-1.4 outro')
+            zip_ref.writestr('__MACOSX/._outro.pdf', b'%PDF-')
+        staged = stage_pdf_members([loose, fake, archive], self.root / 'pdfs')
+        self.assertEqual(staged, {'files': 3, 'pdfs': 2, 'duplicates': 1, 'invalid': 1})
+        self.assertEqual(len(list((self.root / 'pdfs').glob('*.pdf'))), 2)
+
+    def test_only_one_finish_closes_the_session(self):
+        self.assertTrue(close_upload_session(dict(self.session)))
+        self.assertFalse(close_upload_session(dict(self.session)))
+        with self.assertRaises(UploadSessionError):
+            save_chunk({**self.session, 'status': 'closed'}, 'f1', 0, SimpleUploadedFile('c0', b'x'))
+
+    def test_sweep_removes_only_abandoned_directories(self):
+        live = create_upload_session(1)
+        abandoned = Path(tempfile.mkdtemp(prefix=f"upload_session_{'b' * 32}_"))
+        for path in (Path(live['root']), abandoned):
+            os.utime(path, (0, 0))
+        sweep_expired_upload_sessions()
+        self.assertFalse(abandoned.exists())
+        self.assertTrue(Path(live['root']).exists())
+        shutil.rmtree(live['root'])
+
+
+class ResumeBlobTests(SimpleTestCase):
+    def setUp(self):
+        self.media = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media, True)
+        override = override_settings(MEDIA_ROOT=str(self.media))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_same_content_is_stored_once_and_reuse_renews_mtime(self):
+        pdf = self.media / 'cv.pdf'
+        pdf.write_bytes(b'%PDF-1.4 cv')
+        content_hash = file_sha256(pdf)
+        name = store_resume_blob(pdf, content_hash)
+        self.assertEqual(name, blob_name(content_hash))
+        blob = self.media / name
+        os.utime(blob, (0, 0))
+        self.assertEqual(store_resume_blob(pdf, content_hash), name)
+        self.assertGreater(blob.stat().st_mtime, 0)
+        self.assertEqual(len(list(blob.parent.iterdir())), 1)
+
+
+class ResumePrescanTests(SimpleTestCase):
+    def test_prescan_reads_each_pdf_once_into_a_scan(self):
+        from pypdf import PdfWriter
+
+        folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, folder, True)
+        writer = PdfWriter()
+        writer.add_blank_page(width=200, height=200)
+        pdf = folder / 'cv.pdf'
+        with pdf.open('wb') as output:
+            writer.write(output)
+        broken = folder / 'quebrado.pdf'
+        broken.write_bytes(b'%PDF-1.4 truncado')
+        scans, unchanged = _prescan_resumes([pdf, broken])
+        self.assertEqual(unchanged, {})
+        self.assertEqual(scans[pdf].content_hash, file_sha256(pdf))
+        self.assertTrue(scans[pdf].text_hash)
+        self.assertEqual(scans[pdf].experience, [])
+        self.assertEqual(scans[broken].content_hash, file_sha256(broken))
+        self.assertEqual(scans[broken].text_hash, '')
+
+    def test_adherence_key_tracks_job_weights(self):
+        key = adherence_key('Vaga de dados', {'stack': 3, 'must_have': 5}, ['Engenheiro de Dados'])
+        self.assertEqual(key, adherence_key(' Vaga de dados ', {'must_have': 5, 'stack': 3}, ['Engenheiro de Dados']))
+        self.assertNotEqual(key, adherence_key('Vaga de dados', {'stack': 3, 'must_have': 4}, ['Engenheiro de Dados']))
+
+
+@override_settings(**ISOLATED_CACHE)
+class ProgressReporterTests(SimpleTestCase):
+    def test_terminal_publish_cancels_pending_flush(self):
+        key = 'progress_test_terminal'
+        reporter = progress_reporter(key)
+        reporter.min_interval = 0.05
+        reporter(status='running', processed=1, total=2)
+        reporter(status='running', processed=2, total=2)
+        self.assertEqual(cache.get(key)['processed'], 1)
+        publish_progress(key, {'status': 'completed'})
+        self.assertEqual(cache.get(key)['status'], 'completed')
+        time.sleep(0.1)
+        self.assertEqual(cache.get(key)['status'], 'completed')
+        reporter(status='running', processed=3)
+        self.assertEqual(cache.get(key)['status'], 'completed')
+        self.assertIsNot(progress_reporter(key), reporter)
+
+    def test_stream_pushes_each_version_and_closes_on_terminal(self):
+        key = 'progress_test_stream'
+        reporter = progress_reporter(key)
+        reporter.min_interval = 0
+        reporter(status='running', processed=1, total=2)
+
+        async def consume():
+            chunks = []
+            async for chunk in progress_event_stream(key):
+                chunks.append(chunk)
+                if len(chunks) == 2:
+                    await asyncio.to_thread(reporter, status='running', processed=2, total=2)
+                elif len(chunks) == 3:
+                    await asyncio.to_thread(publish_progress, key, {'status': 'completed'})
+            return chunks
+
+        with mock.patch('core.progress.SSE_CACHE_CHECK_INTERVAL', 0.05):
+            chunks = asyncio.run(asyncio.wait_for(consume(), timeout=5))
+        self.assertEqual(chunks[0], 'retry: 3000\n\n')
+        events = [json.loads(chunk.split('data: ', 1)[1]) for chunk in chunks[1:]]
+        self.assertEqual([(e['status'], e.get('processed')) for e in events], [
+            ('running', 1), ('running', 2), ('completed', None),
+        ])
+
+
+@override_settings(**ISOLATED_CACHE)
+class ImportRunTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('recrutador-runs', password='senha-teste')
+
+    def test_progress_is_persisted_and_finish_wins(self):
+        run = start_run(self.user.id, ImportRun.Kind.TALENT_POOL_IMPORT)
+        reporter = run_reporter(run)
+        reporter.min_interval = 60
+        with mock.patch('core.import_runs.RUN_PERSIST_INTERVAL', 0):
+            reporter(status='running', processed=3, total=10)
+            reporter(status='running', processed=4, total=10)
+        run.refresh_from_db()
+        self.assertEqual((run.processed, run.total), (4, 10))
+        cache.delete(run_progress_key(run.id))
+        self.assertEqual(run_status(run)['processed'], 4)
+        finish_run(run, {'total': 10, 'errors': 1})
+        self.assertEqual(cache.get(run_progress_key(run.id))['status'], 'completed')
+        self.assertEqual(ImportRun.objects.get(id=run.id).status, ImportRun.Status.COMPLETED)
+
+    def test_runs_without_heartbeat_are_failed(self):
+        stale = start_run(self.user.id, ImportRun.Kind.TALENT_POOL_IMPORT)
+        live = start_run(self.user.id, ImportRun.Kind.TALENT_POOL_IMPORT)
+        ImportRun.objects.filter(id=stale.id).update(heartbeat_at=stale.created_at - timedelta(hours=1))
+        self.assertEqual(expire_stale_runs(), 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, ImportRun.Status.ERROR)
+        self.assertEqual(cache.get(run_progress_key(stale.id))['status'], ImportRun.Status.ERROR)
+        self.assertEqual(run_status(stale)['status'], ImportRun.Status.ERROR)
+        self.assertEqual(ImportRun.objects.get(id=live.id).status, ImportRun.Status.RUNNING)
+
+    def test_heartbeat_runs_without_progress_callbacks(self):
+        run = start_run(self.user.id, ImportRun.Kind.TALENT_POOL_IMPORT)
+        beats = []
+        with mock.patch('core.import_runs.RUN_HEARTBEAT_INTERVAL', 0.01), \
+                mock.patch('core.import_runs.touch_heartbeat', side_effect=beats.append):
+            with run_heartbeat(run):
+                deadline = time.monotonic() + 5
+                while len(beats) < 2 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            count = len(beats)
+            time.sleep(0.05)
+        self.assertGreaterEqual(count, 2)
+        self.assertEqual(set(beats), {run.id})
+        self.assertLessEqual(len(beats), count + 1)
+
+
+@override_settings(**ISOLATED_CACHE)
+class KeywordSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('recrutador-busca', password='senha-teste')
+        cls.titled, cls.skilled, cls.summarized, cls.other = Candidate.objects.bulk_create([
+            Candidate(user=cls.user, name='Ana', current_title='Desenvolvedora Python Sênior', linkedin_url='https://linkedin.com/in/ana'),
+            Candidate(user=cls.user, name='Bruno', skills='Python, Django', linkedin_url='https://linkedin.com/in/bruno'),
+            Candidate(user=cls.user, name='Carla', summary='Já usei python em projetos pessoais', linkedin_url='https://linkedin.com/in/carla'),
+            Candidate(user=cls.user, name='Davi', current_title='Analista Financeiro', linkedin_url='https://linkedin.com/in/davi'),
+        ])
+
+    def test_search_document_is_weighted_and_unaccented(self):
+        document = Candidate.objects.values_list('search_document', flat=True).get(id=self.titled.id)
+        self.assertRegex(document, r"'python':\d+A")
+        self.assertRegex(document, r"'senior':\d+A")
+        document = Candidate.objects.values_list('search_document', flat=True).get(id=self.skilled.id)
+        self.assertRegex(document, r"'django':\d+B")
+
+    def test_rank_follows_field_weight(self):
+        ranked = apply_keyword_search(Candidate.objects.all(), 'python').order_by('-search_rank')
+        self.assertEqual(list(ranked), [self.titled, self.skilled, self.summarized])
+        self.assertEqual(list(apply_keyword_search(Candidate.objects.all(), 'senior')), [self.titled])
+
+
+class CanonicalTagsTests(SimpleTestCase):
+    def test_aliases_and_exact_tags(self):
+        self.assertEqual(
+            canonical_tags('Python, K8s; Node.js | C++, C#, c', 'technologies'),
+            ['c', 'c#', 'c++', 'kubernetes', 'node.js', 'python'],
+        )
+        self.assertEqual(canonical_tags('Java, JavaScript, JS'), ['java', 'javascript'])
+        self.assertEqual(canonical_tags('Kafka, kafka'), ['kafka'])
+
+    def test_languages_drop_level_and_translate(self):
+        self.assertEqual(canonical_tags('Inglês (Fluente), English - advanced, Português', 'languages'), ['ingles', 'portugues'])
+
+    def test_other_fields_only_normalize(self):
+        self.assertEqual(canonical_tags('AWS Certified, aws  certified', 'certifications'), ['aws certified'])
+        self.assertEqual(canonical_tags('', 'skills'), [])
+
+
+@override_settings(**ISOLATED_CACHE)
+class CandidateDerivedFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('recrutador-derivados', password='senha-teste')
+
+    def test_bulk_create_derives_like_save(self):
+        other = get_user_model().objects.create_user('recrutador-derivados-2', password='senha-teste')
+        values = dict(
+            name='Ana Souza', linkedin_url='https://www.linkedin.com/in/ana-souza/',
+            technologies='Python, K8s', languages='Inglês (Fluente)', seniority='Sênior',
+        )
+        saved = Candidate.objects.create(user=self.user, **values)
+        [bulk] = Candidate.objects.bulk_create([Candidate(user=other, **values)])
+        fields = ('technology_tags', 'language_tags', 'seniority_level', 'language_mask',
+                  'minhash_signature', 'lsh_buckets', 'linkedin_key', 'name_key', 'simhash')
+        rows = Candidate.objects.in_bulk([saved.id, bulk.id])
+        for field in fields:
+            expected, derived = getattr(rows[saved.id], field), getattr(rows[bulk.id], field)
+            if isinstance(expected, memoryview):
+                expected, derived = bytes(expected), bytes(derived)
+            self.assertEqual(derived, expected, field)
+        self.assertEqual(rows[bulk.id].technology_tags, ['kubernetes', 'python'])
+        self.assertEqual(rows[bulk.id].linkedin_key, 'linkedin.com/in/ana-souza')
+
+    def test_partial_updates_derive_dependent_fields(self):
+        candidate = Candidate.objects.create(user=self.user, name='Bruno', linkedin_url='https://linkedin.com/in/bruno')
+        candidate.skills = 'Docker'
+        candidate.save(update_fields=['skills'])
+        candidate.languages = 'Espanhol'
+        Candidate.objects.bulk_update([candidate], ['languages'])
+        candidate = Candidate.objects.get(id=candidate.id)
+        self.assertEqual(candidate.skill_tags, ['docker'])
+        self.assertEqual(candidate.language_tags, ['espanhol'])
+        self.assertEqual(candidate.language_mask, language_mask(['espanhol']))
+        self.assertNotEqual(candidate.lsh_buckets, [])
+
+
+@override_settings(**ISOLATED_CACHE)
+class PoolVersionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('recrutador-versao', password='senha-teste')
+        cls.job = Job.objects.create(user=cls.user, title='Engenheiro de Dados')
+        cls.first, cls.second = (
+            Candidate.objects.create(user=cls.user, name=name, linkedin_url=f'https://linkedin.com/in/{name}')
+            for name in ('ana', 'bruno')
+        )
+
+    def setUp(self):
+        cache.clear()
+        _job_owner_id.cache_clear()
+
+    def test_bump_replaces_user_and_shared_versions(self):
+        scope = f'user_{self.user.id}'
+        before = pool_version(scope), pool_version(SHARED_SCOPE)
+        bump_pool_version(self.user.id)
+        after = pool_version(scope), pool_version(SHARED_SCOPE)
+        self.assertNotEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
+
+    def test_link_signal_reads_job_owner_once(self):
+        scope = f'user_{self.user.id}'
+        CandidateJob.objects.create(job_id=self.job.id, candidate=self.first)
+        version = pool_version(scope)
+        with self.assertNumQueries(1):
+            CandidateJob.objects.create(job_id=self.job.id, candidate=self.second)
+        self.assertNotEqual(pool_version(scope), version)
+
+
+@override_settings(**ISOLATED_CACHE)
+class PoolTermSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user('recrutador-termos', password='senha-teste')
+        cls.other = User.objects.create_user('recrutador-termos-2', password='senha-teste')
+
+    def _terms(self):
+        return sorted(PoolTerm.objects.values_list('scope', 'field', 'key', 'count'))
+
+    def _assert_matches_rebuild(self):
+        incremental = self._terms()
+        rebuild_pool_terms()
+        self.assertEqual(incremental, self._terms())
+
+    def test_incremental_keys_match_rebuild(self):
+        candidate = Candidate.objects.create(
+            user=self.owner, name='Ana', linkedin_url='https://linkedin.com/in/ana',
+            location=' Køge ', current_company='Straße GmbH', technologies='Python',
+        )
+        self._assert_matches_rebuild()
+        self.assertEqual(suggest_terms(f'user_{self.owner.id}', 'location', 'ko'), [{'term': 'Køge', 'count': 1}])
+        self.assertEqual(suggest_terms(SHARED_SCOPE, 'company', 'STRASS'), [{'term': 'Straße GmbH', 'count': 1}])
+        candidate = Candidate.objects.get(id=candidate.id)
+        candidate.location = 'Copenhague'
+        candidate.save()
+        self._assert_matches_rebuild()
+        Candidate.objects.get(id=candidate.id).delete()
+        self.assertEqual(self._terms(), [])
+
+    def test_duplicates_leave_the_shared_pool(self):
+        original = Candidate.objects.create(user=self.owner, name='Ana', linkedin_url='https://linkedin.com/in/ana', location='Recife')
+        copy = Candidate.objects.create(user=self.other, name='Ana', linkedin_url='https://linkedin.com/in/ana', location='Recife')
+        copy.duplicate_of = original
+        copy.save(update_fields=['duplicate_of'])
+        self._assert_matches_rebuild()
+        self.assertEqual(suggest_terms(SHARED_SCOPE, 'location', 'rec'), [{'term': 'Recife', 'count': 1}])
+        Candidate.objects.filter(id=copy.id).update(duplicate_of=None)
+        record_shared_pool_changes([copy.id], [])
+        self._assert_matches_rebuild()
+        self.assertEqual(suggest_terms(SHARED_SCOPE, 'location', 'rec'), [{'term': 'Recife', 'count': 2}])
+
+    def test_save_and_delete_do_not_reread_the_candidate(self):
+        candidate = Candidate.objects.create(user=self.owner, name='Ana', linkedin_url='https://linkedin.com/in/ana', location='Recife')
+        candidate = Candidate.objects.get(id=candidate.id)
+        candidate.location = 'Olinda'
+        with CaptureQueriesContext(connection) as queries:
+            candidate.save()
+            candidate.delete()
+        self.assertFalse([q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'FROM "core_candidate" ' in q['sql']])
+        self.assertEqual(self._terms(), [])
+
+
+@override_settings(**ISOLATED_CACHE)
+class PoolIndexStoreTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user('recrutador-indice', password='senha-teste')
+        cls.other = User.objects.create_user('recrutador-indice-2', password='senha-teste')
+        cls.candidates = [
+            Candidate.objects.create(
+                user=cls.user, name=f'Candidato {i}', linkedin_url=f'https://linkedin.com/in/indice-{i}',
+                current_title='Engenheiro de Dados', technologies='Python, Spark',
+            )
+            for i in range(6)
+        ]
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.directory = Path(directory)
+        self.scope = f'user_{self.user.id}'
+        self.store = self._store()
+
+    def _store(self):
+        # Cada instância faz o papel de um worker do gunicorn, com o mesmo diretório
+        store = PoolIndexStore('semantic', SemanticIndex, (*SOURCE_FIELDS, 'technology_tags', 'skill_tags'))
+        store.directory = self.directory
+        return store
+
+    def _ids(self, store, scope):
+        return set(store.get(scope).ids.tolist())
+
+    def _new_candidate(self, **extra):
+        values = dict(user=self.user, name='Novo', linkedin_url=f'https://linkedin.com/in/novo-{Candidate.objects.count()}', technologies='Python')
+        return Candidate.objects.create(**{**values, **extra})
+
+    def test_batches_are_journaled_and_flushed_once(self):
+        self.store.build(self.scope)
+        mtime = self.store.path(self.scope).stat().st_mtime_ns
+        new = self._new_candidate()
+        self.assertEqual(self.store.add_candidates([new.id]), 1)
+        self.assertEqual(self.store.path(self.scope).stat().st_mtime_ns, mtime)
+        self.assertNotIn(new.id, self._ids(self.store, self.scope))
+        self.store.flush_pending(self.user.id)
+        self.assertIn(new.id, self._ids(self.store, self.scope))
+        self.assertFalse(self.store.pending_path(self.scope).exists())
+
+    def test_flush_keeps_updates_from_other_processes(self):
+        worker = self._store()
+        self.store.build(self.scope)
+        worker.get(self.scope)
+        first, second = self._new_candidate(), self._new_candidate()
+        self.store.add_candidates([first.id], flush=True)
+        worker.add_candidates([second.id], flush=True)
+        self.assertLessEqual({first.id, second.id}, self._ids(self._store(), self.scope))
+
+    def test_deleted_and_merged_candidates_leave_the_index(self):
+        for scope in (self.scope, SHARED_SCOPE):
+            self.store.build(scope)
+        deleted, duplicate = self.candidates[0], self.candidates[1]
+        with mock.patch('core.signals.semantic_indexes', self.store), self.captureOnCommitCallbacks(execute=True):
+            Candidate.objects.filter(id=deleted.id).delete()
+        copy = self._new_candidate(user=self.other)
+        Candidate.objects.filter(id=duplicate.id).update(duplicate_of=copy)
+        self.store.add_candidates([duplicate.id])
+        self.store.flush_pending(self.user.id)
+        self.assertNotIn(deleted.id, self._ids(self.store, self.scope))
+        self.assertIn(duplicate.id, self._ids(self.store, self.scope))
+        self.assertNotIn(duplicate.id, self._ids(self.store, SHARED_SCOPE))
+
+    def test_scopes_without_index_are_not_journaled(self):
+        self.store.add_candidates([self.candidates[0].id])
+        self.assertFalse(self.store.pending_path(self.scope).exists())
+
+    def test_sample_reads_id_ranges(self):
+        candidates = Candidate.objects.filter(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            sample = sample_candidates(candidates, size=40)
+        self.assertEqual({c.id for c in sample}, {c.id for c in self.candidates})
+        self.assertFalse([q['sql'] for q in queries if 'RANDOM()' in q['sql']])
+
+
+@override_settings(**ISOLATED_CACHE)
+class MergeDuplicatesTests(TestCase):
+    def test_same_resume_merges_keeping_advanced_stage_and_higher_adherence(self):
+        user = get_user_model().objects.create_user(username='fusao', password='x')
+        job = Job.objects.create(user=user, title='Engenheiro de Dados')
+        older = Candidate.objects.create(
+            user=user, name='Maria Silva', resume_sha256='abc', skills='Python',
+            extracted_at=timezone.now() - timedelta(days=1),
+        )
+        newer = Candidate.objects.create(user=user, name='Maria Silva', resume_sha256='abc', extracted_at=timezone.now())
+        namesake = Candidate.objects.create(user=user, name='Maria Silva', resume_sha256='outro')
+        CandidateJob.objects.create(job=job, candidate=older, pipeline_status='ENTREVISTA', adherence_score=90)
+        CandidateJob.objects.create(job=job, candidate=newer, pipeline_status='RESPONDEU', adherence_score=60)
+        result = merge_duplicates(user_id=user.id)
+        self.assertEqual((result['merged'], result['survivors']), (1, [newer.id]))
+        self.assertEqual(set(Candidate.objects.values_list('id', flat=True)), {newer.id, namesake.id})
+        link = CandidateJob.objects.get()
+        self.assertEqual((link.candidate_id, link.pipeline_status, link.adherence_score), (newer.id, 'ENTREVISTA', 90))
+        newer.refresh_from_db()
+        self.assertEqual(newer.skills, 'Python')
+
+
+@override_settings(**ISOLATED_CACHE)
+class UploadSessionFinishTests(TestCase):
+    def test_unknown_job_keeps_the_session_open(self):
+        user = get_user_model().objects.create_user('recrutador-upload', password='senha-teste')
+        user.profile.plan = Profile.Plan.PREMIUM
+        user.profile.save()
+        session = create_upload_session(user.id, job_id=999999)
+        self.addCleanup(shutil.rmtree, session['root'], ignore_errors=True)
+        request = RequestFactory().post(reverse('upload_session_finish', args=[session['id']]), {'manifest': '[]'})
+        request.user = user
+        with self.assertRaises(Http404):
+            upload_session_finish(request, session['id'])
+        self.assertEqual(get_upload_session(session['id'], user.id)['status'], 'open')
@@ -0,0 +1,248 @@
+"""
+Sessões de upload de currículos.
+
+Uma sessão recebe vários arquivos ZIP/PDF enviados em partes (chunks), inclusive em
+paralelo. Ao concluir, os arquivos são remontados, os PDFs de todos os ZIPs são
+deduplicados por hash de conteúdo (SHA-256) e copiados para uma única pasta, que
+alimenta uma única execução de importação (um único progresso).
+
+O estado da sessão fica no cache compartilhado entre workers; as partes ficam no
+diretório temporário da sessão. Sessões abandonadas (aba fechada, parte que falhou) perdem
+a chave no cache e o diretório é removido por sweep_expired_upload_sessions, chamada ao
+abrir novas sessões.
+"""
+import hashlib
+import logging
+import re
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from pathlib import Path
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_SESSION_TIMEOUT = 60 * 60 * 6
+UPLOAD_SWEEP_INTERVAL = 60 * 60
+MAX_CHUNK_SIZE = 10 * 1024 * 1024
+MAX_FILES_PER_SESSION = 50
+SESSION_DIR_PREFIX = "upload_session_"
+# O cabeçalho %PDF- pode vir depois de alguns bytes de lixo (aceito pelos leitores)
+PDF_HEADER = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+
+_FILE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_SESSION_DIR_RE = re.compile(rf"^{SESSION_DIR_PREFIX}([0-9a-f]{{32}})_")
+
+
+class UploadSessionError(Exception):
+    """Erro de validação da sessão de upload (mensagem exibível ao usuário)."""
+
+
+def _session_key(session_id: str) -> str:
+    return f"upload_session_{session_id}"
+
+
+def _finish_key(session_id: str) -> str:
+    return f"upload_session_finish_{session_id}"
+
+
+def _safe_name(name: str) -> str:
+    name = Path(name or "").name
+    name = re.sub(r"[^\w.\- ]", "_", name).strip() or "arquivo"
+    return name[:120]
+
+
+def create_upload_session(user_id: int, job_id: int | None = None) -> dict:
+    """Cria uma sessão de upload para o banco de talentos (job_id=None) ou para uma vaga."""
+    if cache.add("upload_session_sweep", True, timeout=UPLOAD_SWEEP_INTERVAL):
+        sweep_expired_upload_sessions()
+    session_id = uuid.uuid4().hex
+    root = Path(tempfile.mkdtemp(prefix=f"{SESSION_DIR_PREFIX}{session_id}_"))
+    session = {
+        "id": session_id,
+        "user_id": user_id,
+        "job_id": job_id,
+        "root": str(root),
+        "status": "open",
+    }
+    cache.set(_session_key(session_id), session, timeout=UPLOAD_SESSION_TIMEOUT)
+    return session
+
+
+def get_upload_session(session_id: str, user_id: int) -> dict | None:
+    """Retorna a sessão se existir e pertencer ao usuário."""
+    if not _FILE_ID_RE.match(session_id or ""):
+        return None
+    session = cache.get(_session_key(session_id))
+    if not session or session.get("user_id") != user_id:
+        return None
+    return session
+
+
+def close_upload_session(session: dict) -> bool:
+    """
+    Marca a sessão como encerrada (não aceita mais partes). A passagem aberta -> encerrada é
+    um cache.add atômico: com dois "concluir" simultâneos só o primeiro recebe True e inicia
+    a importação.
+    """
+    if not cache.add(_finish_key(session["id"]), True, timeout=UPLOAD_SESSION_TIMEOUT):
+        return False
+    session["status"] = "closed"
+    cache.set(_session_key(session["id"]), session, timeout=UPLOAD_SESSION_TIMEOUT)
+    return True
+
+
+def discard_upload_session(session: dict) -> None:
+    cache.delete(_session_key(session["id"]))
+    shutil.rmtree(session["root"], ignore_errors=True)
+
+
+def sweep_expired_upload_sessions(max_age: int = UPLOAD_SESSION_TIMEOUT) -> int:
+    """
+    Remove os diretórios de sessões abandonadas: sem chave no cache (expirada) e sem alteração
+    há mais de max_age segundos. Sessões concluídas ficam no cache enquanto a importação usa o
+    diretório (que ela mesma remove no fim). Retorna quantos diretórios foram removidos.
+    """
+    removed = 0
+    cutoff = time.time() - max_age
+    for path in Path(tempfile.gettempdir()).glob(f"{SESSION_DIR_PREFIX}*"):
+        match = _SESSION_DIR_RE.match(path.name)
+        if not match or not path.is_dir() or cache.get(_session_key(match.group(1))) is not None:
+            continue
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+    if removed:
+        logger.info("Removidos %s diretórios de sessões de upload abandonadas", removed)
+    return removed
+
+
+def save_chunk(session: dict, file_id: str, index: int, chunk) -> None:
+    """Grava uma parte de um arquivo. Partes de arquivos diferentes podem chegar em paralelo."""
+    if session.get("status") != "open":
+        raise UploadSessionError("Sessão de upload já encerrada.")
+    if not _FILE_ID_RE.match(file_id or ""):
+        raise UploadSessionError("Identificador de arquivo inválido.")
+    if index < 0:
+        raise UploadSessionError("Índice de parte inválido.")
+    if chunk.size > MAX_CHUNK_SIZE:
+        raise UploadSessionError("Parte maior que o limite permitido.")
+    parts_dir = Path(session["root"]) / "parts" / file_id
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    if len(list((Path(session["root"]) / "parts").iterdir())) > MAX_FILES_PER_SESSION:
+        raise UploadSessionError(f"Máximo de {MAX_FILES_PER_SESSION} arquivos por sessão.")
+    tmp_path = parts_dir / f"{index:06d}.tmp"
+    with tmp_path.open("wb") as output:
+        for piece in chunk.chunks():
+            output.write(piece)
+    # Renomeia só no fim: uma parte incompleta nunca é considerada na montagem
+    tmp_path.replace(parts_dir / f"{index:06d}.part")
+
+
+def assemble_uploads(session: dict, manifest: list[dict]) -> list[Path]:
+    """
+    Remonta os arquivos a partir das partes, conforme o manifesto enviado pelo cliente:
+    [{"file_id": "...", "name": "lote1.zip", "chunks": 3}, ...]
+    """
+    root = Path(session["root"])
+    uploads_dir = root / "uploads"
+    uploads_dir.mkdir(parents=True, exist_ok=True)
+    if not manifest:
+        raise UploadSessionError("Nenhum arquivo enviado.")
+    if len(manifest) > MAX_FILES_PER_SESSION:
+        raise UploadSessionError(f"Máximo de {MAX_FILES_PER_SESSION} arquivos por sessão.")
+
+    paths = []
+    for position, entry in enumerate(manifest):
+        file_id = str(entry.get("file_id", ""))
+        if not _FILE_ID_RE.match(file_id):
+            raise UploadSessionError("Identificador de arquivo inválido.")
+        try:
+            total_chunks = int(entry.get("chunks", 0))
+        except (TypeError, ValueError):
+            total_chunks = 0
+        parts_dir = root / "parts" / file_id
+        parts = [parts_dir / f"{i:06d}.part" for i in range(total_chunks)]
+        if total_chunks <= 0 or not all(p.exists() for p in parts):
+            raise UploadSessionError(f"Arquivo incompleto: {entry.get('name') or file_id}")
+        target = uploads_dir / f"{position:03d}_{_safe_name(entry.get('name', ''))}"
+        with target.open("wb") as output:
+            for part in parts:
+                with part.open("rb") as source:
+                    shutil.copyfileobj(source, output)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        paths.append(target)
+    return paths
+
+
+def save_uploaded_files(files, target_dir: Path) -> list[Path]:
+    """Grava arquivos enviados por formulário (multipart) no diretório informado."""
+    target_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for position, upload in enumerate(files):
+        path = target_dir / f"{position:03d}_{_safe_name(upload.name)}"
+        with path.open("wb") as output:
+            for chunk in upload.chunks():
+                output.write(chunk)
+        paths.append(path)
+    return paths
+
+
+def stage_pdf_members(upload_paths: list[Path], staging_dir: Path) -> dict:
+    """
+    Copia todos os PDFs (avulsos ou dentro de ZIPs, em qualquer subpasta) para staging_dir,
+    sem duplicatas por conteúdo. Arquivos sem o cabeçalho de PDF são ignorados (contados em
+    "invalid"). Retorna contadores para o resultado da importação.
+    """
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    seen = set()
+    pdfs = 0
+    duplicates = 0
+    invalid = 0
+
+    def stage(name: str, source) -> None:
+        nonlocal pdfs, duplicates, invalid
+        head = source.read(PDF_HEADER_WINDOW)
+        if PDF_HEADER not in head:
+            invalid += 1
+            return
+        digest = hashlib.sha256(head)
+        tmp_path = staging_dir / f".{uuid.uuid4().hex}.tmp"
+        with tmp_path.open("wb") as output:
+            output.write(head)
+            for block in iter(lambda: source.read(1024 * 1024), b""):
+                digest.update(block)
+                output.write(block)
+        content_hash = digest.hexdigest()
+        if content_hash in seen:
+            tmp_path.unlink(missing_ok=True)
+            duplicates += 1
+            return
+        seen.add(content_hash)
+        stem = _safe_name(Path(name).stem)[:80]
+        tmp_path.replace(staging_dir / f"{stem}_{content_hash[:12]}.pdf")
+        pdfs += 1
+
+    for path in upload_paths:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path, "r") as zip_ref:
+                for member in zip_ref.infolist():
+                    if member.is_dir() or not member.filename.lower().endswith(".pdf"):
+                        continue
+                    if "__MACOSX" in member.filename:
+                        continue
+                    with zip_ref.open(member) as source:
+                        stage(member.filename, source)
+        else:
+            with path.open("rb") as source:
+                stage(path.name, source)
+
+    return {"files": len(upload_paths), "pdfs": pdfs, "duplicates": duplicates, "invalid": invalid}
@@ -10,16 +10,30 @@ urlpatterns = [
     path('vagas/<int:job_id>/', views.job_detail, name='job_detail'),
     path('vagas/<int:job_id>/import-status/', views.job_import_status, name='job_import_status'),
     path('vagas/<int:job_id>/search-status/', views.job_search_status, name='job_search_status'),
+    path('vagas/<int:job_id>/import-events/', views.job_import_events, name='job_import_events'),
+    path('vagas/<int:job_id>/search-events/', views.job_search_events, name='job_search_events'),
     path('vagas/<int:job_id>/preview-search/', views.preview_candidates_search, name='preview_candidates_search'),
     path('vagas/<int:job_id>/search-pool/', views.search_candidates_in_pool, name='search_candidates_in_pool'),
     path('vagas/<int:job_id>/candidatos/<int:candidate_job_id>/status/', views.update_candidate_status, name='update_candidate_status'),
+    path('vagas/<int:job_id>/candidatos/<int:candidate_job_id>/similares/', views.job_similar_candidates, name='job_similar_candidates'),
+    path('vagas/<int:job_id>/sugestoes/<int:candidate_id>/vincular/', views.link_suggested_candidate, name='link_suggested_candidate'),
     path('vagas/<int:job_id>/status/', views.update_job_status, name='update_job_status'),
     path('vagas/<int:job_id>/gerar-busca/', views.generate_boolean_search, name='generate_boolean_search'),
+    path('vagas/<int:job_id>/contar-busca/', views.boolean_search_count, name='boolean_search_count'),
     path('vagas/<int:job_id>/editar/', views.job_edit, name='job_edit'),
     path('vagas/nova/', views.job_create, name='job_create'),
     path('busca/', views.search, name='search'),
     path('talentos/', views.talent_pool, name='talent_pool'),
+    path('talentos/autocomplete/', views.autocomplete_terms, name='autocomplete_terms'),
+    path('talentos/facetas/', views.talent_pool_facets, name='talent_pool_facets'),
     path('talentos/import-status/', views.talent_pool_import_status, name='talent_pool_import_status'),
+    path('talentos/import-events/', views.talent_pool_import_events, name='talent_pool_import_events'),
+    path('importacoes/', views.import_runs, name='import_runs'),
+    path('importacoes/<uuid:run_id>/status/', views.import_run_status, name='import_run_status'),
+    path('importacoes/<uuid:run_id>/events/', views.import_run_events, name='import_run_events'),
+    path('importacoes/sessoes/', views.upload_session_create, name='upload_session_create'),
+    path('importacoes/sessoes/<str:session_id>/partes/', views.upload_session_chunk, name='upload_session_chunk'),
+    path('importacoes/sessoes/<str:session_id>/concluir/', views.upload_session_finish, name='upload_session_finish'),
     path('relatorios/', views.reports, name='reports'),
     path('login/', auth_views.LoginView.as_view(template_name='registration/login.html'), name='login'),
     path('cadastro/', views.signup, name='signup'),
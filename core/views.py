@@ -1,29 +1,68 @@
+import json
 import shutil
 import tempfile
 import threading
-import zipfile
-import unicodedata
 from pathlib import Path
 from urllib.parse import urlencode
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import logout
-from django.core.cache import cache
-from django.core.paginator import Paginator
-from django.db import connection
-from django.db.models import F, Count, Q, Func
-from django.db.models.functions import Lower
+from django.db.models import Count, Exists, OuterRef
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
-from django.http import JsonResponse
-
-from .models import Job, Candidate, CandidateJob, Profile
+from django.urls import reverse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+from .autocomplete import suggest_terms
+from .boolean_search import BooleanSearchError, parse_boolean_search
+from .dedup import canonical_linkedin_url
+from .experience import apply_experience_filters, experience_filters_from
+from .models import Job, Candidate, CandidateJob, ImportRun, JobSuggestion, Profile
+from .facets import candidate_facets
+from .job_matching import job_terms, match_candidates, open_suggestions
+from .keyword_index import KEYWORD_TOP_N, keyword_indexes
+from .minhash import similar_candidates
+from .semantic_index import SEMANTIC_TOP_N, semantic_indexes
 from .forms import JobForm, CandidateForm, SignupForm
-from .plans import required_plan
+from .pagination import ADHERENCE_KEYS, POOL_RANK_KEYS, SEARCH_RANK_KEYS, UPDATED_AT_KEYS, page_total, paginate
+from .plans import has_plan_or_more, required_plan
+from .pool_cache import filtered_candidate_ids, pool_cache_key, pool_scope
+from .pool_filter import CandidateFilter, pool_search_filters
+from .profile_codes import apply_seniority_filters, seniority_filters_from
+from .search import apply_keyword_search, apply_tag_filters, apply_unaccent_filter, tag_filters_from
+from .import_runs import (
+    RUNS_LIST_LIMIT,
+    check_stale_runs,
+    fail_run,
+    finish_run,
+    latest_run,
+    run_fallback_payload,
+    run_heartbeat,
+    run_progress_key,
+    run_reporter,
+    run_status,
+    serialize_run,
+    start_run,
+)
+from .progress import progress_event_stream, progress_response
 from .pdf_extractor import (
     import_candidates_from_folder,
     import_candidates_from_folder_no_ranking,
     search_and_rank_candidates_from_pool,
 )
+from .uploads import (
+    MAX_CHUNK_SIZE,
+    UploadSessionError,
+    assemble_uploads,
+    close_upload_session,
+    create_upload_session,
+    discard_upload_session,
+    get_upload_session,
+    save_chunk,
+    save_uploaded_files,
+    stage_pdf_members,
+)
 
 
 def home(request):
@@ -35,25 +74,6 @@ def _uses_shared_pool(user) -> bool:
     return profile.plan == Profile.Plan.PREMIUM
 
 
-def _normalize_term(value: str) -> str:
-    normalized = unicodedata.normalize("NFKD", value)
-    return "".join(char for char in normalized if not unicodedata.combining(char)).lower()
-
-
-def _apply_unaccent_filter(qs, field: str, term: str, alias_prefix: str):
-    if not term:
-        return qs
-    if connection.vendor != "postgresql":
-        return qs.filter(**{f"{field}__icontains": term})
-    normalized = _normalize_term(term)
-    alias = f"{alias_prefix}_{field.replace('__', '_')}"
-    qs = qs.annotate(**{alias: Lower(Func(F(field), function="unaccent"))})
-    return qs.filter(
-        Q(**{f"{field}__icontains": term}) |
-        Q(**{f"{alias}__contains": normalized})
-    )
-
-
 def signup(request):
     if request.user.is_authenticated:
         return redirect('dashboard')
@@ -112,6 +132,43 @@ def search(request):
     return render(request, 'core/search.html')
 
 
+# Filtros por substring da tela do banco de talentos (parâmetro GET -> campo de Candidate)
+TALENT_POOL_TEXT_FILTERS = {
+    'name': 'name',
+    'location': 'location',
+    'seniority': 'seniority',
+    'company': 'current_company',
+    'technologies': 'technologies',
+    'current_title': 'current_title',
+    'skills': 'skills',
+    'certifications': 'certifications',
+    'languages': 'languages',
+}
+
+
+def _talent_pool_filters(data) -> dict:
+    """Filtros preenchidos do banco de talentos (palavras-chave, substrings, tags e experiência)."""
+    filters = {}
+    for key in ('q', *TALENT_POOL_TEXT_FILTERS):
+        value = (data.get(key) or '').strip()
+        if value:
+            filters[key] = value
+    filters.update(tag_filters_from(data))
+    filters.update(experience_filters_from(data))
+    filters.update(seniority_filters_from(data))
+    return filters
+
+
+def _filter_talent_pool(candidates, filters: dict):
+    if filters.get('q'):
+        candidates = apply_keyword_search(candidates, filters['q'])
+    for key, field in TALENT_POOL_TEXT_FILTERS.items():
+        candidates = apply_unaccent_filter(candidates, field, filters.get(key))
+    candidates = apply_experience_filters(candidates, filters)
+    candidates = apply_seniority_filters(candidates, filters)
+    return apply_tag_filters(candidates, filters)
+
+
 @login_required
 @required_plan('BASIC')
 def talent_pool(request):
@@ -121,29 +178,17 @@ def talent_pool(request):
     shared_pool = _uses_shared_pool(request.user)
     
     # Processa upload de ZIP/PDF
-    if request.method == 'POST' and request.FILES.get('candidates_zip'):
-        upload = request.FILES['candidates_zip']
+    if request.method == 'POST' and request.FILES.getlist('candidates_zip'):
         temp_dir = Path(tempfile.mkdtemp(prefix="talent_pool_import_"))
-        uploaded_path = temp_dir / upload.name
-        with uploaded_path.open('wb') as output:
-            for chunk in upload.chunks():
-                output.write(chunk)
-
-        is_zip = zipfile.is_zipfile(uploaded_path)
-        _set_talent_pool_import_status({"status": "running", "processed": 0, "total": 0})
-        thread = threading.Thread(
-            target=_run_talent_pool_import,
-            args=(uploaded_path, is_zip, request.user.id, shared_pool),
-            daemon=True,
-        )
-        thread.start()
+        upload_paths = save_uploaded_files(request.FILES.getlist('candidates_zip'), temp_dir / "uploads")
+        _start_talent_pool_import(upload_paths, temp_dir, request.user.id, shared_pool)
         import_message = "Importação iniciada. Acompanhe o progresso abaixo."
     elif request.method == 'POST':
         # Processa formulário manual
         form = CandidateForm(request.POST)
         if form.is_valid():
             linkedin_url = form.cleaned_data['linkedin_url'].strip()
-            candidate = Candidate.objects.filter(user=request.user, linkedin_url__iexact=linkedin_url).first()
+            candidate = Candidate.objects.filter(user=request.user, linkedin_key=canonical_linkedin_url(linkedin_url)).first()
             if candidate:
                 changed = False
                 for field, value in form.cleaned_data.items():
@@ -154,6 +199,7 @@ def talent_pool(request):
                         changed = True
                 if changed:
                     candidate.save()
+                    _candidate_saved(candidate.id)
                     message = "Candidato atualizado com novos dados."
                 else:
                     message = "Nenhuma alteração detectada para esse candidato."
@@ -161,73 +207,30 @@ def talent_pool(request):
                 c = form.save(commit=False)
                 c.user = request.user
                 c.save()
+                _candidate_saved(c.id)
                 message = "Candidato cadastrado com sucesso."
         else:
             message = "Confira os campos obrigatórios."
 
     # Filtros
-    name_filter = request.GET.get('name', '').strip()
-    location_filter = request.GET.get('location', '').strip()
-    seniority_filter = request.GET.get('seniority', '').strip()
-    company_filter = request.GET.get('company', '').strip()
-    technologies_filter = request.GET.get('technologies', '').strip()
-    current_title_filter = request.GET.get('current_title', '').strip()
-    skills_filter = request.GET.get('skills', '').strip()
-    certifications_filter = request.GET.get('certifications', '').strip()
-    languages_filter = request.GET.get('languages', '').strip()
-
-    candidates = Candidate.objects.all() if shared_pool else Candidate.objects.filter(user=request.user)
-    
-    if name_filter:
-        candidates = candidates.filter(name__icontains=name_filter)
-    if location_filter:
-        candidates = candidates.filter(location__icontains=location_filter)
-    if seniority_filter:
-        candidates = candidates.filter(seniority__icontains=seniority_filter)
-    if company_filter:
-        candidates = candidates.filter(current_company__icontains=company_filter)
-    if technologies_filter:
-        candidates = candidates.filter(technologies__icontains=technologies_filter)
-    if current_title_filter:
-        candidates = candidates.filter(current_title__icontains=current_title_filter)
-    if skills_filter:
-        candidates = candidates.filter(skills__icontains=skills_filter)
-    if certifications_filter:
-        candidates = candidates.filter(certifications__icontains=certifications_filter)
-    if languages_filter:
-        candidates = candidates.filter(languages__icontains=languages_filter)
-    
-    candidates = candidates.order_by('-updated_at', '-created_at')
-
-    # Paginação: 10 candidatos por página
-    paginator = Paginator(candidates, 10)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    filters = _talent_pool_filters(request.GET)
+    candidates = Candidate.objects.pool(request.user.id, shared_pool)
+    candidates = _filter_talent_pool(candidates, filters)
+
+    # Paginação por cursor: 10 candidatos por página, total em cache
+    page_obj = paginate(
+        candidates,
+        SEARCH_RANK_KEYS if filters.get('q') else UPDATED_AT_KEYS,
+        request.GET.get('cursor', ''),
+    )
+    page_obj.total, page_obj.total_is_estimate = page_total(candidates)
 
     # Constrói query string para manter filtros na paginação
-    query_params = {}
-    if name_filter:
-        query_params['name'] = name_filter
-    if location_filter:
-        query_params['location'] = location_filter
-    if seniority_filter:
-        query_params['seniority'] = seniority_filter
-    if company_filter:
-        query_params['company'] = company_filter
-    if technologies_filter:
-        query_params['technologies'] = technologies_filter
-    if current_title_filter:
-        query_params['current_title'] = current_title_filter
-    if skills_filter:
-        query_params['skills'] = skills_filter
-    if certifications_filter:
-        query_params['certifications'] = certifications_filter
-    if languages_filter:
-        query_params['languages'] = languages_filter
-    query_string = urlencode(query_params)
+    query_string = urlencode(filters)
     if query_string:
         query_string = '&' + query_string
 
+    import_run = latest_run(request.user.id, ImportRun.Kind.TALENT_POOL_IMPORT)
     context = {
         'form': form,
         'candidates': page_obj,
@@ -235,50 +238,68 @@ def talent_pool(request):
         'message': message,
         'import_message': import_message,
         'shared_pool': shared_pool,
-        'filters': {
-            'name': name_filter,
-            'location': location_filter,
-            'seniority': seniority_filter,
-            'company': company_filter,
-            'technologies': technologies_filter,
-            'current_title': current_title_filter,
-            'skills': skills_filter,
-            'certifications': certifications_filter,
-            'languages': languages_filter,
-        },
+        'filters': filters,
         'query_string': query_string,
-        'import_status': cache.get(_talent_pool_import_status_key()),
+        'import_run': import_run,
+        'import_status': run_status(import_run),
     }
     return render(request, 'core/talent_pool.html', context)
 
 
-def _run_talent_pool_import(uploaded_path: Path, is_zip: bool, user_id: int, shared_pool: bool = False):
+@login_required
+@required_plan('BASIC')
+def talent_pool_facets(request):
+    """Contagens por faceta dos candidatos que atendem aos filtros atuais do banco de talentos."""
+    shared_pool = _uses_shared_pool(request.user)
+    filters = _talent_pool_filters(request.GET)
+    candidates = Candidate.objects.pool(request.user.id, shared_pool)
+    candidates = _filter_talent_pool(candidates, filters)
+    cache_key = pool_cache_key('facets', pool_scope(request.user.id, shared_pool), filters=filters)
+    return JsonResponse(candidate_facets(candidates, cache_key))
+
+
+@login_required
+@required_plan('BASIC')
+def autocomplete_terms(request):
+    """Sugestões por prefixo para os filtros (field: technologies, skills, company ou location)."""
+    field = request.GET.get('field', '').strip()
+    prefix = request.GET.get('q', '').strip()
+    scope = pool_scope(request.user.id, _uses_shared_pool(request.user))
+    return JsonResponse({'field': field, 'suggestions': suggest_terms(scope, field, prefix)})
+
+
+def _start_talent_pool_import(upload_paths: list[Path], temp_root: Path, user_id: int, shared_pool: bool = False) -> ImportRun:
+    run = start_run(user_id, ImportRun.Kind.TALENT_POOL_IMPORT)
+    thread = threading.Thread(
+        target=_run_talent_pool_import,
+        args=(run, upload_paths, temp_root, user_id, shared_pool),
+        daemon=True,
+    )
+    thread.start()
+    return run
+
+
+def _run_talent_pool_import(run: ImportRun, upload_paths: list[Path], temp_root: Path, user_id: int, shared_pool: bool = False):
     """Executa importação de candidatos no banco de talentos do usuário em background."""
-    temp_root = uploaded_path.parent
     try:
-        def progress_callback(**kwargs):
-            _set_talent_pool_import_status(kwargs)
+        with run_heartbeat(run):
+            staging_dir = temp_root / "pdfs"
+            staged = stage_pdf_members(upload_paths, staging_dir)
+
+            progress_callback = run_reporter(run, extra={"uploads": staged})
 
-        if is_zip:
-            extract_dir = uploaded_path.parent
-            with zipfile.ZipFile(uploaded_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            result = import_candidates_from_folder_no_ranking(
-                str(extract_dir),
-                user_id=user_id,
-                shared_pool=shared_pool,
-                progress_callback=progress_callback,
-            )
-        else:
             result = import_candidates_from_folder_no_ranking(
-                str(uploaded_path),
+                str(staging_dir),
                 user_id=user_id,
                 shared_pool=shared_pool,
                 progress_callback=progress_callback,
             )
-        _set_talent_pool_import_status({"status": "completed", "result": result})
+            result["duplicates"] = staged["duplicates"]
+            result["files"] = staged["files"]
+            result["invalid"] = staged["invalid"]
+            finish_run(run, result)
     except Exception as exc:
-        _set_talent_pool_import_status({"status": "error", "message": str(exc)})
+        fail_run(run, str(exc))
     finally:
         shutil.rmtree(temp_root, ignore_errors=True)
 
@@ -286,9 +307,169 @@ def _run_talent_pool_import(uploaded_path: Path, is_zip: bool, user_id: int, sha
 @login_required
 @required_plan('BASIC')
 def talent_pool_import_status(request):
-    """Endpoint AJAX para status da importação do banco de talentos."""
-    payload = cache.get(_talent_pool_import_status_key()) or {"status": "idle"}
-    return JsonResponse(payload)
+    """Endpoint AJAX para status da última importação do banco de talentos do usuário."""
+    return _run_progress_response(request, latest_run(request.user.id, ImportRun.Kind.TALENT_POOL_IMPORT))
+
+
+def _run_progress_response(request, run: ImportRun | None):
+    if run is None:
+        return JsonResponse({"status": "idle"})
+    return progress_response(request, run_progress_key(run.id), run_fallback_payload(run))
+
+
+async def _progress_stream_user(request):
+    """Login e plano verificados uma vez por conexão (não a cada evento). Retorna o usuário ou None."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    if not await sync_to_async(has_plan_or_more)(user, 'BASIC'):
+        return None
+    return user
+
+
+async def _latest_run_async(user, kind: str, job_id: int | None = None) -> ImportRun | None:
+    return await ImportRun.objects.filter(user=user, kind=kind, job_id=job_id).order_by('-created_at').afirst()
+
+
+def _progress_stream_response(run: ImportRun | None):
+    """
+    Stream SSE do progresso da execução. Só é servido pelo entry point ASGI; sob WSGI responde
+    204 (o EventSource não reconecta) e a página volta ao polling do endpoint de status.
+    """
+    if run is None:
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(
+        progress_event_stream(run_progress_key(run.id), run_fallback_payload(run)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def talent_pool_import_events(request):
+    """Eventos (SSE) de progresso da última importação do banco de talentos."""
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await _progress_stream_user(request)
+    if user is None:
+        return JsonResponse({'error': 'Não autorizado.'}, status=403)
+    return _progress_stream_response(await _latest_run_async(user, ImportRun.Kind.TALENT_POOL_IMPORT))
+
+
+@login_required
+@required_plan('BASIC')
+def import_runs(request):
+    """Lista as execuções (importações e buscas) do usuário, mais recentes primeiro."""
+    check_stale_runs()
+    runs = ImportRun.objects.filter(user=request.user)
+    kind = request.GET.get('kind', '').strip()
+    if kind:
+        runs = runs.filter(kind=kind)
+    status = request.GET.get('status', '').strip()
+    if status:
+        runs = runs.filter(status=status)
+    job_id = request.GET.get('job_id', '').strip()
+    if job_id.isdigit():
+        runs = runs.filter(job_id=int(job_id))
+    return JsonResponse({"runs": [serialize_run(run) for run in runs[:RUNS_LIST_LIMIT]]})
+
+
+@login_required
+@required_plan('BASIC')
+def import_run_status(request, run_id):
+    """Status de uma execução pelo id (consulta direta pela chave da execução)."""
+    check_stale_runs()
+    run = get_object_or_404(ImportRun, id=run_id, user=request.user)
+    return _run_progress_response(request, run)
+
+
+async def import_run_events(request, run_id):
+    """Eventos (SSE) de progresso de uma execução pelo id."""
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await _progress_stream_user(request)
+    if user is None:
+        return JsonResponse({'error': 'Não autorizado.'}, status=403)
+    run = await ImportRun.objects.filter(id=run_id, user=user).afirst()
+    if run is None:
+        return JsonResponse({'error': 'Execução não encontrada.'}, status=404)
+    return _progress_stream_response(run)
+
+
+@login_required
+@required_plan('BASIC')
+def upload_session_create(request):
+    """Abre uma sessão de upload (vários ZIP/PDF em partes) para o banco de talentos ou para uma vaga."""
+    if request.method != 'POST':
+        return JsonResponse({"error": "Método não permitido"}, status=405)
+    job_id = request.POST.get('job_id', '').strip()
+    if job_id:
+        if not job_id.isdigit():
+            return JsonResponse({"error": "Vaga inválida."}, status=400)
+        job_id = get_object_or_404(Job, id=int(job_id), user=request.user).id
+    session = create_upload_session(request.user.id, job_id=job_id or None)
+    return JsonResponse({"success": True, "session_id": session["id"], "max_chunk_size": MAX_CHUNK_SIZE})
+
+
+@login_required
+@required_plan('BASIC')
+def upload_session_chunk(request, session_id: str):
+    """Recebe uma parte de um arquivo da sessão. Pode ser chamada em paralelo."""
+    if request.method != 'POST':
+        return JsonResponse({"error": "Método não permitido"}, status=405)
+    session = get_upload_session(session_id, request.user.id)
+    if not session:
+        return JsonResponse({"error": "Sessão de upload não encontrada."}, status=404)
+    chunk = request.FILES.get('chunk')
+    index = request.POST.get('index', '').strip()
+    if not chunk or not index.isdigit():
+        return JsonResponse({"error": "Parte inválida."}, status=400)
+    try:
+        save_chunk(session, request.POST.get('file_id', '').strip(), int(index), chunk)
+    except UploadSessionError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({"success": True})
+
+
+@login_required
+@required_plan('BASIC')
+def upload_session_finish(request, session_id: str):
+    """Fecha a sessão, remonta os arquivos e inicia uma única importação com todos os PDFs."""
+    if request.method != 'POST':
+        return JsonResponse({"error": "Método não permitido"}, status=405)
+    session = get_upload_session(session_id, request.user.id)
+    if not session or session.get("status") != "open":
+        return JsonResponse({"error": "Sessão de upload não encontrada."}, status=404)
+    try:
+        manifest = json.loads(request.POST.get('manifest') or '[]')
+        if not isinstance(manifest, list):
+            raise ValueError
+    except ValueError:
+        return JsonResponse({"error": "Manifesto inválido."}, status=400)
+    # A vaga é validada antes de fechar: um job_id inválido não deixa a sessão fechada e órfã
+    job = get_object_or_404(Job, id=session["job_id"], user=request.user) if session.get("job_id") else None
+
+    if not close_upload_session(session):
+        return JsonResponse({"error": "Sessão de upload já concluída."}, status=409)
+    try:
+        upload_paths = assemble_uploads(session, manifest)
+    except UploadSessionError as exc:
+        discard_upload_session(session)
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    temp_root = Path(session["root"])
+    shared_pool = _uses_shared_pool(request.user)
+    if job:
+        run = _start_import_job(job, upload_paths, temp_root, request.user.id, shared_pool)
+    else:
+        run = _start_talent_pool_import(upload_paths, temp_root, request.user.id, shared_pool)
+    return JsonResponse({
+        "success": True,
+        "files": len(upload_paths),
+        "message": "Importação iniciada. Acompanhe o progresso abaixo.",
+        **_run_urls(run),
+    })
 
 
 @login_required
@@ -436,6 +617,13 @@ def _build_boolean_search(job: Job) -> str:
     return " AND ".join(parts).strip()
 
 
+def _candidate_saved(candidate_id: int) -> None:
+    """Sugestões para as vagas abertas e índices do banco para um candidato cadastrado/editado à mão."""
+    match_candidates([candidate_id])
+    semantic_indexes.add_candidates([candidate_id], flush=True)
+    keyword_indexes.add_candidates([candidate_id], flush=True)
+
+
 def _build_job_description(job: Job) -> str:
     parts = [
         f"Título: {job.title}",
@@ -453,53 +641,36 @@ def _build_job_description(job: Job) -> str:
     return "\n".join(parts)
 
 
-def _import_status_key(job_id: int) -> str:
-    return f"import_status_{job_id}"
-
-
-def _search_status_key(job_id: int) -> str:
-    return f"search_status_{job_id}"
-
-
-def _talent_pool_import_status_key() -> str:
-    return "talent_pool_import_status"
-
-
-def _set_import_status(job_id: int, payload: dict) -> None:
-    cache.set(_import_status_key(job_id), payload, timeout=60 * 60)
-
-
-def _set_search_status(job_id: int, payload: dict) -> None:
-    cache.set(_search_status_key(job_id), payload, timeout=60 * 60)
+def _run_urls(run: ImportRun) -> dict:
+    """Id e URLs de acompanhamento de uma execução, para o front trocar de execução sem recarregar."""
+    return {
+        "run_id": str(run.id),
+        "status_url": reverse('import_run_status', args=[run.id]),
+        "events_url": reverse('import_run_events', args=[run.id]),
+    }
 
 
-def _set_talent_pool_import_status(payload: dict) -> None:
-    cache.set(_talent_pool_import_status_key(), payload, timeout=60 * 60)
+def _start_import_job(job: Job, upload_paths: list[Path], temp_root: Path, user_id: int, shared_pool: bool = False) -> ImportRun:
+    run = start_run(user_id, ImportRun.Kind.JOB_IMPORT, job.id)
+    thread = threading.Thread(
+        target=_run_import_job,
+        args=(run, job.id, upload_paths, temp_root, _build_job_description(job), job.title, user_id, shared_pool),
+        daemon=True,
+    )
+    thread.start()
+    return run
 
 
-def _run_import_job(job_id: int, uploaded_path: Path, is_zip: bool, job_description: str, role_title: str, user_id: int, shared_pool: bool = False):
-    temp_root = uploaded_path.parent
+def _run_import_job(run: ImportRun, job_id: int, upload_paths: list[Path], temp_root: Path, job_description: str, role_title: str, user_id: int, shared_pool: bool = False):
     try:
-        def progress_callback(**kwargs):
-            _set_import_status(job_id, kwargs)
+        with run_heartbeat(run):
+            staging_dir = temp_root / "pdfs"
+            staged = stage_pdf_members(upload_paths, staging_dir)
+
+            progress_callback = run_reporter(run, extra={"uploads": staged})
 
-        if is_zip:
-            extract_dir = uploaded_path.parent
-            with zipfile.ZipFile(uploaded_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            result = import_candidates_from_folder(
-                str(extract_dir),
-                job_description=job_description,
-                weights={'skills': 40, 'technologies': 35, 'experience': 25},
-                role_title=role_title,
-                job_id=job_id,
-                user_id=user_id,
-                shared_pool=shared_pool,
-                progress_callback=progress_callback,
-            )
-        else:
             result = import_candidates_from_folder(
-                str(uploaded_path),
+                str(staging_dir),
                 job_description=job_description,
                 weights={'skills': 40, 'technologies': 35, 'experience': 25},
                 role_title=role_title,
@@ -508,9 +679,12 @@ def _run_import_job(job_id: int, uploaded_path: Path, is_zip: bool, job_descript
                 shared_pool=shared_pool,
                 progress_callback=progress_callback,
             )
-        _set_import_status(job_id, {"status": "completed", "result": result})
+            result["duplicates"] = staged["duplicates"]
+            result["files"] = staged["files"]
+            result["invalid"] = staged["invalid"]
+            finish_run(run, result)
     except Exception as exc:
-        _set_import_status(job_id, {"status": "error", "message": str(exc)})
+        fail_run(run, str(exc))
     finally:
         shutil.rmtree(temp_root, ignore_errors=True)
 
@@ -554,51 +728,33 @@ def job_detail(request, job_id: int):
     min_adherence_raw = request.GET.get('min_adherence', '').strip()
 
     import_message = ""
-    if request.method == 'POST' and request.FILES.get('candidates_zip'):
-        upload = request.FILES['candidates_zip']
-        job_description = _build_job_description(job)
-        role_title = job.title
-
+    if request.method == 'POST' and request.FILES.getlist('candidates_zip'):
         temp_dir = Path(tempfile.mkdtemp(prefix="talent_import_"))
-        uploaded_path = temp_dir / upload.name
-        with uploaded_path.open('wb') as output:
-            for chunk in upload.chunks():
-                output.write(chunk)
-
-        is_zip = zipfile.is_zipfile(uploaded_path)
-        _set_import_status(job.id, {"status": "running", "processed": 0, "total": 0})
-        shared_pool = _uses_shared_pool(request.user)
-        thread = threading.Thread(
-            target=_run_import_job,
-            args=(job.id, uploaded_path, is_zip, job_description, role_title, request.user.id, shared_pool),
-            daemon=True,
-        )
-        thread.start()
+        upload_paths = save_uploaded_files(request.FILES.getlist('candidates_zip'), temp_dir / "uploads")
+        _start_import_job(job, upload_paths, temp_dir, request.user.id, _uses_shared_pool(request.user))
         import_message = "Importação iniciada. Acompanhe o progresso abaixo."
 
-    candidate_links = job.candidate_links.select_related('candidate')
+    candidate_links = job.candidate_links.select_related('candidate').defer('candidate__search_document')
     if status_filter:
         candidate_links = candidate_links.filter(pipeline_status=status_filter)
     if seniority_filter:
-        candidate_links = _apply_unaccent_filter(candidate_links, 'candidate__seniority', seniority_filter, 'seniority')
+        candidate_links = apply_unaccent_filter(candidate_links, 'candidate__seniority', seniority_filter)
     if location_filter:
-        candidate_links = _apply_unaccent_filter(candidate_links, 'candidate__location', location_filter, 'location')
+        candidate_links = apply_unaccent_filter(candidate_links, 'candidate__location', location_filter)
     if name_filter:
-        candidate_links = _apply_unaccent_filter(candidate_links, 'candidate__name', name_filter, 'name')
+        candidate_links = apply_unaccent_filter(candidate_links, 'candidate__name', name_filter)
     if language_filter:
-        candidate_links = _apply_unaccent_filter(candidate_links, 'candidate__languages', language_filter, 'language')
+        candidate_links = apply_unaccent_filter(candidate_links, 'candidate__languages', language_filter)
     if must_have_filter:
-        candidate_links = _apply_unaccent_filter(candidate_links, 'candidate__skills', must_have_filter, 'skills')
+        candidate_links = apply_unaccent_filter(candidate_links, 'candidate__skills', must_have_filter)
     if technologies_filter:
-        candidate_links = _apply_unaccent_filter(candidate_links, 'candidate__technologies', technologies_filter, 'technologies')
+        candidate_links = apply_unaccent_filter(candidate_links, 'candidate__technologies', technologies_filter)
     if min_adherence_raw.isdigit():
         candidate_links = candidate_links.filter(adherence_score__gte=int(min_adherence_raw))
-    candidate_links = candidate_links.order_by(F('adherence_score').desc(nulls_last=True))
 
-    # Paginação: 10 candidatos por página
-    paginator = Paginator(candidate_links, 10)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # Paginação por cursor: 10 candidatos por página, ordenados por aderência
+    page_obj = paginate(candidate_links, ADHERENCE_KEYS, request.GET.get('cursor', ''))
+    page_obj.total, page_obj.total_is_estimate = page_total(candidate_links)
 
     # Constrói query string para manter filtros na paginação
     query_params = {}
@@ -622,6 +778,8 @@ def job_detail(request, job_id: int):
     if query_string:
         query_string = '&' + query_string
 
+    import_run = latest_run(request.user.id, ImportRun.Kind.JOB_IMPORT, job.id)
+    search_run = latest_run(request.user.id, ImportRun.Kind.POOL_SEARCH, job.id)
     context = {
         'job': job,
         'must_have_list': split_list(job.must_have),
@@ -643,49 +801,116 @@ def job_detail(request, job_id: int):
         'query_string': query_string,
         'pipeline_status_choices': job.candidate_links.model.PipelineStatus.choices,
         'job_status_choices': Job.Status.choices,
-        'import_status': cache.get(_import_status_key(job.id)),
-        'search_status': cache.get(_search_status_key(job.id)),
+        'import_run': import_run,
+        'import_status': run_status(import_run),
+        'search_run': search_run,
+        'search_status': run_status(search_run),
+        'suggestions': open_suggestions(job) if job.status == Job.Status.OPEN else [],
+        'semantic_top_n': SEMANTIC_TOP_N,
+        'keyword_top_n': KEYWORD_TOP_N,
     }
     return render(request, 'core/job_detail.html', context)
 
 
+@login_required
+@required_plan('BASIC')
+def link_suggested_candidate(request, job_id: int, candidate_id: int):
+    """Vincula à vaga um candidato sugerido pela consulta permanente da vaga."""
+    if request.method != 'POST':
+        return redirect('job_detail', job_id=job_id)
+    job = get_object_or_404(Job, id=job_id, user=request.user)
+    suggestion = get_object_or_404(JobSuggestion, job=job, candidate_id=candidate_id)
+    CandidateJob.objects.get_or_create(
+        job=job,
+        candidate_id=candidate_id,
+        defaults={'technical_justification': f"Sugerido pela vaga ({suggestion.score}%): {', '.join(suggestion.matched_terms)}"},
+    )
+    suggestion.delete()
+    return redirect('job_detail', job_id=job.id)
+
+
+@login_required
+@required_plan('BASIC')
+def job_similar_candidates(request, job_id: int, candidate_job_id: int):
+    """Candidatos do banco parecidos com um candidato da vaga (MinHash/LSH), ainda não vinculados a ela."""
+    job = get_object_or_404(Job, id=job_id, user=request.user)
+    link = get_object_or_404(CandidateJob.objects.select_related('candidate'), id=candidate_job_id, job=job)
+    linked = CandidateJob.objects.filter(job_id=job.id, candidate_id=OuterRef('pk'))
+    candidates = Candidate.objects.pool(request.user.id, _uses_shared_pool(request.user)).filter(~Exists(linked))
+    return JsonResponse({
+        'success': True,
+        'candidate': link.candidate.name,
+        'candidates': [
+            {
+                'id': neighbor.id,
+                'name': neighbor.name,
+                'title': neighbor.current_title or '-',
+                'company': neighbor.current_company or '-',
+                'linkedin_url': neighbor.linkedin_url,
+                'similarity': round(similarity * 100),
+            }
+            for neighbor, similarity in similar_candidates(link.candidate, candidates)
+        ],
+    })
+
+
 @login_required
 @required_plan('BASIC')
 def job_import_status(request, job_id: int):
+    """Endpoint AJAX para status da última importação de candidatos da vaga."""
     get_object_or_404(Job, id=job_id, user=request.user)
-    payload = cache.get(_import_status_key(job_id)) or {"status": "idle"}
-    return JsonResponse(payload)
+    return _run_progress_response(request, latest_run(request.user.id, ImportRun.Kind.JOB_IMPORT, job_id))
 
 
 @login_required
 @required_plan('BASIC')
 def job_search_status(request, job_id: int):
-    """Endpoint AJAX para status da busca no banco."""
+    """Endpoint AJAX para status da última busca no banco."""
     get_object_or_404(Job, id=job_id, user=request.user)
-    payload = cache.get(_search_status_key(job_id)) or {"status": "idle"}
-    return JsonResponse(payload)
+    return _run_progress_response(request, latest_run(request.user.id, ImportRun.Kind.POOL_SEARCH, job_id))
+
+
+async def job_import_events(request, job_id: int):
+    """Eventos (SSE) de progresso da última importação de candidatos da vaga."""
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await _progress_stream_user(request)
+    if user is None or not await Job.objects.filter(id=job_id, user=user).aexists():
+        return JsonResponse({'error': 'Não autorizado.'}, status=403)
+    return _progress_stream_response(await _latest_run_async(user, ImportRun.Kind.JOB_IMPORT, job_id))
 
 
-def _run_search_in_pool(job_id: int, job_description: str, role_title: str, filters: dict | None = None, user_id: int | None = None, shared_pool: bool = False):
+async def job_search_events(request, job_id: int):
+    """Eventos (SSE) de progresso da última busca e rankeamento no banco."""
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await _progress_stream_user(request)
+    if user is None or not await Job.objects.filter(id=job_id, user=user).aexists():
+        return JsonResponse({'error': 'Não autorizado.'}, status=403)
+    return _progress_stream_response(await _latest_run_async(user, ImportRun.Kind.POOL_SEARCH, job_id))
+
+
+def _run_search_in_pool(run: ImportRun, job_id: int, job_description: str, role_title: str, filters: dict | None = None, user_id: int | None = None, shared_pool: bool = False, boolean_search: str = ""):
     """Executa busca e rankeamento de candidatos do banco do usuário em background."""
     try:
-        def progress_callback(**kwargs):
-            _set_search_status(job_id, kwargs)
-        
-        weights = {'skills': 40, 'technologies': 35, 'experience': 25}
-        result = search_and_rank_candidates_from_pool(
-            job_id=job_id,
-            job_description=job_description,
-            weights=weights,
-            role_title=role_title,
-            progress_callback=progress_callback,
-            filters=filters,
-            user_id=user_id,
-            shared_pool=shared_pool,
-        )
-        _set_search_status(job_id, {"status": "completed", "result": result})
+        with run_heartbeat(run):
+            progress_callback = run_reporter(run)
+
+            weights = {'skills': 40, 'technologies': 35, 'experience': 25}
+            result = search_and_rank_candidates_from_pool(
+                job_id=job_id,
+                job_description=job_description,
+                weights=weights,
+                role_title=role_title,
+                progress_callback=progress_callback,
+                filters=filters,
+                user_id=user_id,
+                shared_pool=shared_pool,
+                boolean_search=boolean_search,
+            )
+            finish_run(run, result)
     except Exception as exc:
-        _set_search_status(job_id, {"status": "error", "message": str(exc)})
+        fail_run(run, str(exc))
 
 
 @login_required
@@ -697,77 +922,40 @@ def preview_candidates_search(request, job_id: int):
     
     job = get_object_or_404(Job, id=job_id, user=request.user)
     
-    # Extrai filtros do POST
-    filters = {}
-    name_filter = request.POST.get('name', '').strip()
-    location_filter = request.POST.get('location', '').strip()
-    seniority_filter = request.POST.get('seniority', '').strip()
-    company_filter = request.POST.get('company', '').strip()
-    technologies_filter = request.POST.get('technologies', '').strip()
-    skills_filter = request.POST.get('skills', '').strip()
-    languages_filter = request.POST.get('languages', '').strip()
-    certifications_filter = request.POST.get('certifications', '').strip()
-    ready_only = request.POST.get('ready_only') == 'on'
-    
-    if name_filter:
-        filters['name'] = name_filter
-    if location_filter:
-        filters['location'] = location_filter
-    if seniority_filter:
-        filters['seniority'] = seniority_filter
-    if company_filter:
-        filters['company'] = company_filter
-    if technologies_filter:
-        filters['technologies'] = technologies_filter
-    if skills_filter:
-        filters['skills'] = skills_filter
-    if languages_filter:
-        filters['languages'] = languages_filter
-    if certifications_filter:
-        filters['certifications'] = certifications_filter
-    if ready_only:
-        filters['ready_only'] = True
-    
-    shared_pool = _uses_shared_pool(request.user)
-    # Busca candidatos não vinculados à vaga
-    linked_candidate_ids = CandidateJob.objects.filter(job_id=job_id).values_list('candidate_id', flat=True)
-    candidates = Candidate.objects.exclude(id__in=linked_candidate_ids)
-    if not shared_pool:
-        candidates = candidates.filter(user=request.user)
-    
-    # Aplica filtros
-    if name_filter:
-        candidates = _apply_unaccent_filter(candidates, 'name', name_filter, 'name')
-    if location_filter:
-        candidates = _apply_unaccent_filter(candidates, 'location', location_filter, 'location')
-    if seniority_filter:
-        candidates = _apply_unaccent_filter(candidates, 'seniority', seniority_filter, 'seniority')
-    if company_filter:
-        candidates = _apply_unaccent_filter(candidates, 'current_company', company_filter, 'company')
-    if technologies_filter:
-        candidates = _apply_unaccent_filter(candidates, 'technologies', technologies_filter, 'technologies')
-    if skills_filter:
-        candidates = _apply_unaccent_filter(candidates, 'skills', skills_filter, 'skills')
-    if languages_filter:
-        candidates = _apply_unaccent_filter(candidates, 'languages', languages_filter, 'languages')
-    if certifications_filter:
-        candidates = _apply_unaccent_filter(candidates, 'certifications', certifications_filter, 'certifications')
-    if ready_only:
-        candidates = candidates.exclude(ready_at__isnull=True)
-    
-    total = candidates.count()
-    
-    # Paginação: 10 candidatos por página
-    paginator = Paginator(candidates, 10)
-    page_number = request.POST.get('page', 1)
+    filters = pool_search_filters(request.POST, job.boolean_search)
+    candidate_filter = CandidateFilter(
+        job_id=job.id,
+        user_id=request.user.id,
+        shared_pool=_uses_shared_pool(request.user),
+        filters=filters,
+        boolean_search=job.boolean_search,
+        semantic_query=_build_job_description(job),
+        keyword_terms=tuple(job_terms(job)),
+    )
     try:
-        page_obj = paginator.page(page_number)
-    except:
-        page_obj = paginator.page(1)
+        candidates = candidate_filter.queryset()
+    except BooleanSearchError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    # Materializa os ids filtrados (na ordem do rankeamento) para o total e para o rankeamento
+    candidate_ids = filtered_candidate_ids(candidate_filter.ranking_queryset(), candidate_filter.cache_key)
+
+    # Paginação por cursor: 10 candidatos por página
+    if candidate_filter.ranked_ids is not None:
+        sort_keys = POOL_RANK_KEYS
+    else:
+        sort_keys = SEARCH_RANK_KEYS if candidate_filter.keywords else UPDATED_AT_KEYS
+    page_obj = paginate(candidates, sort_keys, request.POST.get('cursor', ''))
+    if candidate_ids is not None:
+        total, total_is_estimate = len(candidate_ids), False
+    else:
+        total, total_is_estimate = page_total(candidates)
     
     # Prepara dados para JSON
     candidates_data = []
+    keyword_matches = candidate_filter.keyword_matches or {}
     for candidate in page_obj:
+        keyword_match = keyword_matches.get(candidate.id)
         candidates_data.append({
             'id': candidate.id,
             'name': candidate.name,
@@ -775,17 +963,26 @@ def preview_candidates_search(request, job_id: int):
             'skills': candidate.skills[:100] + '...' if candidate.skills and len(candidate.skills) > 100 else (candidate.skills or '-'),
             'languages': candidate.languages[:100] + '...' if candidate.languages and len(candidate.languages) > 100 else (candidate.languages or '-'),
             'ready_at': candidate.ready_at.strftime('%d/%m/%Y') if candidate.ready_at else '-',
+            'keyword_score': keyword_match.score if keyword_match else None,
+            'matched_terms': keyword_match.matched_terms if keyword_match else {},
         })
     
     return JsonResponse({
         'success': True,
         'total': total,
-        'page': page_obj.number,
-        'num_pages': paginator.num_pages,
-        'has_previous': page_obj.has_previous(),
-        'has_next': page_obj.has_next(),
+        'total_is_estimate': total_is_estimate,
+        'has_previous': page_obj.has_previous,
+        'has_next': page_obj.has_next,
+        'previous_cursor': page_obj.previous_cursor,
+        'next_cursor': page_obj.next_cursor,
+        'last_cursor': page_obj.last_cursor,
         'candidates': candidates_data,
         'filters': filters,
+        # Índices do banco ainda em construção: a busca seguiu sem eles
+        'semantic_pending': candidate_filter.uses_semantic_search and candidate_filter.semantic_ids is None,
+        'keyword_ranking_pending': candidate_filter.uses_keyword_ranking and candidate_filter.keyword_matches is None,
+        # Busca semântica e ranking BM25 só trazem os N primeiros: a tela avisa quando o corte foi atingido
+        'ranking_limit': candidate_filter.ranking_limit,
     })
 
 
@@ -802,46 +999,28 @@ def search_candidates_in_pool(request, job_id: int):
     shared_pool = _uses_shared_pool(request.user)
     
     # Extrai filtros do POST (pode vir do preview)
-    filters = {}
-    name_filter = request.POST.get('name', '').strip()
-    location_filter = request.POST.get('location', '').strip()
-    seniority_filter = request.POST.get('seniority', '').strip()
-    company_filter = request.POST.get('company', '').strip()
-    technologies_filter = request.POST.get('technologies', '').strip()
-    skills_filter = request.POST.get('skills', '').strip()
-    languages_filter = request.POST.get('languages', '').strip()
-    certifications_filter = request.POST.get('certifications', '').strip()
-    ready_only = request.POST.get('ready_only') == 'on'
-    
-    if name_filter:
-        filters['name'] = name_filter
-    if location_filter:
-        filters['location'] = location_filter
-    if seniority_filter:
-        filters['seniority'] = seniority_filter
-    if company_filter:
-        filters['company'] = company_filter
-    if technologies_filter:
-        filters['technologies'] = technologies_filter
-    if skills_filter:
-        filters['skills'] = skills_filter
-    if languages_filter:
-        filters['languages'] = languages_filter
-    if certifications_filter:
-        filters['certifications'] = certifications_filter
-    if ready_only:
-        filters['ready_only'] = True
+    filters = pool_search_filters(request.POST, job.boolean_search)
     
-    _set_search_status(job.id, {"status": "running", "processed": 0, "total": 0})
+    if filters.get('use_boolean_search'):
+        try:
+            parse_boolean_search(job.boolean_search)
+        except BooleanSearchError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+
+    run = start_run(request.user.id, ImportRun.Kind.POOL_SEARCH, job.id)
     thread = threading.Thread(
         target=_run_search_in_pool,
-        args=(job.id, job_description, role_title, filters if filters else None, None if shared_pool else request.user.id, shared_pool),
+        args=(run, job.id, job_description, role_title, filters if filters else None, None if shared_pool else request.user.id, shared_pool, job.boolean_search),
         daemon=True,
     )
     thread.start()
     
     filter_msg = f" com {len(filters)} filtro(s) aplicado(s)" if filters else ""
-    return JsonResponse({"success": True, "message": f"Análise iniciada{filter_msg}. Acompanhe o progresso abaixo."})
+    return JsonResponse({
+        "success": True,
+        "message": f"Análise iniciada{filter_msg}. Acompanhe o progresso abaixo.",
+        **_run_urls(run),
+    })
 
 
 @login_required
@@ -929,6 +1108,29 @@ def generate_boolean_search(request, job_id: int):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+@login_required
+@required_plan('BASIC')
+def boolean_search_count(request, job_id: int):
+    """Quantos candidatos do banco (ainda não vinculados) atendem à busca booleana da vaga."""
+    job = get_object_or_404(Job, id=job_id, user=request.user)
+    expression = request.GET.get('expression', '').strip() or job.boolean_search
+    if not expression:
+        return JsonResponse({"error": "A vaga não tem busca booleana."}, status=400)
+    # Mesmo filtro compilado do preview e do rankeamento (anti-join com os já vinculados)
+    candidate_filter = CandidateFilter(
+        job_id=job.id,
+        user_id=request.user.id,
+        shared_pool=_uses_shared_pool(request.user),
+        filters={"use_boolean_search": True},
+        boolean_search=expression,
+    )
+    try:
+        total = candidate_filter.queryset().count()
+    except BooleanSearchError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({"success": True, "total": total})
+
+
 @login_required
 @required_plan('BASIC')
 def job_edit(request, job_id: int):